@@ -0,0 +1,111 @@
+"""
+Encode time and bytes per card for each card encoder and effort level.
+
+    python benchmarks/bench_encode.py                   # 1080x1350 feed cards, 5 stories
+    python benchmarks/bench_encode.py --scale 0.5 --stories 10 --repeat 5
+
+The cards are composed once (real Studio layout + compositing over a synthetic photo) and
+then encoded in memory with every configuration, so the report is the encoder alone:
+milliseconds and KiB per card, and the cost of writing a card to disk and decoding it
+again as the video path used to do (the `roundtrip` row, PNG defaults).
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from PIL import Image
+
+CONFIGS = [
+    # (label, format, quality, effort)
+    ("png default", "PNG", None, 6),
+    ("png fast", "PNG", None, 1),
+    ("jpeg q95", "JPEG", 95, 0),
+    ("jpeg q95 opt", "JPEG", 95, 1),
+    ("jpeg q85 opt", "JPEG", 85, 1),
+    ("webp q80 m0", "WEBP", 80, 0),
+    ("webp q80 m2", "WEBP", 80, 2),
+    ("webp q80 m4", "WEBP", 80, 4),
+    ("webp lossless", "WEBP", None, 0),
+]
+
+
+def make_cards(stories, scale):
+    from studio import Studio, FORMATS
+    studio = Studio(profile="final", brand=None)
+    cards = []
+    for n in range(stories):
+        # A photo with some texture so the encoders have real work to do
+        rng = np.random.default_rng(n)
+        ys, xs = np.mgrid[0:1120, 0:1080]
+        photo = np.stack([(xs * 255 // 1080), (ys * 255 // 1120), np.full_like(xs, 120)], -1)
+        photo = np.clip(photo + rng.integers(-6, 7, photo.shape), 0, 255).astype(np.uint8)
+        item = {"id": f"bench_{n}", "headline_en": f"Verstappen takes pole number {n} in Suzuka", "type": "NEWS"}
+        layout = studio.layout_story(item)
+        layout["photo"] = Image.fromarray(photo)
+        canvas = studio.compose_card(layout, *FORMATS["feed"])
+        cards.append(studio._scale_card(canvas, {"scale": scale}))
+    return cards
+
+
+def measure(cards, fmt, quality, effort, repeat):
+    from studio import IMAGE_ENCODERS
+    _, options = IMAGE_ENCODERS[fmt]
+    options = options(quality, effort)
+    sizes = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for card in cards:
+            buf = io.BytesIO()
+            card.save(buf, fmt, **options)
+            sizes.append(buf.tell())
+    seconds = time.perf_counter() - started
+    return {"ms_per_card": round(seconds * 1000 / len(sizes), 2), "kib_per_card": round(sum(sizes) / len(sizes) / 1024, 1)}
+
+
+def measure_roundtrip(cards, repeat):
+    """Old video path: save the card as PNG, read it back into an array for MoviePy."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for card in cards:
+            buf = io.BytesIO()
+            card.save(buf, "PNG")
+            buf.seek(0)
+            np.asarray(Image.open(buf).convert("RGB"))
+    seconds = time.perf_counter() - started
+    return {"ms_per_card": round(seconds * 1000 / (repeat * len(cards)), 2), "kib_per_card": None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="0.5 for draft-sized cards")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    cards = make_cards(args.stories, args.scale)
+    reports = [dict(label=label, format=fmt, quality=quality, effort=effort,
+                    **measure(cards, fmt, quality, effort, args.repeat))
+               for label, fmt, quality, effort in CONFIGS]
+    reports.append(dict(label="roundtrip (png)", format="PNG", quality=None, effort=6,
+                        **measure_roundtrip(cards, args.repeat)))
+
+    if args.json:
+        print(json.dumps({"size": list(cards[0].size), "reports": reports}, indent=2))
+    else:
+        print(f"{cards[0].width}x{cards[0].height} cards, {args.stories} stories x {args.repeat}")
+        print(f"{'encoder':<18}{'ms/card':>9}{'KiB/card':>10}")
+        for r in reports:
+            kib = "" if r["kib_per_card"] is None else r["kib_per_card"]
+            print(f"{r['label']:<18}{r['ms_per_card']:>9}{kib:>10}")
+
+
+if __name__ == "__main__":
+    main()
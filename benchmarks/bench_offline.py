@@ -0,0 +1,264 @@
+"""
+Offline end-to-end benchmark: real Scout and Studio code on recorded inputs, no network.
+
+    python benchmarks/bench_offline.py                    # run and compare with benchmarks/baseline.json
+    python benchmarks/bench_offline.py --save-baseline    # run and store the result as the new baseline
+    python benchmarks/bench_offline.py --reel-stories 0   # skip the reel export (fast)
+
+Inputs (benchmarks/fixtures/):
+  feeds/*.xml      recorded RSS feeds, parsed by feedparser from disk
+  articles/*.html  saved article pages, served to Scout in place of its HTTP session
+  photos           generated at start-up from a fixed seed (no binaries in the repo)
+  TTS              a short sine-tone MP3 made with MoviePy's ffmpeg, copied in place of edge-tts
+
+Reports scout items/s, draft and final cards/s, mean text-fit time, reel export seconds per
+story, peak RSS (this process and the ffmpeg children) and the cold-start import time of
+main.py and of dashboard.py's imports (bench_startup.py; the page itself never runs). Against a baseline, a metric that
+is more than --tolerance worse is flagged and the exit status is 1.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+import contextlib
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import metrics as metrics_module
+from metrics import Metrics
+from scout import Scout
+from studio import Studio
+from preflight import ffmpeg_binary
+from bench_startup import measure as measure_startup
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PHOTO_COUNT = 6
+
+# Metric -> which way is better
+METRICS = {
+    "scout_items_per_second": "higher",
+    "draft_cards_per_second": "higher",
+    "final_cards_per_second": "higher",
+    "text_fit_ms": "lower",
+    "reel_seconds_per_story": "lower",
+    "peak_rss_mb": "lower",
+    "cli_import_ms": "lower",
+    "dashboard_import_ms": "lower",
+}
+
+
+class FixtureResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} for fixture request")
+
+
+class FixtureSession:
+    """Stands in for Scout's requests.Session: article URLs map to articles/<slug>.html."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.headers = {}
+
+    def get(self, url, timeout=None):
+        path = os.path.join(self.directory, url.rstrip("/").rsplit("/", 1)[-1] + ".html")
+        if not os.path.exists(path):
+            return FixtureResponse("", status_code=404)
+        with open(path, "r", encoding="utf-8") as f:
+            return FixtureResponse(f.read())
+
+
+def make_photos(directory):
+    """Press-photo stand-ins: a colour gradient with seeded noise, JPEG like the real ones."""
+    rng = np.random.default_rng(2024)
+    paths = []
+    for n in range(1, PHOTO_COUNT + 1):
+        y = np.linspace(0, 1, 1000)[:, None, None]
+        x = np.linspace(0, 1, 1600)[None, :, None]
+        base = rng.integers(0, 255, size=3)
+        pixels = (base * (1 - y) + (255 - base) * x * y) + rng.normal(0, 12, size=(1000, 1600, 3))
+        path = os.path.join(directory, f"photo{n}.jpg")
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def make_voiceover(path, seconds=3.0):
+    cmd = [ffmpeg_binary(), "-y", "-loglevel", "error", "-f", "lavfi",
+           "-i", f"sine=frequency=220:duration={seconds}", "-ac", "2", "-c:a", "libmp3lame", path]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return path
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def offline_agents(work_dir):
+    photos_dir = os.path.join(work_dir, "photos")
+    os.makedirs(photos_dir)
+    photos = {os.path.basename(p): p for p in make_photos(photos_dir)}
+    voiceover = make_voiceover(os.path.join(work_dir, "voiceover.mp3"))
+
+    scout = Scout()
+    scout.rss_feeds = sorted(glob.glob(os.path.join(FIXTURES, "feeds", "*.xml")))
+    scout.http = FixtureSession(os.path.join(FIXTURES, "articles"))
+
+    studio = Studio(profile="draft")
+    studio.output_path = os.path.join(work_dir, "review_queue")
+    studio.cache_path = os.path.join(work_dir, "cache")
+    studio.audio_path = os.path.join(work_dir, "audio") # No background music
+    studio.manifest = None # Every timed pass renders
+    os.makedirs(studio.output_path)
+    os.makedirs(studio.cache_path)
+
+    def download_image(url, filename):
+        source = photos.get(url.rsplit("/", 1)[-1])
+        if not source:
+            return None
+        shutil.copyfile(source, filename)
+        return filename
+
+    def run_tts(text, output_file, voice=None):
+        shutil.copyfile(voiceover, output_file)
+        return True
+
+    studio.download_image = download_image
+    studio._run_tts = run_tts
+    return scout, studio
+
+
+def timed(fn, rounds):
+    """Median seconds of `rounds` calls, plus the last result."""
+    times = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as work_dir:
+        recorder = Metrics(directory=os.path.join(work_dir, "metrics"), flush_interval=3600)
+        with mock.patch.object(metrics_module, "metrics", recorder):
+            scout, studio = offline_agents(work_dir)
+
+            def scout_pass():
+                scout.article_cache.clear() # Every round parses the articles again
+                return scout.fetch_news()
+
+            scout_seconds, items = timed(scout_pass, args.rounds)
+            if not items:
+                raise RuntimeError("Scout returned no items from the fixtures")
+
+            # Photos are fetched (copied) in the first pass; the timed passes measure rendering
+            for item in items:
+                studio.fetch_photo(item["image_url"])
+            recorder.reset()
+
+            draft_seconds, _ = timed(lambda: [studio.generate_image(item, profile="draft") for item in items], args.rounds)
+            final_seconds, _ = timed(lambda: [studio.generate_image(item, profile="final") for item in items], args.rounds)
+            text_fit = recorder.snapshot().get("studio.text_fit", {"calls": 0, "seconds": 0.0})
+
+            report = {
+                "items": len(items),
+                "scout_items_per_second": round(len(items) / scout_seconds, 2),
+                "draft_cards_per_second": round(len(items) / draft_seconds, 2),
+                "final_cards_per_second": round(len(items) / final_seconds, 2),
+                "text_fit_ms": round(text_fit["seconds"] / max(text_fit["calls"], 1) * 1000, 3),
+                "reel_seconds_per_story": None,
+            }
+
+            if args.reel_stories:
+                stories = items[:args.reel_stories]
+                start = time.perf_counter()
+                path = studio.generate_video(stories, profile="draft")
+                if not path:
+                    raise RuntimeError("Reel export failed")
+                report["reel_seconds_per_story"] = round((time.perf_counter() - start) / len(stories), 3)
+
+            report["peak_rss_mb"] = peak_rss_mb()
+
+    report["cli_import_ms"] = measure_startup("main", args.rounds)["ms"]
+    report["dashboard_import_ms"] = measure_startup("dashboard", args.rounds)["ms"]
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Rows of (metric, baseline, current, change, regressed) for metrics present in both."""
+    rows = []
+    for name, better in METRICS.items():
+        old, new = baseline.get(name), report.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = change < -tolerance if better == "higher" else change > tolerance
+        rows.append((name, old, new, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="Timed passes per stage (median is reported)")
+    parser.add_argument("--reel-stories", type=int, default=3, help="Stories in the draft reel (0 to skip)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO) # Per-card log lines would dominate the output
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        report = run(args)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    rows = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+    regressions = [r[0] for r in rows if r[4]]
+
+    if args.json:
+        print(json.dumps({"report": report, "regressions": regressions}, indent=2))
+    elif rows:
+        print(f"{'metric':<26}{'baseline':>11}{'current':>11}{'change':>9}")
+        for name, old, new, change, regressed in rows:
+            print(f"{name:<26}{old:>11}{new:>11}{change:>+9.0%}{'  REGRESSION' if regressed else ''}")
+    else:
+        for name in METRICS:
+            print(f"{name:<26}{report[name]!s:>11}")
+        if args.save_baseline:
+            print(f"Baseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Sequential main() vs the pipelined orchestrator (main.run_pipeline), with stub agents.
+
+    python benchmarks/bench_pipeline.py --items 20 --article 0.3 --render 0.2 --upload 0.4
+
+Scout / Studio / Publisher are replaced by stubs that sleep for the given latencies
+(article download, draft render, final render, upload), so the numbers show the effect
+of overlapping the stages rather than the speed of any one of them. Reports wall time,
+time to first publish and items/min for both.
+"""
+import os
+import sys
+import json
+import time
+import builtins
+import argparse
+import tempfile
+import threading
+import contextlib
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main as orchestrator
+from jobqueue import PublishQueue, PublishWorkerPool
+from brands import get_brand
+
+
+class StubScout:
+    def __init__(self, items, feed_latency, article_latency):
+        self.items = items
+        self.feed_latency = feed_latency
+        self.article_latency = article_latency
+
+    def iter_entries(self, new_only=False):
+        for n in range(self.items):
+            if n % 5 == 0:
+                time.sleep(self.feed_latency) # One feed request per 5 entries
+            yield {"n": n}, "https://example.com/rss"
+
+    def build_item(self, entry, url):
+        time.sleep(self.article_latency)
+        n = entry["n"]
+        return {"id": f"story-{n}", "headline_en": f"Story {n}", "summary": "", "type": "NEWS", "series": "Formula 1"}
+
+    def iter_news(self):
+        for entry, url in self.iter_entries():
+            yield self.build_item(entry, url)
+
+    def fetch_news(self):
+        return list(self.iter_news())
+
+
+class StubStudio:
+    def __init__(self, work_dir, render_latency, final_latency, reel_latency):
+        self.profile = "draft"
+        self.output_path = work_dir
+        self.brand = dict(get_brand(), output_path=work_dir, publish_queue=os.path.join(work_dir, "publish_queue.db"))
+        self.manifest = None
+        self.render_latency = render_latency
+        self.final_latency = final_latency
+        self.reel_latency = reel_latency
+
+    def _write(self, name):
+        path = os.path.join(self.output_path, name)
+        with open(path, "w") as f:
+            f.write(name) # Unique content -> unique idempotency key
+        return path
+
+    def generate_image(self, item):
+        time.sleep(self.render_latency)
+        return self._write(f"slide1_{item['id']}_draft.jpg")
+
+    def generate_video(self, items):
+        time.sleep(self.reel_latency * len(items))
+        return self._write(f"reel_{len(items)}_draft.mp4")
+
+    def render_final(self, asset):
+        time.sleep(self.final_latency * (len(asset.get("items", [])) or 1))
+        return self._write(os.path.basename(asset["path"]).replace("_draft", "_final"))
+
+
+class StubPublisher:
+    def __init__(self, upload_latency):
+        self.upload_latency = upload_latency
+        self.published = []
+        self._lock = threading.Lock()
+
+    def login_instagram(self, *args):
+        return True
+
+    def publish_target(self, asset, target):
+        time.sleep(self.upload_latency)
+        with self._lock:
+            self.published.append(time.time())
+        return {"ok": True, "seconds": self.upload_latency}
+
+
+def run(mode, args, work_dir):
+    scout = StubScout(args.items, args.feed, args.article)
+    studio = StubStudio(work_dir, args.render, args.final, args.reel)
+    publisher = StubPublisher(args.upload)
+    db_path = os.path.join(work_dir, f"{mode}.db")
+
+    patches = [
+        mock.patch.object(orchestrator, "Scout", lambda: scout),
+        mock.patch.object(orchestrator, "make_studio", lambda profile=None, brand=None: studio),
+        mock.patch.object(orchestrator, "get_publisher", lambda brand=None: publisher),
+        mock.patch.object(orchestrator, "PublishQueue", lambda queue_path=None: PublishQueue(db_path=db_path)),
+        mock.patch.object(orchestrator, "PublishWorkerPool",
+                          lambda *a, **kw: PublishWorkerPool(*a, **dict(kw, poll_interval=0.02))),
+        mock.patch.object(builtins, "input", lambda prompt="": "y"),
+        mock.patch.dict(os.environ, {"DRY_RUN": "0", "PUBLISH_WORKERS": str(args.publish_workers),
+                                     "SCOUT_WORKERS": str(args.scout_workers),
+                                     "RENDER_WORKERS": str(args.render_workers)}),
+    ]
+    with contextlib.ExitStack() as stack:
+        for p in patches:
+            stack.enter_context(p)
+        stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        start = time.time()
+        # Console approval with input() patched to "y": every asset is approved, like a reviewer saying yes
+        if mode == "sequential":
+            orchestrator.main(orchestrator.console_approve)
+        else:
+            orchestrator.run_pipeline(orchestrator.console_approve)
+        wall = time.time() - start
+
+    first = min(publisher.published) - start if publisher.published else None
+    return {
+        "mode": mode,
+        "wall_seconds": round(wall, 3),
+        "first_publish_seconds": round(first, 3) if first is not None else None,
+        "uploads": len(publisher.published),
+        "items_per_minute": round(args.items / wall * 60, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--feed", type=float, default=0.2, help="Seconds per feed request")
+    parser.add_argument("--article", type=float, default=0.3, help="Seconds per article download")
+    parser.add_argument("--render", type=float, default=0.2, help="Seconds per draft card")
+    parser.add_argument("--final", type=float, default=0.2, help="Seconds per final re-render (per story for the reel)")
+    parser.add_argument("--reel", type=float, default=0.1, help="Seconds per story in the draft reel")
+    parser.add_argument("--upload", type=float, default=0.4, help="Seconds per upload")
+    parser.add_argument("--scout-workers", type=int, default=4)
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--publish-workers", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    reports = []
+    for mode in ("sequential", "pipeline"):
+        with tempfile.TemporaryDirectory() as work_dir:
+            reports.append(run(mode, args, work_dir))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    print(f"{'mode':<12}{'wall s':>9}{'first publish s':>17}{'uploads':>9}{'items/min':>11}")
+    for r in reports:
+        print(f"{r['mode']:<12}{r['wall_seconds']:>9}{r['first_publish_seconds']:>17}{r['uploads']:>9}{r['items_per_minute']:>11}")
+
+
+if __name__ == "__main__":
+    main()
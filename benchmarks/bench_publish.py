@@ -0,0 +1,134 @@
+"""
+Publisher throughput benchmark against the local stand-in upload service.
+
+    python benchmarks/bench_publish.py --images 20 --videos 5 --latency 0.05 --bandwidth 20e6 --failure-rate 0.05
+
+Reports assets per minute and per-target latency percentiles for the publish path
+(Publisher.publish_many directly, or the durable queue + worker pool with --mode queue).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from publisher import Publisher
+from standin import StandinServer, attach_publisher
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def make_assets(work_dir, images, videos, image_bytes, video_bytes):
+    assets = []
+    for i in range(images):
+        path = os.path.join(work_dir, f"card_{i}.jpg")
+        with open(path, "wb") as f:
+            f.write(os.urandom(image_bytes))
+        assets.append({"type": "image", "path": path, "caption": f"Card {i}", "data": {"headline_en": f"Card {i}"}})
+    for i in range(videos):
+        path = os.path.join(work_dir, f"reel_{i}.mp4")
+        with open(path, "wb") as f:
+            f.write(os.urandom(video_bytes))
+        assets.append({"type": "video", "path": path, "caption": f"Reel {i}", "data": {"headline_en": f"Reel {i}"}})
+    return assets
+
+
+def run_direct(publisher, assets):
+    results = publisher.publish_many(assets)
+    return [(target, r["seconds"], r["ok"]) for per_asset in results for target, r in per_asset.items()]
+
+
+def run_queue(publisher, assets, work_dir, workers):
+    from jobqueue import PublishQueue, PublishWorkerPool
+    queue = PublishQueue(db_path=os.path.join(work_dir, "queue.db"), backoff_base=0.1, backoff_max=1.0)
+    for asset in assets:
+        queue.enqueue_asset(asset)
+    pool = PublishWorkerPool(queue, publisher, workers=workers, poll_interval=0.02, cleanup=False).start()
+    pool.drain()
+    pool.stop()
+    return [(j["target"], j["result"]["seconds"] if j["result"] else 0.0, j["state"] == "done") for j in queue.jobs(limit=100000)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--videos", type=int, default=5)
+    parser.add_argument("--image-kb", type=int, default=800)
+    parser.add_argument("--video-mb", type=float, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request on the stand-in")
+    parser.add_argument("--bandwidth", type=float, default=20e6, help="Bytes/second per connection")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["direct", "queue"], default="direct")
+    parser.add_argument("--workers", type=int, default=3, help="Queue workers (--mode queue)")
+    parser.add_argument("--ig-limit", type=int, default=None, help="Override Publisher.platform_limits['instagram']")
+    parser.add_argument("--yt-limit", type=int, default=None, help="Override Publisher.platform_limits['youtube']")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir, \
+            StandinServer(latency=args.latency, bandwidth=args.bandwidth, failure_rate=args.failure_rate) as server:
+        publisher = attach_publisher(Publisher(), server.url)
+        publisher.upload_state_dir = os.path.join(work_dir, "upload_state")
+        publisher.youtube_chunk_size = 1024 * 1024
+        publisher.youtube_max_retries = 5
+        publisher.youtube_backoff_base = 0.05
+        publisher.preflight = None # Payloads are random bytes, not real media
+        if args.ig_limit:
+            publisher.set_platform_limit("instagram", args.ig_limit)
+        if args.yt_limit:
+            publisher.set_platform_limit("youtube", args.yt_limit)
+
+        assets = make_assets(work_dir, args.images, args.videos, args.image_kb * 1024, int(args.video_mb * 1024 * 1024))
+
+        start = time.time()
+        if args.mode == "direct":
+            samples = run_direct(publisher, assets)
+        else:
+            samples = run_queue(publisher, assets, work_dir, args.workers)
+        wall = time.time() - start
+        stats = server.stats
+
+    report = {
+        "mode": args.mode,
+        "assets": len(assets),
+        "uploads": len(samples),
+        "failed_uploads": sum(1 for _, _, ok in samples if not ok),
+        "wall_seconds": round(wall, 3),
+        "assets_per_minute": round(len(assets) / wall * 60, 2) if wall else 0.0,
+        "server": stats,
+        "latency": {},
+    }
+    for target in sorted({t for t, _, _ in samples}):
+        values = [s for t, s, ok in samples if t == target and ok]
+        report["latency"][target] = {
+            "n": len(values),
+            "mean": round(statistics.mean(values), 3) if values else 0.0,
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Mode: {report['mode']}  Assets: {report['assets']}  Uploads: {report['uploads']}  Failed: {report['failed_uploads']}")
+    print(f"Wall: {report['wall_seconds']}s  Throughput: {report['assets_per_minute']} assets/min")
+    print(f"Server: {stats['requests']} requests, {stats['bytes_in'] / 1e6:.1f} MB in, {stats['injected_failures']} injected failures")
+    print(f"{'target':<18}{'n':>5}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for target, lat in report["latency"].items():
+        print(f"{target:<18}{lat['n']:>5}{lat['mean']:>9}{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}")
+
+
+if __name__ == "__main__":
+    main()
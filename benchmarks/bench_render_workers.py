@@ -0,0 +1,88 @@
+"""
+Render throughput against the number of render worker processes.
+
+    python benchmarks/bench_render_workers.py                    # 1, 2 and 4 workers, 24 cards each
+    python benchmarks/bench_render_workers.py --workers 1 2 4 8 --cards 48 --profile final
+
+For each worker count a fresh render queue (SQLite broker in a temp dir) gets --cards image
+jobs, that many `renderq` worker processes drain it with real Studio renders (no photo
+download: the cards use the placeholder background), and the report is cards per second
+and the speed-up over the first row. Scaling stops at the number of free cores.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from renderq import SQLiteRenderBroker, RenderWorker
+
+
+def _worker(db_path, store_dir, work_dir):
+    os.chdir(work_dir) # Each worker renders into its own output/ like a separate machine would
+    from studio import Studio
+    broker = SQLiteRenderBroker(db_path, store_dir)
+
+    def studio_factory(brand):
+        studio = Studio(profile="draft", brand=dict(brand, branding_path=os.path.join(ROOT, "assets/branding/")))
+        studio.manifest = None # Measure renders, not manifest hits
+        return studio
+
+    RenderWorker(broker, poll_interval=0.05, studio_factory=studio_factory).run(exit_when_idle=True)
+
+
+def measure(workers, cards, profile):
+    with tempfile.TemporaryDirectory() as tmp:
+        broker = SQLiteRenderBroker(os.path.join(tmp, "render_queue.db"), os.path.join(tmp, "store"))
+        for n in range(cards):
+            broker.submit("image", profile, "racing_tamizhan",
+                          [{"id": f"bench_{n}", "headline_en": f"Verstappen takes pole number {n} in Suzuka",
+                            "type": "NEWS"}])
+
+        processes = []
+        for i in range(workers):
+            work_dir = os.path.join(tmp, f"worker{i}")
+            os.makedirs(work_dir)
+            processes.append(multiprocessing.Process(target=_worker, args=(broker.db_path, broker.store_dir, work_dir)))
+        started = time.perf_counter()
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        seconds = time.perf_counter() - started
+
+        counts = broker.counts()
+        return {"workers": workers, "cards": cards, "done": counts["done"], "seconds": round(seconds, 2),
+                "cards_per_second": round(counts["done"] / seconds, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cards", type=int, default=24)
+    parser.add_argument("--profile", choices=["draft", "final"], default="draft")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    reports = [measure(n, args.cards, args.profile) for n in args.workers]
+    base = reports[0]["cards_per_second"]
+    for r in reports:
+        r["speedup"] = round(r["cards_per_second"] / base, 2) if base else None
+
+    if args.json:
+        print(json.dumps({"reports": reports, "cpus": os.cpu_count()}, indent=2))
+    else:
+        print(f"{'workers':>8}{'cards':>7}{'seconds':>9}{'cards/s':>9}{'speedup':>9}   ({os.cpu_count()} CPUs)")
+        for r in reports:
+            print(f"{r['workers']:>8}{r['done']:>7}{r['seconds']:>9}{r['cards_per_second']:>9}{r['speedup']:>9}")
+
+    sys.exit(0 if all(r["done"] == r["cards"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()
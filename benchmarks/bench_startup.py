@@ -0,0 +1,104 @@
+"""
+Cold-start import time of the CLI (main.py) and the dashboard (dashboard.py).
+
+    python benchmarks/bench_startup.py              # report, exit 1 if a target is missed
+    python benchmarks/bench_startup.py --top 15     # also list the slowest modules
+
+Each entry point is imported in a fresh interpreter with `-X importtime`; the report is the
+cumulative import time of the module (median of --rounds runs), the slowest modules under
+it, and any heavy dependency that was loaded although nothing used it yet. The dashboard is
+a Streamlit script: importing it outside `streamlit run` executes the whole page (opening the
+output databases, starting publish workers, output GC), so for it only the module-level import
+statements of dashboard.py are run and timed. The heavy ones
+(fastf1, pandas, newspaper, moviepy, edge_tts, instagrapi, the Google client libraries)
+are meant to load on first use: the first telemetry call, article, render or upload.
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Entry point -> cold-start target in milliseconds
+TARGETS = {
+    "main": 600,
+    "dashboard": 1500,
+}
+
+# Streamlit scripts: only their imports are timed, the page body never runs here
+SCRIPTS = ("dashboard",)
+
+HEAVY = ("fastf1", "pandas", "newspaper", "moviepy", "edge_tts", "instagrapi",
+         "googleapiclient", "google_auth_oauthlib", "matplotlib")
+
+
+def entry_imports(module):
+    """The code to time for an entry point: `import module`, or a script's module-level imports."""
+    if module not in SCRIPTS:
+        return f"import {module}"
+    with open(os.path.join(ROOT, f"{module}.py"), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_profile(module):
+    """
+    Per-module import times (µs, self and cumulative) for one fresh run of entry_imports(module),
+    plus "<total>": the wall time of those imports, measured in the child.
+    """
+    code = f"import time\nstarted = time.perf_counter()\n{entry_imports(module)}\nprint(time.perf_counter() - started)"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    modules["<total>"] = (0, int(float(result.stdout.split()[-1]) * 1e6))
+    return modules
+
+
+def measure(module, rounds=3, top=0):
+    profiles = [import_profile(module) for _ in range(rounds)]
+    totals = [p["<total>"][1] / 1000 for p in profiles]
+    last = profiles[-1]
+    slowest = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+    return {
+        "module": module,
+        "ms": round(statistics.median(totals), 1),
+        "heavy": sorted(h for h in HEAVY if h in last),
+        "slowest": [{"module": name, "self_ms": round(own / 1000, 1)} for name, (own, _) in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest modules (self time)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    reports = [measure(module, args.rounds, args.top) for module in TARGETS]
+    failed = [r["module"] for r in reports if r["ms"] > TARGETS[r["module"]] or r["heavy"]]
+
+    if args.json:
+        print(json.dumps({"reports": reports, "targets": TARGETS, "failed": failed}, indent=2))
+    else:
+        print(f"{'entry point':<12}{'ms':>9}{'target':>9}  heavy imports")
+        for r in reports:
+            print(f"{r['module']:<12}{r['ms']:>9}{TARGETS[r['module']]:>9}  {', '.join(r['heavy']) or '-'}")
+            for m in r["slowest"]:
+                print(f"    {m['self_ms']:>8} ms  {m['module']}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
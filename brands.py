@@ -0,0 +1,95 @@
+import os
+import re
+import json
+import copy
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Brands")
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "brands.json")
+
+# Anything a brand profile leaves out comes from here (and it is the only brand without a config file)
+DEFAULT_BRAND = {
+    "name": "racing_tamizhan",
+    "title": "Racing Tamizhan",
+    "handle": "@racing.tamizhan",
+    "hashtags": ["#RacingTamizhan", "#Motorsport", "#News"],
+    "feeds": [
+        "https://www.motorsport.com/rss/f1/news/",
+        "https://www.autosport.com/rss/feed/f1",
+        "https://www.motorsport.com/rss/motogp/news/",
+        "https://www.autosport.com/rss/feed/motogp",
+    ],
+    "series": [],               # Only stories about these series; empty = everything from the feeds
+    "branding_path": "assets/branding/",
+    "palette": None,            # [[r, g, b], [r, g, b]] for stories without a team; None = entity index default
+    "voice": "en-GB-SoniaNeural",
+    "accounts": {
+        "instagram": {"username_env": "IG_USERNAME", "password_env": "IG_PASSWORD", "session_file": "settings.json"},
+        "youtube": {"token_file": "token.json", "client_secret_file": "client_secret.json"},
+    },
+    "output_path": None,        # Default: output/review_queue/ (first brand), output/brands/<name>/review_queue/
+    "publish_queue": None,      # Default: output/publish_queue.db (first brand), output/brands/<name>/publish_queue.db
+}
+
+NAME_RE = re.compile(r"^\w+$")
+
+
+def _profile(config, primary):
+    brand = copy.deepcopy(DEFAULT_BRAND)
+    accounts = config.get("accounts", {})
+    brand.update({k: v for k, v in config.items() if k != "accounts"})
+    for platform, account in accounts.items():
+        brand["accounts"].setdefault(platform, {}).update(account)
+
+    name = brand["name"]
+    if not NAME_RE.match(name):
+        raise ValueError(f"Brand name must be letters, digits and underscores: {name!r}")
+    # The first brand keeps the single-brand paths, so existing queues and renders stay where they are
+    root = "output/" if primary else f"output/brands/{name}/"
+    brand["output_path"] = brand["output_path"] or os.path.join(root, "review_queue/")
+    brand["publish_queue"] = brand["publish_queue"] or os.path.join(root, "publish_queue.db")
+    return brand
+
+
+def load_brands(path=DEFAULT_CONFIG):
+    """
+    Brand profiles (feeds, branding assets, palette, voice, accounts) from config/brands.json,
+    first brand first. Without the file there is one brand, DEFAULT_BRAND.
+    """
+    if not os.path.exists(path):
+        return [_profile({}, primary=True)]
+    with open(path, "r", encoding="utf-8") as f:
+        configs = json.load(f).get("brands", [])
+    if not configs:
+        raise ValueError(f"No brands in {path}")
+    brands = [_profile(config, primary=(n == 0)) for n, config in enumerate(configs)]
+    names = [b["name"] for b in brands]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate brand names in {path}: {names}")
+    return brands
+
+
+def get_brand(name=None, path=DEFAULT_CONFIG):
+    """One brand by name; the first one when name is None."""
+    brands = load_brands(path)
+    if name is None:
+        return brands[0]
+    for brand in brands:
+        if brand["name"] == name:
+            return brand
+    raise ValueError(f"Unknown brand: {name} (have {', '.join(b['name'] for b in brands)})")
+
+
+def feed_union(brands):
+    """Every feed any brand reads, each once, so a shared Scout fetches and scrapes it once."""
+    return list(dict.fromkeys(url for brand in brands for url in brand["feeds"]))
+
+
+def wants(brand, item):
+    """Whether a story belongs on this brand: from one of its feeds and about one of its series."""
+    if item.get('feed') and item['feed'] not in brand["feeds"]:
+        return False
+    return not brand["series"] or item.get('series') in brand["series"]
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from entities import load_index
+from brands import DEFAULT_BRAND
+
+# Caption prefix per story type
+TYPE_PREFIX = {
+    "BREAKING": "🚨 BREAKING:",
+    "RESULT": "🏆 RESULT:",
+    "RUMOUR": "👀 RUMOUR:",
+    "OFFICIAL": "📝 OFFICIAL:",
+    "ANALYSIS": "🧠 ANALYSIS:",
+    "NEWS": "📰 NEWS:"
+}
+
+BASE_TAGS = tuple(DEFAULT_BRAND["hashtags"])
+
+
+@lru_cache(maxsize=2048)
+def _caption(headline, summary, item_type, entity_names, base_tags=BASE_TAGS, handle=DEFAULT_BRAND["handle"]):
+    index = load_index()
+    matches = [{"name": name} for name in entity_names] if entity_names is not None else index.match(headline)
+    tags = list(base_tags) + [t for t in index.hashtags(matches) if t not in base_tags]
+    prefix = TYPE_PREFIX.get(item_type, TYPE_PREFIX["NEWS"])
+    # Prefix + Title + Summary + Call to Action + Tags
+    return f"{prefix} {headline}\n\n{summary}\n\nFollow {handle} for more updates!\n\n{' '.join(tags)}"
+
+
+def default_caption(item, brand=None):
+    """
+    Suggested post caption for a story: type prefix, headline, summary, the brand's handle
+    and hashtags, and entity hashtags.
+    Memoized on the fields it is built from, so a dashboard rerun doesn't rebuild it.
+    """
+    brand = brand or DEFAULT_BRAND
+    entities = item.get('entities')
+    return _caption(item.get('headline_en', ''), item.get('summary', ''), item.get('type', 'NEWS'),
+                    tuple(e["name"] for e in entities) if entities is not None else None,
+                    tuple(brand["hashtags"]), brand["handle"])
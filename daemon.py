@@ -0,0 +1,173 @@
+import os
+import signal
+import logging
+import argparse
+import threading
+import schedule
+from dotenv import load_dotenv
+from scout import Scout
+from renderq import make_studio
+from publisher import get_publisher
+from jobqueue import PublishQueue, PublishWorkerPool
+from pipeline import Pipeline
+from policy import ApprovalPolicy, ReviewQueue
+from manifest import collect_output_garbage
+from brands import load_brands, feed_union, get_brand
+from main import console_approve, apply_caption, ig_credentials, enqueue_for_publish
+
+# Load environment variables
+load_dotenv()
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Daemon")
+
+# Approval strategies for unattended runs ("policy" = ApprovalPolicy); any callable(asset) -> bool works too
+APPROVERS = {
+    "console": console_approve,        # Ask on the terminal (needs one attached)
+    "auto": lambda asset: True,        # Publish everything
+    "reject": lambda asset: False,     # Render drafts only, never publish
+}
+
+
+class Daemon:
+    """
+    Runs scout -> render -> publish cycles on an interval in one long-lived process.
+
+    Everything expensive is created once and stays warm between cycles: the Scout's HTTP
+    session, feed ETags and article cache, the Studio's fonts, logo and photo/TTS caches,
+    the logged-in Publisher and the publish worker pool. Each cycle only handles stories
+    the Scout hasn't seen yet.
+
+    SIGINT / SIGTERM stop it gracefully: the running cycle finishes its current items,
+    in-flight uploads complete, and anything still queued stays in the durable queue
+    for the next start.
+
+    With `brands` (profiles from brands.load_brands) one process serves all of them: one Scout
+    reads the union of their feeds, so a feed is fetched and an article scraped once however
+    many brands carry it, and the Studios share the photo / TTS cache and the asset manifest.
+    Each brand has its own Studio (branding, palette, voice, output directory), Publisher,
+    accounts and publish queue.
+    """
+
+    def __init__(self, interval_minutes=30, approve="policy", dry_run=True, scout=None, studio=None,
+                 publisher=None, publish_queue=None, publish_workers=3, brands=None):
+        self.interval_minutes = interval_minutes
+        self.dry_run = dry_run
+        if brands:
+            self.scout = scout or Scout(feeds=feed_union(brands))
+            self.studios = {b["name"]: make_studio(profile="draft", brand=b) for b in brands}
+        else:
+            self.scout = scout or Scout()
+            self.studios = {None: studio or make_studio(profile="draft")}
+        self.studio = next(iter(self.studios.values()))
+        if approve == "policy":
+            # Untagged (single-brand) assets are deduplicated under this Studio's brand
+            brand = getattr(self.studio, "brand", None)
+            approve = ApprovalPolicy(review_queue=ReviewQueue(brand=brand["name"] if brand else None))
+        self.approve = APPROVERS[approve] if isinstance(approve, str) else approve
+        for other in self.studios.values():
+            other.manifest = self.studio.manifest # One manifest (and one connection pattern) for every brand
+        self.publisher = publisher or get_publisher(getattr(self.studio, "brand", None))
+        self.cycles = 0
+        self.last_stats = None
+
+        self.pools = {} # brand -> PublishWorkerPool
+        self.publish_queues = {} # brand -> PublishQueue
+        publish = None
+        if not dry_run:
+            for name, brand_studio in self.studios.items():
+                brand = getattr(brand_studio, "brand", None) or get_brand()
+                queue = (publish_queue if name is None else None) or PublishQueue(brand["publish_queue"])
+                brand_publisher = self.publisher if name is None else get_publisher(brand)
+                self.publish_queues[name] = queue
+                self.pools[name] = PublishWorkerPool(queue, brand_publisher, workers=publish_workers,
+                                                     ig_credentials=ig_credentials(brand), manifest=self.studio.manifest)
+            publish = self._enqueue
+        self.publish_queue = self.publish_queues.get(next(iter(self.studios)))
+        self.pool = self.pools.get(next(iter(self.studios)))
+
+        self.pipeline = Pipeline(
+            self.scout, self.studios if brands else self.studio, approve=self.approve, publish=publish,
+            scout_workers=int(os.getenv("SCOUT_WORKERS", "4")),
+            render_workers=int(os.getenv("RENDER_WORKERS", "2")),
+            new_only=True,
+        )
+        self.scheduler = schedule.Scheduler()
+        self._stop = threading.Event()
+        self._cycle_lock = threading.Lock()
+
+    def _enqueue(self, asset):
+        name = asset.get('brand')
+        brand = getattr(self.studios[name], "brand", None)
+        enqueue_for_publish(self.publish_queues[name], apply_caption(asset, brand), self.studio.manifest,
+                            getattr(self.approve, "review_queue", None))
+
+    def run_cycle(self):
+        """One scout -> render -> publish pass over new stories."""
+        with self._cycle_lock:
+            if self._stop.is_set():
+                return None
+            self.cycles += 1
+            logger.info(f"Cycle {self.cycles} starting...")
+            try:
+                self.last_stats = self.pipeline.run()
+            except Exception as e:
+                logger.error(f"Cycle {self.cycles} failed: {e}")
+                return None
+            logger.info(f"Cycle {self.cycles} done: {self.last_stats}")
+            if self.studio.manifest:
+                # Retention + disk quota on the renders, sparing files still waiting for upload or review
+                for name, brand_studio in self.studios.items():
+                    collect_output_garbage(self.studio.manifest, brand_studio.output_path, self.publish_queues.get(name),
+                                           review_queue=getattr(self.approve, "review_queue", None))
+            return self.last_stats
+
+    def stop(self, *args):
+        """Graceful shutdown; safe to call from a signal handler."""
+        if not self._stop.is_set():
+            logger.info("Shutting down after the current items...")
+        self._stop.set()
+        self.pipeline.stop()
+
+    def install_signal_handlers(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.stop)
+
+    def run_forever(self, poll_seconds=1.0):
+        """Run a cycle now, then every interval, until stop()."""
+        for pool in self.pools.values():
+            pool.start()
+        self.scheduler.every(self.interval_minutes).minutes.do(self.run_cycle)
+        try:
+            self.run_cycle()
+            while not self._stop.is_set():
+                self.scheduler.run_pending()
+                self._stop.wait(poll_seconds)
+        finally:
+            self.scheduler.clear()
+            for pool in self.pools.values():
+                pool.stop() # Running uploads finish, queued ones wait for the next start
+            logger.info(f"Daemon stopped after {self.cycles} cycle(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Racing Tamizhan cycles on a schedule.")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("CYCLE_MINUTES", "30")),
+                        help="Minutes between cycles")
+    parser.add_argument("--approve", choices=sorted(APPROVERS) + ["policy"], default=os.getenv("APPROVER", "policy"),
+                        help="How drafts get approved without a reviewer")
+    parser.add_argument("--brands", default=os.getenv("BRANDS", "all"),
+                        help="Comma-separated brand names from config/brands.json, or 'all'")
+    args = parser.parse_args()
+
+    brands = load_brands() if args.brands == "all" else [get_brand(name) for name in args.brands.split(",")]
+    single = len(brands) == 1 # Plain single-brand run: no brand tag on assets, same queue and dedup history
+    daemon = Daemon(interval_minutes=args.interval, approve=args.approve,
+                    dry_run=os.getenv("DRY_RUN", "1") == "1",
+                    publish_workers=int(os.getenv("PUBLISH_WORKERS", "3")),
+                    brands=None if single else brands,
+                    scout=Scout(feeds=brands[0]["feeds"]) if single else None,
+                    studio=make_studio(profile="draft", brand=brands[0]) if single else None)
+    daemon.install_signal_handlers()
+    daemon.run_forever()
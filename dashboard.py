@@ -1,16 +1,31 @@
 import streamlit as st
 import os
-import pandas as pd
+import math
+import time
+from datetime import datetime, timedelta, timezone
 from scout import Scout
-from studio import Studio
-from publisher import Publisher
+from renderq import make_studio
+from publisher import get_publisher
+from jobqueue import PublishQueue, PublishWorkerPool
+from policy import ApprovalPolicy, ReviewQueue
+from jobs import JobRunner
+from thumbnails import Thumbnailer
+from captions import default_caption
+from grid import DATE_RANGES, filter_items, paginate, facets, item_source
+from main import apply_caption, enqueue_for_publish, ig_credentials
+from brands import get_brand
+from manifest import AssetManifest, collect_output_garbage
+from metrics import metrics
 from dotenv import load_dotenv
 
 # Load env vars
 load_dotenv()
 
 # --- CONFIGURATION & SETUP ---
-st.set_page_config(page_title="Racing Tamizhan Console", page_icon="🏎️", layout="wide")
+# One brand per dashboard (BRAND, default: the first in config/brands.json); daemon.py serves several at once
+brand = get_brand(os.getenv("BRAND") or None)
+ig_account = brand["accounts"]["instagram"]
+st.set_page_config(page_title=f"{brand['title']} Console", page_icon="🏎️", layout="wide")
 
 # --- AUTHENTICATION ---
 def check_password():
@@ -39,27 +54,276 @@ def check_password():
 if not check_password():
     st.stop()  # Stop execution if not authenticated
 
-st.title("🏎️ Racing Tamizhan Auto System")
+st.title(f"🏎️ {brand['title']} Auto System")
 
 # --- SESSION STATE INITIALIZATION ---
 if 'scout' not in st.session_state:
-    st.session_state.scout = Scout()
+    st.session_state.scout = Scout(feeds=brand["feeds"])
 if 'studio' not in st.session_state:
-    st.session_state.studio = Studio()
-if 'publisher' not in st.session_state:
-    st.session_state.publisher = Publisher()
+    st.session_state.studio = make_studio(profile="draft", brand=brand) # Drafts for review, final on publish
+
+# One Publisher (and Instagram session) for every dashboard session in this process
+@st.cache_resource
+def shared_publisher():
+    return get_publisher(brand)
+
+publisher = shared_publisher()
+
+# Persistent record of rendered assets (source stories, profile, hash, publish state)
+@st.cache_resource
+def shared_manifest():
+    return AssetManifest()
+
+manifest = shared_manifest()
+
+# Durable publish queue + background workers, shared by every session.
+# Rule-based approval (config/approval_policy.json); its review queue holds what headless runs escalated
+@st.cache_resource
+def shared_approval_policy():
+    return ApprovalPolicy(review_queue=ReviewQueue(brand=brand["name"])) # Dashboard assets carry no brand tag
+
+approval_policy = shared_approval_policy()
+
+# The UI only enqueues; uploads never block a script run and survive restarts.
+@st.cache_resource
+def shared_publish_queue():
+    queue = PublishQueue(brand["publish_queue"])
+    credentials = ig_credentials(brand)
+    PublishWorkerPool(queue, get_publisher(brand), workers=int(os.getenv("PUBLISH_WORKERS", "3")), ig_credentials=credentials,
+                      manifest=manifest).start()
+    # Once per process: retention + disk quota on the renders (pending uploads and reviews are spared)
+    collect_output_garbage(manifest, st.session_state.studio.output_path, queue,
+                           review_queue=approval_policy.review_queue)
+    return queue
+
+publish_queue = shared_publish_queue()
+
+# Background executor for renders and publishing, shared by every session: a script run only
+# submits work and polls it, so reruns and other editors re-attach instead of restarting it
+@st.cache_resource
+def shared_job_runner():
+    return JobRunner(workers=int(os.getenv("JOB_WORKERS", "2")))
+
+job_runner = shared_job_runner()
+
+# Small on-disk previews of press photos and rendered assets, shared by every session
+@st.cache_resource
+def shared_thumbnailer():
+    return Thumbnailer()
+
+thumbnailer = shared_thumbnailer()
+
+# Feed results are shared by every session for a few minutes; "Fetch News" within that window is instant
+@st.cache_data(ttl=int(os.getenv("FEED_CACHE_SECONDS", "300")), show_spinner=False)
+def cached_news(_scout):
+    return _scout.fetch_news()
+
+def reel_asset(path, items, profile):
+    return {
+        "type": "video",
+        "path": path,
+        "data": {"headline_en": f"News Digest {len(items)} Stories", "type": "REEL"},
+        "items": items,
+        "profile": profile,
+        "approved": False,
+        "caption": f"⚡ Fast F1 News Digest! \n\nCheck out the top stories of the day! \n\n#F1 {' '.join(brand['hashtags'][:1])} #Shorts #Reels"
+    }
+
+def restore_assets():
+    """Unpublished renders from the last RESTORE_HOURS (24), so a reload or reset doesn't lose them."""
+    since = time.time() - float(os.getenv("RESTORE_HOURS", "24")) * 3600
+    output_dir = os.path.abspath(brand["output_path"])
+    records = [r for r in manifest.assets(since=since) # Newest first; other brands' renders share the manifest
+               if os.path.dirname(os.path.abspath(r['path'])) == output_dir]
+    seen = set() # (kind, stories): the newest record wins, and anything already queued hides older renders
+    assets = []
+    for r in records:
+        story = (r['kind'], tuple(r['item_ids']))
+        if story in seen:
+            continue
+        seen.add(story)
+        if r['state'] != 'rendered':
+            continue
+        if r['kind'] == 'image':
+            assets.append({"type": "image", "path": r['path'], "data": r['items'][0], "profile": r['profile'], "approved": False})
+        else:
+            assets.append(reel_asset(r['path'], r['items'], r['profile']))
+    return assets[::-1]
 
 if 'news_items' not in st.session_state:
     st.session_state.news_items = []
 if 'generated_assets' not in st.session_state:
-    st.session_state.generated_assets = []
+    st.session_state.generated_assets = restore_assets()
 if 'approved_assets' not in st.session_state:
     st.session_state.approved_assets = []
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = {} # slot ("images", "reel", "publish") -> job id
+if 'selected' not in st.session_state:
+    st.session_state.selected = set() # Ids of the stories picked in the Studio tab
+    st.session_state.selection_version = 0 # Bumped by bulk changes so page checkboxes re-read the set
+
+# --- BACKGROUND JOBS ---
+def render_images_job(job, studio, items, profile):
+    assets = []
+    for idx, item in enumerate(items):
+        if job.cancelled:
+            break
+        job.update(idx / len(items), f"Design: {item['headline_en']}")
+        image_path = studio.generate_image(item, profile=profile)
+        if image_path:
+            assets.append({"type": "image", "path": image_path, "data": item, "profile": profile, "approved": False})
+    return assets
+
+def render_reel_job(job, studio, items, profile):
+    job.update(0.0, f"Producing video digest ({len(items)} stories)...")
+    video_path = studio.generate_video(items, profile=profile)
+    if not video_path:
+        raise RuntimeError("Video render failed")
+    return reel_asset(video_path, items, profile)
+
+def publish_job(job, studio, assets):
+    queued = []
+    for idx, asset in enumerate(assets):
+        if job.cancelled:
+            break
+        job.update(idx / len(assets), f"Preparing: {asset['data']['headline_en']}")
+        if not asset.get('caption'): # Approved on a page that was never opened
+            asset['caption'] = default_caption(asset['data'], studio.brand)
+        # Drafts are re-rendered at publish quality from the cached inputs
+        if asset.get('profile', 'final') != 'final':
+            final_path = studio.render_final(asset)
+            if not final_path:
+                job.log(f"❌ Final render failed: {asset['data']['headline_en']}")
+                continue
+            asset['path'] = final_path
+            asset['profile'] = 'final'
+
+        # Workers upload in the background; duplicates of already queued/posted assets are ignored
+        for target, (job_id, created) in enqueue_for_publish(publish_queue, asset, manifest,
+                                                             approval_policy.review_queue).items():
+            verb = "📥 Queued" if created else "⏭️ Already queued/posted"
+            job.log(f"{verb} {target} (job #{job_id}): {os.path.basename(asset['path'])}")
+        queued.append(asset)
+    return queued
+
+def approve_review_job(job, studio, review):
+    """An escalated asset was approved: render the final first, close the review only once there is a file to queue."""
+    asset = review["asset"]
+    if asset.get('profile', 'final') != 'final':
+        job.update(0.0, f"Rendering final: {asset['data'].get('headline_en', '')}")
+        final_path = studio.render_final(asset)
+        if not final_path:
+            raise RuntimeError("final render failed, the review stays open")
+        asset['path'], asset['profile'] = final_path, 'final'
+    if approval_policy.review_queue.decide(review["id"], True) is None:
+        job.log("Already decided in another session")
+        return None
+    if not asset.get('caption'):
+        apply_caption(asset, studio.brand)
+    for target, (job_id, created) in enqueue_for_publish(publish_queue, asset, manifest).items():
+        job.log(f"{'📥 Queued' if created else '⏭️ Already queued/posted'} {target} (job #{job_id})")
+    return asset
+
+def submit_job(slot, kind, fn, *args, label="", key=None):
+    job = job_runner.submit(kind, fn, *args, label=label, key=key)
+    st.session_state.jobs[slot] = job.id
+
+@st.fragment(run_every=1.0)
+def job_progress(slot, on_done):
+    """Polls this session's job in `slot`; once it finishes, applies the result and reruns the page."""
+    job = job_runner.get(st.session_state.jobs.get(slot))
+    if job is None:
+        st.session_state.jobs.pop(slot, None)
+        return
+    info = job.snapshot()
+    if job.active:
+        c1, c2 = st.columns([5, 1])
+        c1.progress(info["progress"], text=info["message"] or f"{info['label']} (queued)")
+        if c2.button("Cancel", key=f"cancel_{slot}"):
+            job.cancel()
+        for line in info["lines"][-5:]:
+            st.caption(line)
+        return
+    del st.session_state.jobs[slot]
+    if info["state"] == "failed":
+        st.session_state[f"notice_{slot}"] = ("error", f"{info['label']} failed: {info['error']}")
+    else:
+        on_done(job)
+    st.rerun()
+
+def show_notice(slot):
+    """Outcome of the last finished job in `slot`, shown once."""
+    notice = st.session_state.pop(f"notice_{slot}", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+
+def apply_images(job):
+    st.session_state.generated_assets = job.result or []
+    st.session_state.notice_images = ("success", f"✨ Created {len(st.session_state.generated_assets)} designs.")
+
+def apply_reel(job):
+    st.session_state.generated_assets.append(job.result)
+    st.session_state.notice_reel = ("success", "✅ Video Ready!")
+
+def apply_review(job):
+    st.session_state.notice_review = ("success", "\n\n".join(job.lines) or "Nothing was queued.")
+
+def apply_publish(job):
+    queued = job.result or []
+    # Queued assets leave the review list (by identity, not index)
+    st.session_state.generated_assets = [a for a in st.session_state.generated_assets
+                                         if not any(a is q for q in queued)]
+    st.session_state.notice_publish = ("success", "\n\n".join(job.lines) or "Nothing was queued.")
+
+# --- GRID HELPERS ---
+# Filtering and paging happen on the server, so only the visible page builds widgets and images.
+def set_news(items):
+    st.session_state.news_items = items
+    st.session_state.selected = {item['id'] for item in items} # New stories start selected
+    st.session_state.selection_version += 1
+
+def select_items(items, selected):
+    ids = {item['id'] for item in items}
+    if selected:
+        st.session_state.selected |= ids
+    else:
+        st.session_state.selected -= ids
+    st.session_state.selection_version += 1
+
+def toggle_selected(item_id, key):
+    if st.session_state[key]:
+        st.session_state.selected.add(item_id)
+    else:
+        st.session_state.selected.discard(item_id)
+
+def filter_bar(prefix, items):
+    """Type / source / date / search filters (widget keys under `prefix`). Returns the matching stories."""
+    types, sources = facets(items)
+    f1, f2, f3, f4 = st.columns([2, 2, 1, 2])
+    chosen_types = f1.multiselect("Type", types, key=f"{prefix}_types")
+    chosen_sources = f2.multiselect("Source", sources, key=f"{prefix}_sources")
+    days = DATE_RANGES[f3.selectbox("Published", list(DATE_RANGES), key=f"{prefix}_date")]
+    query = f4.text_input("Search", key=f"{prefix}_query", placeholder="Driver, team, keyword...")
+    since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+    return filter_items(items, chosen_types, chosen_sources, since, query)
+
+def page_of(prefix, items, sizes=(12, 24, 48), noun="stories"):
+    """Pager controls (widget keys under `prefix`). Returns the entries on the current page."""
+    p1, p2, p3 = st.columns([1, 1, 3])
+    per_page = p1.selectbox("Per page", sizes, key=f"{prefix}_per_page")
+    pages = max(math.ceil(len(items) / per_page), 1)
+    if st.session_state.get(f"{prefix}_page", 1) > pages: # Filter shrank the result
+        st.session_state[f"{prefix}_page"] = pages
+    page = p2.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{prefix}_page")
+    page_items, page, pages = paginate(items, page, per_page)
+    p3.caption(f"{len(items)} {noun} • page {page} of {pages}")
+    return page_items
 
 # --- SIDEBAR: Status & Config ---
 with st.sidebar:
-    if os.path.exists("assets/branding/logo.png"):
-        st.image("assets/branding/logo.png", use_container_width=True)
+    logo_path = os.path.join(brand["branding_path"], "logo.png")
+    if os.path.exists(logo_path):
+        st.image(logo_path, use_container_width=True)
     else:
         st.title("🏎️")
     st.header("System Status")
@@ -71,11 +335,41 @@ with st.sidebar:
     
     st.divider()
     st.write(" **Configuration**")
-    if os.getenv("IG_USERNAME"):
-        st.success(f"Instagram: {os.getenv('IG_USERNAME')}")
+    if os.getenv(ig_account["username_env"]):
+        st.success(f"Instagram: {os.getenv(ig_account['username_env'])}")
     else:
         st.error("Instagram: Not Configured")
         
+    st.divider()
+    with st.expander("📈 Stage Metrics"):
+        stages = metrics.snapshot()
+        if not stages:
+            st.caption("Nothing measured yet in this process.")
+        else:
+            st.dataframe([{
+                "Stage": stage,
+                "Calls": t["calls"],
+                "Avg s": round(t["seconds"] / t["calls"], 3) if t["calls"] else 0.0,
+                "Total s": round(t["seconds"], 1),
+                "MB": round(t["bytes"] / 1e6, 1),
+                "Cache hit %": round(100 * t["cache_hits"] / (t["cache_hits"] + t["cache_misses"]))
+                               if t["cache_hits"] + t["cache_misses"] else None,
+                "Errors": t["errors"],
+            } for stage, t in sorted(stages.items())], hide_index=True, use_container_width=True)
+            st.caption(f"Trace: {metrics.trace_path} • Prometheus: {metrics.prom_path}")
+
+    st.divider()
+    running = job_runner.jobs(active_only=True)
+    if running:
+        st.write(" **Background Jobs**")
+        for job in running:
+            st.caption(f"⏳ {job.label} — {int(job.progress * 100)}%")
+
+    st.divider()
+    if st.button("🧹 Clean Output", help="Apply OUTPUT_RETENTION_DAYS / OUTPUT_QUOTA_MB to the rendered files now"):
+        stats = collect_output_garbage(manifest, st.session_state.studio.output_path, publish_queue)
+        st.caption(f"Removed {len(stats['removed'])} file(s), freed {stats['freed_bytes'] / 1e6:.1f} MB.")
+
     st.divider()
     if st.button("Reset Session", type="secondary"):
         for key in list(st.session_state.keys()):
@@ -89,28 +383,36 @@ tab1, tab2, tab3 = st.tabs(["🌎 Scout (News)", "🎨 Studio (Create)", "🚀 P
 with tab1:
     st.subheader("Latest Motorsport News")
     
-    col_act, col_info = st.columns([1, 4])
+    col_act, col_refresh, col_info = st.columns([1, 1, 3])
     with col_act:
         if st.button("🔄 Fetch News", type="primary", use_container_width=True):
             with st.status("Scouting channels...", expanded=True) as status:
                 st.write("Connecting to RSS feeds...")
-                st.session_state.news_items = st.session_state.scout.fetch_news()
+                set_news(cached_news(st.session_state.scout))
                 status.update(label="Scouting Complete!", state="complete", expanded=False)
             st.rerun()
+    with col_refresh:
+        if st.button("♻️ Bypass Cache", use_container_width=True, help="Fetch the feeds again now"):
+            cached_news.clear()
+            set_news(st.session_state.scout.fetch_news(force=True)) # Full download, not a 304
+            st.rerun()
             
     if st.session_state.news_items:
+        page = page_of("scout", filter_bar("scout", st.session_state.news_items))
+        previews = thumbnailer.thumbnails(item['image_url'] for item in page)
         # Display as a clean grid
-        for item in st.session_state.news_items:
+        for item in page:
             with st.container(border=True):
                 c1, c2 = st.columns([1, 3])
                 with c1:
-                    if item['image_url']:
-                        st.image(item['image_url'], use_container_width=True)
+                    if previews.get(item['image_url']):
+                        st.image(previews[item['image_url']], use_container_width=True)
                     else:
-                        st.color_picker("", "#CCCCCC", disabled=True)
+                        st.caption("No photo")
                 with c2:
                     st.markdown(f"### {item['headline_en']}")
-                    st.caption(f"{item.get('type', 'NEWS')} • {item['source']} • {item['id']}")
+                    published = f" • {item['published'][:16].replace('T', ' ')}" if item.get('published') else ""
+                    st.caption(f"{item.get('type', 'NEWS')} • {item_source(item)}{published} • {item['id']}")
                     with st.expander("Read Summary"):
                         st.write(item.get('summary', 'No summary available.'))
 
@@ -121,134 +423,104 @@ with tab2:
     if not st.session_state.news_items:
         st.info("👋 Go to the **Scout** tab to fetch news first.")
     else:
-        # Toolbar
+        # Selection Grid (one page of checkboxes; the selection itself is a set of ids)
+        st.write("Select stories to generate content for:")
+        matching = filter_bar("studio", st.session_state.news_items)
         c_tool1, c_tool2, c_tool3 = st.columns([1, 1, 2])
-        if c_tool1.button("Select All"):
-            for i in range(len(st.session_state.news_items)): st.session_state[f"select_{i}"] = True
+        if c_tool1.button(f"Select All ({len(matching)})", help="Every story matching the filters"):
+            select_items(matching, True)
             st.rerun()
-        if c_tool2.button("Deselect All"):
-            for i in range(len(st.session_state.news_items)): st.session_state[f"select_{i}"] = False
+        if c_tool2.button(f"Deselect All ({len(matching)})"):
+            select_items(matching, False)
             st.rerun()
+        c_tool3.caption(f"{len(st.session_state.selected)} of {len(st.session_state.news_items)} stories selected")
 
-        # Selection Grid
-        st.write("Select stories to generate content for:")
-        selected_indices = []
-        
-        # Grid layout for selection (2 columns)
-        for i in range(0, len(st.session_state.news_items), 2):
+        page = page_of("studio", matching)
+        version = st.session_state.selection_version
+        for i in range(0, len(page), 2):
             cols = st.columns(2)
-            for j in range(2):
-                if i + j < len(st.session_state.news_items):
-                    item = st.session_state.news_items[i+j]
-                    with cols[j]:
-                        key = f"select_{i+j}"
-                        if key not in st.session_state: st.session_state[key] = True
-                        if st.checkbox(f"{item['headline_en']}", key=key):
-                            selected_indices.append(i+j)
+            for j, item in enumerate(page[i:i + 2]):
+                key = f"select_{item['id']}_{version}"
+                cols[j].checkbox(item['headline_en'], value=item['id'] in st.session_state.selected, key=key,
+                                 on_change=toggle_selected, args=(item['id'], key))
+        selected_items = [item for item in st.session_state.news_items if item['id'] in st.session_state.selected]
         
         st.divider()
         st.subheader("Generation Actions")
+
+        render_profile = st.radio(
+            "Render Profile", ["draft", "final"], horizontal=True,
+            help="Draft renders are fast, low-res previews. Approved drafts are re-rendered in final quality on publish."
+        )
         
         g1, g2 = st.columns(2)
         
         with g1:
-            if st.button("🖼️ Generate Images", type="primary", use_container_width=True):
-                st.session_state.generated_assets = [] # Reset
-                selected_items = [st.session_state.news_items[i] for i in selected_indices]
-                
-                progress_text = "Starting creative process..."
-                my_bar = st.progress(0, text=progress_text)
-                
-                for idx, item in enumerate(selected_items):
-                    my_bar.progress((idx) / len(selected_items), text=f"Design: {item['headline_en']}")
-                    image_path = st.session_state.studio.generate_image(item)
-                    if image_path:
-                         st.session_state.generated_assets.append({
-                             "type": "image",
-                             "path": image_path,
-                             "data": item,
-                             "approved": False
-                         })
-                my_bar.empty()
-                st.success(f"✨ Created {len(st.session_state.generated_assets)} designs.")
+            busy = "images" in st.session_state.jobs
+            if st.button("🖼️ Generate Images", type="primary", use_container_width=True, disabled=busy):
+                submit_job("images", "images", render_images_job, st.session_state.studio, selected_items, render_profile,
+                           label=f"{len(selected_items)} {render_profile} designs",
+                           key=("images", render_profile, tuple(item['id'] for item in selected_items)))
+                st.rerun()
                 
         with g2:
-             if st.button("🎥 Generate Reel / Short", type="primary", use_container_width=True):
-                 if not selected_indices:
+             busy = "reel" in st.session_state.jobs
+             if st.button("🎥 Generate Reel / Short", type="primary", use_container_width=True, disabled=busy):
+                 if not selected_items:
                      st.error("Select items above.")
                  else:
-                     selected_items_for_video = [st.session_state.news_items[i] for i in selected_indices]
-                     with st.status("🎬 Producing Video Digest...", expanded=True) as status:
-                         st.write("Generating AI Voiceovers...")
-                         # logic tied to studio gen
-                         st.write("Compositing video & effects...")
-                         video_path = st.session_state.studio.generate_video(selected_items_for_video)
-                         status.update(label="Production Complete!", state="complete", expanded=False)
-                     
-                     if video_path:
-                         st.success("✅ Video Ready!")
-                         st.video(video_path)
-                         st.session_state.generated_assets.append({
-                             "type": "video",
-                             "path": video_path,
-                             "data": {"headline_en": f"News Digest {len(selected_items_for_video)} Stories", "type": "REEL"},
-                             "approved": False,
-                             "caption": "⚡ Fast F1 News Digest! \n\nCheck out the top stories of the day! \n\n#F1 #RacingTamizhan #Shorts #Reels"
-                         })
+                     submit_job("reel", "reel", render_reel_job, st.session_state.studio, selected_items, render_profile,
+                                label=f"{render_profile} reel, {len(selected_items)} stories",
+                                key=("reel", render_profile, tuple(item['id'] for item in selected_items)))
+                     st.rerun()
+
+        for slot, on_done in (("images", apply_images), ("reel", apply_reel)):
+            if slot in st.session_state.jobs:
+                job_progress(slot, on_done)
+            show_notice(slot)
             
     # Review Section
     if st.session_state.generated_assets:
         st.divider()
         st.subheader("Review & Approve")
+
+        if st.button("⚖️ Apply Approval Policy", help="Tick the assets the policy would auto-approve; escalations stay for you."):
+            for i, asset in enumerate(st.session_state.generated_assets):
+                asset['policy'] = approval_policy.evaluate(asset)
+                asset['approved'] = asset['policy']['action'] == 'approve'
+                st.session_state[f"approve_{i}"] = asset['approved']
+            st.rerun()
         
-        for i, asset in enumerate(st.session_state.generated_assets):
+        # Widget keys keep the asset's position in the full list, so edits survive paging
+        page = page_of("review", list(enumerate(st.session_state.generated_assets)), sizes=(10, 20, 50), noun="assets")
+        previews = thumbnailer.thumbnails(asset['path'] for _, asset in page)
+        for i, asset in page:
             with st.container(border=True):
                 col1, col2 = st.columns([1, 1])
                 with col1:
-                    # Display based on type
-                    if asset['type'] == 'video':
+                    # Previews only; the full-size file is sent when asked for
+                    if asset['type'] == 'video' and st.toggle("▶️ Play", key=f"play_{i}"):
                         st.video(asset['path'])
-                        st.caption(os.path.basename(asset['path']))
-                    else:
-                        st.image(asset['path'], caption=os.path.basename(asset['path']))
+                    elif previews.get(asset['path']):
+                        st.image(previews[asset['path']])
+                    st.caption(os.path.basename(asset['path']))
+                    if asset.get('profile') == 'draft':
+                        st.caption("📝 Draft preview - final quality is rendered on publish.")
                     
                 with col2:
                     st.markdown(f"**{asset['data']['headline_en']}**")
-                    # Smart Caption Generation
-                    title = asset['data']['headline_en']
-                    summary = asset['data'].get('summary', '')
-                    
-                    # Basic Keyword Matching for Tags
-                    tags = ["#RacingTamizhan", "#Motorsport", "#News"]
-                    if "F1" in title or "Formula 1" in title: tags.extend(["#F1", "#Formula1"])
-                    if "MotoGP" in title: tags.extend(["#MotoGP", "#BikeRacing"])
-                    if "Red Bull" in title: tags.append("#RedBullRacing")
-                    if "Ferrari" in title: tags.append("#ScuderiaFerrari")
-                    if "Hamilton" in title: tags.append("#LewisHamilton")
-                    if "Verstappen" in title: tags.append("#MaxVerstappen")
-                    
-                    # Dynamic Prefix based on Type
-                    item_type = asset['data'].get('type', 'NEWS')
-                    emoji_map = {
-                        "BREAKING": "🚨 BREAKING:",
-                        "RESULT": "🏆 RESULT:",
-                        "RUMOUR": "👀 RUMOUR:",
-                        "OFFICIAL": "📝 OFFICIAL:",
-                        "ANALYSIS": "🧠 ANALYSIS:",
-                        "NEWS": "📰 NEWS:"
-                    }
-                    prefix = emoji_map.get(item_type, "📰 NEWS:")
-                    
-                    # COMBINED CAPTION: Prefix + Title + SUMMARY + Call to Action + Tags
-                    default_caption = f"{prefix} {title}\n\n{summary}\n\nFollow @racing.tamizhan for more updates!\n\n{' '.join(tags)}"
+                    # Type prefix, summary and entity hashtags (memoized per story)
+                    suggested = default_caption(asset['data'], brand)
                     
                     # Editable Caption
-                    caption = st.text_area("Caption", value=default_caption, height=250, key=f"caption_{i}")
+                    caption = st.text_area("Caption", value=asset.get('caption') or suggested, height=250, key=f"caption_{i}")
                     asset['caption'] = caption # Store for publisher
                     
                     # Approve Toggle
                     approved = st.checkbox("Approve for Upload", value=asset['approved'], key=f"approve_{i}")
                     st.session_state.generated_assets[i]['approved'] = approved
+                    if asset.get('policy'):
+                        st.caption(f"Policy: {asset['policy']['action']} ({asset['policy']['rule']})")
 
 # --- TAB 3: PUBLISHER ---
 with tab3:
@@ -258,63 +530,89 @@ with tab3:
     # Filter approved
     approved_list = [a for a in st.session_state.generated_assets if a['approved']]
     
+    # Credentials Check
+    ig_user = os.getenv(ig_account["username_env"])
+    if not ig_user:
+        st.error(f"Missing {ig_account['username_env']} in .env")
+
     if not approved_list:
         st.info("No assets approved yet. Go to Studio tab.")
     else:
         st.write(f"Ready to upload **{len(approved_list)}** assets.")
         
-        # Credentials Check
-        ig_user = os.getenv("IG_USERNAME")
-        if not ig_user:
-            st.error("Missing IG_USERNAME in .env")
-        
-        if st.button("🚀 Launch Publish Sequence", type="primary", disabled=(not ig_user)):
-            st.write("Initializing Publisher...")
-            
-            # Login (Mock or Real)
-            with st.spinner("Logging into Instagram..."):
-                login_success = st.session_state.publisher.login_instagram(ig_user, os.getenv("IG_PASSWORD"))
-            
-            if not login_success:
-                st.error("❌ Instagram Login Failed. Check credentials in .env")
-            else:
-                st.success("✅ Instagram Login Successful!")
-                
-                for asset in approved_list:
-                    # Handle list of paths for display
-                    display_name = asset['path'][0] if isinstance(asset['path'], list) else asset['path']
-                    st.write(f"Uploading {os.path.basename(display_name)}...")
-                    
-                    # Call publisher real methods here
-                    upload_success = False
-                    caption = asset.get('caption', 'No caption')
-                    
-                    if asset['type'] == 'image':
-                         upload_success = st.session_state.publisher.upload_instagram_photo(asset['path'], caption)
-                    elif asset['type'] == 'video':
-                         # Upload to Insta Reel AND YouTube Short
-                         st.write(f"  - Uploading Reel...")
-                         r1 = st.session_state.publisher.upload_instagram_reel(asset['path'], caption)
-                         
-                         st.write(f"  - Uploading YouTube Short...")
-                         r2 = st.session_state.publisher.upload_youtube_short(asset['path'], asset['data']['headline_en'], caption)
-                         
-                         upload_success = r1 or r2 # Success if at least one works? or both? Let's say one.
-                    
-                    if upload_success:
-                        st.success(f"✅ Uploaded: {asset['data']['headline_en']}")
-                        # Auto-Cleanup: Remove file and remove from list
-                        try:
-                            if os.path.exists(asset['path']):
-                                os.remove(asset['path'])
-                                st.write(f"🗑️ Cleaned up local file.")
-                        except Exception as e:
-                            st.warning(f"Could not delete file: {e}")
-                        
-                        # Remove from session state
-                        st.session_state.generated_assets.pop(i)
-                        st.rerun() # Rerun to refresh the list immediately
-                    else:
-                        st.error(f"❌ Failed to upload: {asset['data']['headline_en']}")
-                    
-                st.balloons()
+        busy = "publish" in st.session_state.jobs
+        if st.button("🚀 Launch Publish Sequence", type="primary", disabled=(not ig_user) or busy):
+            submit_job("publish", "publish", publish_job, st.session_state.studio, approved_list,
+                       label=f"Publish {len(approved_list)} assets")
+            st.rerun()
+
+    if "publish" in st.session_state.jobs:
+        job_progress("publish", apply_publish)
+    show_notice("publish")
+
+    # Escalations from headless runs (main.py / daemon.py)
+    # (only this brand's; a multi-brand daemon tags each asset with its brand)
+    pending_reviews = [r for r in approval_policy.review_queue.pending()
+                       if r["asset"].get('brand', brand["name"]) == brand["name"]]
+    if pending_reviews:
+        st.divider()
+        st.subheader(f"Escalated for Review ({len(pending_reviews)})")
+        for review in pending_reviews:
+            asset = review["asset"]
+            with st.container(border=True):
+                r1, r2 = st.columns([1, 2])
+                with r1:
+                    preview = thumbnailer.thumbnail(asset['path'])
+                    if not os.path.exists(asset['path']):
+                        st.caption(f"Draft no longer on disk: {os.path.basename(asset['path'])}")
+                    elif preview:
+                        st.image(preview)
+                with r2:
+                    st.markdown(f"**{asset['data'].get('headline_en', '')}**")
+                    st.caption(f"Rule: {review['rule']} • {', '.join(review['reasons']) or 'no rule matched'}")
+                    b1, b2 = st.columns(2)
+                    busy = "review" in st.session_state.jobs
+                    if b1.button("✅ Approve", key=f"review_ok_{review['id']}", disabled=busy):
+                        # The final is rendered from the cached inputs in the background (or on the
+                        # render queue), so it doesn't need the draft file; the page stays usable
+                        submit_job("review", "review", approve_review_job, st.session_state.studio, review,
+                                   label=f"Approve: {asset['data'].get('headline_en', '')}",
+                                   key=f"review_{review['id']}")
+                        st.rerun()
+                    if b2.button("🗑️ Reject", key=f"review_no_{review['id']}", disabled=busy):
+                        approval_policy.review_queue.decide(review["id"], False)
+                        st.rerun()
+
+    if "review" in st.session_state.jobs:
+        job_progress("review", apply_review)
+    show_notice("review")
+
+    # Queue Status
+    st.divider()
+    st.subheader("Publish Queue")
+    counts = publish_queue.counts()
+    q1, q2, q3, q4 = st.columns(4)
+    q1.metric("Queued", counts["queued"])
+    q2.metric("Uploading", counts["running"])
+    q3.metric("Posted", counts["done"])
+    q4.metric("Failed", counts["failed"])
+
+    if st.button("🔄 Refresh Status"):
+        st.rerun()
+
+    jobs = publish_queue.jobs(limit=50)
+    if jobs:
+        st.dataframe([{
+            "Job": j["id"],
+            "Target": j["target"],
+            "Asset": os.path.basename(j["asset_path"]),
+            "Headline": j["asset"]["data"].get("headline_en", ""),
+            "State": j["state"],
+            "Attempts": j["attempts"],
+            "Error": j["last_error"] or "",
+        } for j in jobs], use_container_width=True, hide_index=True)
+
+        for j in jobs:
+            if j["state"] == "failed" and st.button(f"Retry job #{j['id']}", key=f"retry_{j['id']}"):
+                publish_queue.retry(j["id"])
+                st.rerun()
@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import logging
+import unicodedata
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Entities")
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "entities.json")
+
+TOKEN_RE = re.compile(r"\w+")
+
+_index_cache = {}
+
+
+def _normalize(token):
+    """Casefold and strip accents so 'Pérez' and 'PEREZ' hit the same trie node."""
+    token = unicodedata.normalize("NFKD", token)
+    return "".join(c for c in token if not unicodedata.combining(c)).casefold()
+
+
+class EntityIndex:
+    """
+    Data-driven index of drivers, riders, teams and series.
+
+    Every alias is compiled into a token trie, so matching a headline is a single
+    left-to-right pass whose cost depends on the headline length (and the longest
+    alias), not on how many names are in the roster.
+    """
+
+    def __init__(self, config):
+        self.entities = {}
+        self.default_colors = tuple(tuple(c) for c in config.get("default_colors", [[15, 20, 35], [255, 0, 50]]))
+        self._trie = {}
+        self._max_alias_len = 0
+
+        for entry in config.get("series", []):
+            self._add(entry, "series")
+        for entry in config.get("teams", []):
+            self._add(entry, "team")
+        for entry in config.get("drivers", []):
+            self._add(entry, "driver")
+        for entry in config.get("riders", []):
+            self._add(entry, "rider")
+
+        # Resolve series for people through their team
+        for entity in self.entities.values():
+            if not entity["series"] and entity["team"] in self.entities:
+                entity["series"] = self.entities[entity["team"]]["series"]
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CONFIG):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _add(self, entry, kind):
+        name = entry["name"]
+        self.entities[name] = {
+            "name": name,
+            "kind": kind,
+            "series": name if kind == "series" else entry.get("series"),
+            "team": entry.get("team"),
+            "colors": tuple(tuple(c) for c in entry["colors"]) if entry.get("colors") else None,
+            "hashtags": entry.get("hashtags", []),
+        }
+        for alias in set(entry.get("aliases", []) + [name]):
+            tokens = [_normalize(t) for t in TOKEN_RE.findall(alias)]
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if "$" in node and node["$"] != name:
+                logger.warning(f"Alias '{alias}' is shared by {node['$']} and {name}, keeping {node['$']}")
+                continue
+            node["$"] = name
+            self._max_alias_len = max(self._max_alias_len, len(tokens))
+
+    def match(self, text):
+        """
+        Find every entity mentioned in `text`.
+        Returns a list of dicts (name, kind, series, team, start, end, text) in order of
+        appearance. Overlaps resolve to the longest alias ("Red Bull Racing" over "Red Bull").
+        """
+        if not text:
+            return []
+        spans = [(m.start(), m.end(), _normalize(m.group())) for m in TOKEN_RE.finditer(text)]
+        matches = []
+        i = 0
+        while i < len(spans):
+            node = self._trie
+            found = None
+            for j in range(i, min(i + self._max_alias_len, len(spans))):
+                node = node.get(spans[j][2])
+                if node is None:
+                    break
+                if "$" in node:
+                    found = (j, node["$"])
+            if found:
+                j, name = found
+                entity = self.entities[name]
+                start, end = spans[i][0], spans[j][1]
+                matches.append({
+                    "name": name,
+                    "kind": entity["kind"],
+                    "series": entity["series"],
+                    "team": entity["team"],
+                    "start": start,
+                    "end": end,
+                    "text": text[start:end],
+                })
+                i = j + 1
+            else:
+                i += 1
+        return matches
+
+    def match_item(self, item):
+        """Entities for a news item, reusing the Scout's result when it is already attached."""
+        if "entities" in item:
+            return item["entities"]
+        return self.match(item.get("headline_en", ""))
+
+    def colors(self, matches):
+        """(primary, accent) palette of the first team mentioned directly or through a driver/rider."""
+        for m in matches:
+            entity = self.entities.get(m["name"])
+            if not entity:
+                continue
+            if entity["colors"]:
+                return entity["colors"]
+            team = self.entities.get(entity["team"])
+            if team and team["colors"]:
+                return team["colors"]
+        return self.default_colors
+
+    def hashtags(self, matches):
+        """Unique hashtags for the matched entities, series tags included, in order of appearance."""
+        tags = []
+        for m in matches:
+            entity = self.entities.get(m["name"])
+            if not entity:
+                continue
+            series = self.entities.get(entity["series"]) if entity["kind"] != "series" else None
+            for tag in entity["hashtags"] + (series["hashtags"] if series else []):
+                if tag not in tags:
+                    tags.append(tag)
+        return tags
+
+    def series(self, matches):
+        """Most mentioned series, or None when nothing matched."""
+        counts = {}
+        for m in matches:
+            if m["series"]:
+                counts[m["series"]] = counts.get(m["series"], 0) + 1
+        if not counts:
+            return None
+        return max(counts, key=counts.get)
+
+
+def load_index(path=DEFAULT_CONFIG):
+    """Shared, compiled index per config file (built once per process)."""
+    if path not in _index_cache:
+        _index_cache[path] = EntityIndex.from_file(path)
+        logger.info(f"Loaded {len(_index_cache[path].entities)} entities from {path}")
+    return _index_cache[path]
@@ -0,0 +1,75 @@
+import math
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+# Server-side filtering and paging for the dashboard grids: only the visible page gets
+# widgets and images, whatever the number of stories.
+
+DATE_RANGES = {
+    "Any time": None,
+    "Last 24 hours": 1,
+    "Last 3 days": 3,
+    "Last 7 days": 7,
+}
+
+
+def item_source(item):
+    """Where a story came from: the feed's host (www. dropped), else the Scout source label."""
+    host = urlparse(item.get('feed') or item.get('link') or "").hostname or ""
+    return host[4:] if host.startswith("www.") else host or item.get('source', "")
+
+
+def item_published(item):
+    published = item.get('published')
+    if not published:
+        return None
+    try:
+        value = datetime.fromisoformat(published)
+    except (TypeError, ValueError):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _search_text(item):
+    names = " ".join(e["name"] for e in item.get('entities') or [])
+    return f"{item.get('headline_en', '')} {item.get('summary', '')} {names}".casefold()
+
+
+def filter_items(items, types=None, sources=None, since=None, query=""):
+    """
+    Stories matching every given filter: type in `types`, source in `sources`, published at
+    or after `since` (undated stories only pass without it) and every word of `query` in
+    the headline, summary or entity names.
+    """
+    terms = query.casefold().split()
+    result = []
+    for item in items:
+        if types and item.get('type', 'NEWS') not in types:
+            continue
+        if sources and item_source(item) not in sources:
+            continue
+        if since is not None:
+            published = item_published(item)
+            if published is None or published < since:
+                continue
+        if terms:
+            text = _search_text(item)
+            if not all(t in text for t in terms):
+                continue
+        result.append(item)
+    return result
+
+
+def paginate(items, page, per_page):
+    """(items on the page, page clamped to range, page count); pages are 1-based."""
+    pages = max(math.ceil(len(items) / per_page), 1)
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    return items[start:start + per_page], page, pages
+
+
+def facets(items):
+    """Sorted distinct types and sources, for the filter widgets."""
+    types = sorted({item.get('type', 'NEWS') for item in items})
+    sources = sorted({item_source(item) for item in items})
+    return types, sources
@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from publisher import PUBLISH_TARGETS, TARGET_PLATFORM
+from preflight import file_hash
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("JobQueue")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    asset_path TEXT NOT NULL,
+    target TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS jobs_asset ON jobs (asset_path);
+"""
+
+
+class PublishQueue:
+    """
+    Durable SQLite queue of publish jobs, one per (asset, target).
+
+    Jobs survive crashes and restarts. The idempotency key (target + content hash of the
+    file, unless the asset carries its own key) makes re-enqueueing the same asset a no-op,
+    so a rerun never posts twice.
+    """
+
+    STATES = ("queued", "running", "done", "failed")
+
+    def __init__(self, db_path="output/publish_queue.db", max_attempts=5, backoff_base=30.0, backoff_max=1800.0,
+                 lease_seconds=1800):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe to use from any thread
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row):
+        job = dict(row)
+        job["asset"] = json.loads(job["asset"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, asset, target):
+        """Queue one target for an asset. Returns (job_id, created); created is False for duplicates."""
+        if target not in TARGET_PLATFORM:
+            raise ValueError(f"Unknown publish target: {target}")
+        content_key = asset.get('idempotency_key') or file_hash(asset['path'])
+        key = hashlib.sha256(f"{target}:{content_key}".encode()).hexdigest()
+        now = time.time()
+        with self._db() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (idempotency_key, asset_path, target, asset, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, asset['path'], target, json.dumps(asset, default=str), now, now),
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid, True
+            row = conn.execute("SELECT id FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+            return row["id"], False
+
+    def enqueue_asset(self, asset):
+        """Queue every target for the asset type (see PUBLISH_TARGETS). Returns {target: (job_id, created)}."""
+        return {target: self.enqueue(asset, target) for target in PUBLISH_TARGETS.get(asset['type'], [])}
+
+    def claim(self, worker_id):
+        """Atomically take the next due job, or None."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' AND next_attempt_at <= ? ORDER BY id LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, worker = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            job = self._row(row)
+            job["attempts"] += 1
+            job["state"] = "running"
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, job_id, result):
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id),
+            )
+
+    def fail(self, job_id, error, retryable=True):
+        """Schedule a retry with exponential backoff, or give up after max_attempts (at once if not retryable)."""
+        with self._db() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            now = time.time()
+            if not retryable or row["attempts"] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET state = 'failed', last_error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (error, now, job_id),
+                )
+                logger.error(f"Job {job_id} failed permanently: {error}")
+            else:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (row["attempts"] - 1)))
+                conn.execute(
+                    "UPDATE jobs SET state = 'queued', last_error = ?, next_attempt_at = ?, lease_until = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (error, now + delay, now, job_id),
+                )
+                logger.warning(f"Job {job_id} failed ({error}), retrying in {delay:.0f}s")
+
+    def recover(self):
+        """Requeue jobs whose worker died mid-upload (lease expired). Returns how many."""
+        with self._db() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE state = 'running' AND lease_until < ?",
+                (time.time(), time.time()),
+            )
+            return cursor.rowcount
+
+    def retry(self, job_id):
+        """Manually requeue a failed job."""
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = 0, next_attempt_at = 0, updated_at = ? "
+                "WHERE id = ? AND state = 'failed'",
+                (time.time(), job_id),
+            )
+
+    def asset_settled(self, asset_path):
+        """True once every job for this file is done (a failed one may still be retried from the dashboard)."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT state FROM jobs WHERE asset_path = ?", (asset_path,)).fetchall()
+        return bool(rows) and all(r["state"] == "done" for r in rows)
+
+    def pending_paths(self):
+        """Files that unfinished jobs still need: queued, running, or failed and waiting for a manual retry."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT DISTINCT asset_path FROM jobs WHERE state != 'done'").fetchall()
+        return [r["asset_path"] for r in rows]
+
+    def jobs(self, limit=100):
+        with self._db() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in self.STATES}
+        counts.update({r["state"]: r["n"] for r in rows})
+        return counts
+
+
+class PublishWorkerPool:
+    """
+    Worker threads draining a PublishQueue through a Publisher.
+    More workers = more uploads in flight (still capped per platform by Publisher.platform_limits).
+    """
+
+    def __init__(self, queue, publisher, workers=2, poll_interval=1.0, ig_credentials=None, cleanup=True,
+                 manifest=None):
+        self.queue = queue
+        self.publisher = publisher
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.ig_credentials = ig_credentials
+        self.cleanup = cleanup
+        self.manifest = manifest # AssetManifest; settled files are marked published
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return self
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted job(s).")
+        self._stop.clear()
+        for n in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"publish-worker-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def drain(self, timeout=None):
+        """Block until nothing is queued or running (retries waiting on backoff count as queued)."""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            counts = self.queue.counts()
+            if counts["queued"] == 0 and counts["running"] == 0:
+                return True
+            if deadline and time.time() > deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _run(self):
+        worker_id = f"{os.getpid()}-{threading.current_thread().name}-{uuid.uuid4().hex[:6]}"
+        while not self._stop.is_set():
+            job = self.queue.claim(worker_id)
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.process(job)
+
+    def process(self, job):
+        target, asset = job["target"], job["asset"]
+        try:
+            if TARGET_PLATFORM[target] == "instagram" and self.ig_credentials:
+                if not self.publisher.login_instagram(*self.ig_credentials):
+                    raise RuntimeError("Instagram login failed")
+            result = self.publisher.publish_target(asset, target)
+        except Exception as e:
+            self.queue.fail(job["id"], str(e))
+            return
+
+        if not result["ok"]:
+            self.queue.fail(job["id"], result.get("error") or f"{target} upload failed",
+                            retryable=result.get("retryable", True))
+            return
+
+        self.queue.complete(job["id"], result)
+        logger.info(f"Job {job['id']} done: {target} {asset['path']}")
+        settled = self.queue.asset_settled(asset['path'])
+        if settled and self.manifest:
+            self.manifest.set_state(asset['path'], "published")
+        # Pre-flight's fixed copies (output/preflight/) are only needed until then
+        preflight = getattr(self.publisher, "preflight", None)
+        if settled and preflight and os.path.exists(asset['path']):
+            preflight.discard(asset['path'])
+        # Auto-Cleanup once every target for this file has settled
+        if self.cleanup and settled and os.path.exists(asset['path']):
+            try:
+                os.remove(asset['path'])
+            except OSError as e:
+                logger.warning(f"Could not delete {asset['path']}: {e}")
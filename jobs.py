@@ -0,0 +1,142 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Jobs")
+
+ACTIVE_STATES = ("queued", "running")
+
+
+class Job:
+    """
+    One background task. The work function gets the job as its first argument and reports
+    through it: `job.update(progress, message)`, `job.log(line)`, and `job.cancelled` to stop early.
+    """
+
+    def __init__(self, kind, label="", key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label
+        self.key = key
+        self.state = "queued" # queued -> running -> done / failed / cancelled
+        self.progress = 0.0
+        self.message = ""
+        self.lines = []
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    def update(self, progress=None, message=None):
+        with self._lock:
+            if progress is not None:
+                self.progress = min(max(float(progress), 0.0), 1.0)
+            if message is not None:
+                self.message = message
+
+    def log(self, line):
+        with self._lock:
+            self.lines.append(line)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def snapshot(self):
+        """Consistent copy of the fields the UI shows."""
+        with self._lock:
+            return {
+                "id": self.id, "kind": self.kind, "label": self.label, "state": self.state,
+                "progress": self.progress, "message": self.message, "lines": list(self.lines),
+                "error": self.error, "created_at": self.created_at, "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobRunner:
+    """
+    Thread pool for work that must not run inside a Streamlit script run (renders, final
+    encodes, publishing). One runner is shared by every session, so a job keeps going across
+    reruns and closed tabs, and any session can look it up by ID.
+
+    Jobs submitted with a `key` are deduplicated: while a job with the same key is queued or
+    running, submit() returns that job instead of starting the same work twice.
+    """
+
+    def __init__(self, workers=2, keep=100):
+        self.workers = workers
+        self.keep = keep # Finished jobs remembered for late pollers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {} # id -> Job, in submission order
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, label="", key=None, **kwargs):
+        """Run fn(job, *args, **kwargs) in the background. Returns the Job (possibly an existing one)."""
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and job.active:
+                        return job
+            job = Job(kind, label=label, key=key)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Job {job.id} ({kind}) submitted: {label}")
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job.state = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.state = "cancelled" if job.cancelled else "done"
+            job.update(progress=1.0)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job.finished_at = time.time()
+        logger.info(f"Job {job.id} ({job.kind}) {job.state} in {job.finished_at - job.started_at:.1f}s")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.keep, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, kind=None, active_only=False):
+        """Newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in reversed(jobs) if (kind is None or j.kind == kind) and (not active_only or j.active)]
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes (tests / scripts). Returns the Job."""
+        deadline = None if timeout is None else time.time() + timeout
+        job = self.get(job_id)
+        while job is not None and job.active:
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError(f"Job {job_id} still {job.state}")
+            time.sleep(0.02)
+        return job
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -1,9 +1,15 @@
 import os
 import json
 import logging
+import argparse
+import threading
 from scout import Scout
-from studio import Studio
-from publisher import Publisher
+from renderq import make_studio
+from publisher import get_publisher
+from jobqueue import PublishQueue, PublishWorkerPool
+from pipeline import Pipeline
+from policy import ApprovalPolicy
+from brands import get_brand
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,13 +19,61 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Orchestrator")
 
-def main():
+_review_lock = threading.Lock()
+
+def console_approve(asset):
+    """Human-in-the-loop review on the terminal (one prompt at a time)."""
+    with _review_lock:
+        print(f"\nReview Asset: {asset['type']} - {asset['path']}")
+        if asset['type'] == 'image':
+            print(f"Headline: {asset['data']['headline_en']}")
+        return input("Approve for upload? (y/n): ").lower() == 'y'
+
+def apply_caption(asset, brand=None):
+    brand = brand or get_brand()
+    tag = brand['hashtags'][0] if brand['hashtags'] else ""
+    if asset['type'] == 'image':
+        asset['caption'] = f"Breaking News! 🏎️💨\n\n{asset['data']['headline_en']}\n\n{tag} #F1 #MotoGP"
+    elif asset['type'] == 'video':
+        asset['caption'] = f"Top Racing Stories! 🏎️🔥 {tag} #Reels"
+        asset['data']['headline_en'] = f"Latest Racing News | {brand['title']}" # YouTube title
+    return asset
+
+def enqueue_for_publish(publish_queue, asset, manifest=None, review_queue=None):
+    """
+    Queue every target for an approved asset, mark its file queued (so GC leaves it alone)
+    and add the story to the policy's dedup index, so later runs don't post it again.
+    """
+    jobs = publish_queue.enqueue_asset(asset)
+    if manifest:
+        manifest.set_state(asset['path'], "queued")
+    if review_queue:
+        review_queue.remember(review_queue.fingerprints(asset), asset['data'].get('id'))
+    return jobs
+
+def ig_credentials(brand=None):
+    """(username, password) from the environment variables the brand's Instagram account names."""
+    account = (brand or get_brand())["accounts"]["instagram"]
+    ig_user = os.getenv(account["username_env"])
+    ig_pass = os.getenv(account["password_env"])
+    if not (ig_user and ig_pass):
+        logger.warning(f"Instagram credentials not set in .env ({account['username_env']} / {account['password_env']})")
+        return None
+    return ig_user, ig_pass
+
+def main(approve=None):
+    """
+    approve(asset) -> bool reviews each draft; defaults to the rule-based ApprovalPolicy
+    (config/approval_policy.json), which escalates anything it can't decide to the review queue.
+    """
     logger.info("Starting Racing Tamizhan Auto System...")
+    approve = approve or ApprovalPolicy()
 
     # Initialize Agents
     scout = Scout()
-    studio = Studio()
-    publisher = Publisher()
+    studio = make_studio(profile="draft") # Fast drafts for review, final render on approval
+    publisher = get_publisher(studio.brand)
+    publish_queue = PublishQueue(studio.brand["publish_queue"])
 
     # 1. Scout: Fetch Content
     logger.info("Agent Alpha (Scout) working...")
@@ -39,7 +93,8 @@ def main():
             generated_assets.append({
                 "type": "image",
                 "path": image_path,
-                "data": item
+                "data": item,
+                "profile": studio.profile
             })
             
     # Generate Video (Reel) if enough items
@@ -49,22 +104,25 @@ def main():
              generated_assets.append({
                 "type": "video",
                 "path": video_path,
-                "data": {"headline_en": "Top Stories", "id": "reel"} # Generic data for reel
+                "data": {"headline_en": "Top Stories", "id": "reel"}, # Generic data for reel
+                "items": news_items,
+                "profile": studio.profile
             })
 
-    # 3. Human-in-the-Loop Review
-    logger.info("Human Review Required.")
-    logger.info(f"Assets generated in: {studio.output_path}")
+    # 3. Review (approval policy, or a person with --interactive)
+    logger.info(f"Reviewing assets generated in: {studio.output_path}")
     
     approved_assets = []
     for asset in generated_assets:
-        print(f"\nReview Asset: {asset['type']} - {asset['path']}")
-        if asset['type'] == 'image':
-            print(f"Headline: {asset['data']['headline_en']}")
-        
-        choice = input("Approve for upload? (y/n): ").lower()
-        if choice == 'y':
-            approved_assets.append(asset)
+        if approve(asset):
+            # Re-render at publish quality from the cached inputs
+            final_path = studio.render_final(asset)
+            if final_path:
+                asset['path'] = final_path
+                asset['profile'] = "final"
+                approved_assets.append(asset)
+            else:
+                logger.error(f"Final render failed for {asset['path']}")
     
     if not approved_assets:
         logger.info("No assets approved for upload.")
@@ -74,32 +132,73 @@ def main():
     logger.info(f"Agent Gamma (Publisher) uploading {len(approved_assets)} assets...")
     
     # Login check
-    ig_user = os.getenv("IG_USERNAME")
-    ig_pass = os.getenv("IG_PASSWORD")
-    if ig_user and ig_pass:
-        publisher.login_instagram(ig_user, ig_pass)
+    credentials = ig_credentials(studio.brand)
+
+    if os.getenv("DRY_RUN", "1") == "1":
+        # Set DRY_RUN=0 in .env to enable real uploads
+        for asset in approved_assets:
+            logger.info(f"(Dry Run) Publishing {asset['type']}: {asset['path']}")
     else:
-        logger.warning("Instagram credentials not set in .env")
+        # Durable queue: a crash or rerun resumes pending jobs and never posts the same file twice
+        for asset in approved_assets:
+            enqueue_for_publish(publish_queue, apply_caption(asset, studio.brand), studio.manifest,
+                                getattr(approve, "review_queue", None))
 
-    for asset in approved_assets:
-        if asset['type'] == 'image':
-            # Instagram Photo
-            caption = f"Breaking News! 🏎️💨\n\n{asset['data']['headline_en']}\n\n#RacingTamizhan #F1 #MotoGP"
-            # publisher.upload_instagram_photo(asset['path'], caption) # Uncomment to enable
-            logger.info(f"(Dry Run) Uploading Photo: {asset['path']}")
-            
-        elif asset['type'] == 'video':
-            # Instagram Reel
-            caption = "Top Racing Stories! 🏎️🔥 #RacingTamizhan #Reels"
-            # publisher.upload_instagram_reel(asset['path'], caption) # Uncomment to enable
-            logger.info(f"(Dry Run) Uploading Reel: {asset['path']}")
-            
-            # YouTube Short
-            title = "Latest Racing News | Racing Tamizhan"
-            # publisher.upload_youtube_short(asset['path'], title) # Uncomment to enable
-            logger.info(f"(Dry Run) Uploading Short: {asset['path']}")
+        pool = PublishWorkerPool(publish_queue, publisher, workers=int(os.getenv("PUBLISH_WORKERS", "3")),
+                                 ig_credentials=credentials, manifest=studio.manifest).start()
+        pool.drain()
+        pool.stop()
+        logger.info(f"Publish queue: {publish_queue.counts()}")
 
     logger.info("Mission Complete.")
 
+def run_pipeline(approve=None):
+    """
+    Same flow as main(), but Scout, Studio and Publisher run as concurrent stages:
+    the first story is rendered (and queued for upload) while the rest are still being fetched.
+    """
+    logger.info("Starting Racing Tamizhan Auto System (pipelined)...")
+    approve = approve or ApprovalPolicy()
+
+    scout = Scout()
+    studio = make_studio(profile="draft") # Fast drafts for review, final render on approval
+
+    pool = None
+    publish = None
+    if os.getenv("DRY_RUN", "1") != "1":
+        publish_queue = PublishQueue(studio.brand["publish_queue"])
+        pool = PublishWorkerPool(publish_queue, get_publisher(studio.brand), workers=int(os.getenv("PUBLISH_WORKERS", "3")),
+                                 ig_credentials=ig_credentials(studio.brand), manifest=studio.manifest).start()
+        publish = lambda asset: enqueue_for_publish(publish_queue, apply_caption(asset, studio.brand), studio.manifest,
+                                                    getattr(approve, "review_queue", None))
+
+    pipeline = Pipeline(
+        scout, studio, approve=approve, publish=publish,
+        scout_workers=int(os.getenv("SCOUT_WORKERS", "4")),
+        render_workers=int(os.getenv("RENDER_WORKERS", "2")),
+    )
+    try:
+        stats = pipeline.run()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        raise
+    finally:
+        if pool:
+            pool.drain()
+            pool.stop()
+            logger.info(f"Publish queue: {publish_queue.counts()}")
+
+    logger.info(f"Mission Complete. {stats}")
+    return stats
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Racing Tamizhan Auto System")
+    parser.add_argument("--pipeline", action="store_true", help="Run Scout, Studio and Publisher as concurrent stages")
+    parser.add_argument("--interactive", action="store_true", help="Approve each asset on the terminal instead of the policy")
+    args = parser.parse_args()
+
+    approve = console_approve if args.interactive else None
+    if args.pipeline:
+        run_pipeline(approve)
+    else:
+        main(approve)
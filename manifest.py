@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+from contextlib import contextmanager
+from preflight import file_hash
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Manifest")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    render_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    item_ids TEXT NOT NULL,
+    items TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'rendered',
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_path ON assets (path);
+CREATE INDEX IF NOT EXISTS assets_state ON assets (state, used_at);
+"""
+
+STATES = ("rendered", "queued", "published")
+
+# What the Studio writes into an output directory (cards, reels, reel segment dirs). The orphan
+# sweep only looks at these, so databases, caches and anything else sharing the directory stay.
+OUTPUT_PREFIXES = ("slide1_", "reel_", "segments_")
+
+
+def render_key(kind, profile, items, settings=None):
+    """Identity of a render: asset kind, profile (and its settings) and the full story data."""
+    payload = json.dumps({"kind": kind, "profile": profile, "settings": settings, "items": items},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AssetManifest:
+    """
+    SQLite record of every rendered asset: the stories it was made from, render profile,
+    path, size, content hash and publish state (rendered -> queued -> published).
+
+    Studio asks it before rendering, so an identical request (same stories, same profile)
+    returns the file already on disk. The dashboard restores unpublished renders from it
+    after a reload, and collect_garbage() keeps the output directory within its quota.
+    """
+
+    def __init__(self, db_path="output/assets.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row):
+        record = dict(row)
+        record["item_ids"] = json.loads(record["item_ids"])
+        record["items"] = json.loads(record["items"])
+        return record
+
+    def _current(self, record):
+        """The file is still the one that was recorded (not deleted or overwritten by a newer render)."""
+        try:
+            stat = os.stat(record["path"])
+        except OSError:
+            return False
+        return stat.st_size == record["size"] and stat.st_mtime_ns == record["mtime_ns"]
+
+    def lookup(self, key):
+        """The recorded asset for a render key if its file is still intact, else None."""
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM assets WHERE render_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            record = self._row(row)
+            if not self._current(record):
+                conn.execute("DELETE FROM assets WHERE id = ?", (record["id"],))
+                return None
+            conn.execute("UPDATE assets SET used_at = ? WHERE id = ?", (time.time(), record["id"]))
+        return record
+
+    def record(self, key, kind, profile, path, items):
+        stat = os.stat(path)
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO assets (render_key, kind, profile, item_ids, items, path, size, mtime_ns, content_hash, "
+                "created_at, used_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(render_key) DO UPDATE SET path = excluded.path, size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, content_hash = excluded.content_hash, state = 'rendered', "
+                "used_at = excluded.used_at, updated_at = excluded.updated_at",
+                (key, kind, profile, json.dumps([i.get('id') for i in items]), json.dumps(items, default=str),
+                 path, stat.st_size, stat.st_mtime_ns, file_hash(path), now, now, now),
+            )
+
+    def set_state(self, path, state):
+        """Move every record of a file to `state`."""
+        if state not in STATES:
+            raise ValueError(f"Unknown asset state: {state}")
+        with self._db() as conn:
+            conn.execute("UPDATE assets SET state = ?, updated_at = ? WHERE path = ?", (state, time.time(), path))
+
+    def assets(self, state=None, since=None, limit=500):
+        """Records whose files are intact, newest first."""
+        query, args = "SELECT * FROM assets WHERE 1 = 1", []
+        if state:
+            query += " AND state = ?"
+            args.append(state)
+        if since:
+            query += " AND created_at >= ?"
+            args.append(since)
+        with self._db() as conn:
+            rows = conn.execute(query + " ORDER BY created_at DESC LIMIT ?", args + [limit]).fetchall()
+        return [r for r in (self._row(row) for row in rows) if self._current(r)]
+
+    def forget(self, paths):
+        with self._db() as conn:
+            conn.executemany("DELETE FROM assets WHERE path = ?", [(p,) for p in paths])
+
+    def collect_garbage(self, directory, max_bytes=None, max_age_days=None, orphan_grace=3600, protected=(),
+                        dry_run=False):
+        """
+        Enforce retention and a disk quota on an output directory. Returns what was (or would be) removed.
+
+        - Orphans (Studio outputs the manifest doesn't know, see OUTPUT_PREFIXES, e.g. abandoned
+          segment dirs) go once they are older than `orphan_grace` seconds.
+        - Recorded assets unused for `max_age_days` go.
+        - While the directory is over `max_bytes`, least recently used assets go.
+        Queued assets and `protected` paths (e.g. files of pending publish jobs or reviews) are never touched.
+        """
+        now = time.time()
+        with self._db() as conn:
+            records = [self._row(r) for r in conn.execute("SELECT * FROM assets ORDER BY used_at").fetchall()]
+        known = {os.path.abspath(r["path"]) for r in records}
+        keep = {os.path.abspath(p) for p in protected}
+        keep |= {os.path.abspath(r["path"]) for r in records if r["state"] == "queued"}
+
+        stats = {"orphans": 0, "expired": 0, "evicted": 0, "freed_bytes": 0}
+        removed = []
+
+        def remove(path, reason):
+            try:
+                size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files) \
+                    if os.path.isdir(path) else os.path.getsize(path)
+                if not dry_run:
+                    shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove {path}: {e}")
+                return 0
+            stats[reason] += 1
+            stats["freed_bytes"] += size
+            removed.append(path)
+            return size
+
+        # 1. Orphans
+        for entry in os.scandir(directory) if os.path.isdir(directory) else ():
+            if not entry.name.startswith(OUTPUT_PREFIXES):
+                continue
+            path = os.path.abspath(entry.path)
+            if path in known or path in keep or path == os.path.abspath(self.db_path):
+                continue
+            if now - entry.stat().st_mtime >= orphan_grace:
+                remove(path, "orphans")
+
+        # 2. Retention
+        live = []
+        for r in records:
+            path = os.path.abspath(r["path"])
+            if path in keep or not os.path.exists(path):
+                continue
+            if max_age_days is not None and now - r["used_at"] > max_age_days * 86400:
+                remove(path, "expired")
+            else:
+                live.append(r)
+
+        # 3. Quota (least recently used first)
+        if max_bytes is not None:
+            total = sum(os.path.getsize(os.path.join(root, f))
+                        for root, _, files in os.walk(directory) for f in files) if os.path.isdir(directory) else 0
+            if dry_run:
+                total -= stats["freed_bytes"]
+            for r in live:
+                if total <= max_bytes:
+                    break
+                total -= remove(os.path.abspath(r["path"]), "evicted")
+            if total > max_bytes:
+                logger.warning(f"{directory} still over quota ({total / 1e6:.0f} MB): the rest is queued or protected")
+
+        if not dry_run:
+            self.forget([r["path"] for r in records if os.path.abspath(r["path"]) in set(removed)])
+        if removed:
+            logger.info(f"GC {directory}: {stats}")
+        stats["removed"] = removed
+        return stats
+
+
+def collect_output_garbage(manifest, directory="output/review_queue/", publish_queue=None, dry_run=False,
+                           review_queue=None):
+    """
+    collect_garbage() with the OUTPUT_QUOTA_MB / OUTPUT_RETENTION_DAYS settings, sparing pending
+    uploads and the drafts of escalations still waiting for a reviewer.
+    """
+    protected = list(publish_queue.pending_paths()) if publish_queue else []
+    if review_queue:
+        protected += review_queue.pending_paths()
+    return manifest.collect_garbage(
+        directory,
+        max_bytes=int(float(os.getenv("OUTPUT_QUOTA_MB", "2048")) * 1024 * 1024),
+        max_age_days=float(os.getenv("OUTPUT_RETENTION_DAYS", "7")),
+        protected=protected,
+        dry_run=dry_run,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply retention and the disk quota to the output directory.")
+    parser.add_argument("--dir", default="output/review_queue/")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    args = parser.parse_args()
+
+    from jobqueue import PublishQueue
+    from policy import ReviewQueue
+    stats = collect_output_garbage(AssetManifest(), args.dir, PublishQueue(), dry_run=args.dry_run,
+                                   review_queue=ReviewQueue())
+    for path in stats.pop("removed"):
+        print(("would remove " if args.dry_run else "removed ") + path)
+    print(stats)
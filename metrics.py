@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Metrics")
+
+# Histogram buckets (seconds) for stage durations: from a cached font lookup up to a long reel encode
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Span:
+    """One timed unit of work. Code inside the span adds bytes, cache hits and errors to it."""
+
+    def __init__(self, stage, fields):
+        self.stage = stage
+        self.fields = dict(fields)
+        self.bytes = 0
+        self.cache = None # "hit" / "miss"
+        self.error = None
+        self.start = time.time()
+
+    def add_bytes(self, n):
+        self.bytes += n or 0
+
+    def add_file(self, path):
+        """Count a file's size; a missing file counts nothing rather than failing the work."""
+        try:
+            self.bytes += os.path.getsize(path)
+        except (OSError, TypeError):
+            pass
+
+    def hit(self):
+        self.cache = "hit"
+
+    def miss(self):
+        self.cache = "miss"
+
+    def fail(self, error):
+        self.error = str(error)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+class Metrics:
+    """
+    In-process spans and counters, exported as a JSON-lines trace (one line per span)
+    and a Prometheus text-format file (rewritten at most every `flush_interval` seconds,
+    for node_exporter's textfile collector or a quick `cat`).
+
+    The trace rolls over to trace.jsonl.1 (replacing the previous one) once it reaches
+    `trace_max_bytes`, so a long-running process keeps at most twice that on disk.
+    """
+
+    def __init__(self, directory="output/metrics/", enabled=True, flush_interval=2.0,
+                 trace_max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.trace_path = os.path.join(directory, "trace.jsonl")
+        self.trace_max_bytes = trace_max_bytes
+        self.prom_path = os.path.join(directory, "metrics.prom")
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {} # stage -> totals + histogram
+            self.counters = {} # name -> value
+
+    def _stage(self, stage):
+        if stage not in self.stages:
+            self.stages[stage] = {"calls": 0, "errors": 0, "seconds": 0.0, "bytes": 0,
+                                  "cache_hits": 0, "cache_misses": 0, "buckets": [0] * len(BUCKETS)}
+        return self.stages[stage]
+
+    @contextmanager
+    def span(self, stage, **fields):
+        s = Span(stage, fields)
+        try:
+            yield s
+        except Exception as e:
+            s.fail(e)
+            raise
+        finally:
+            if self.enabled:
+                self._record(s, time.time() - s.start)
+
+    def _record(self, s, seconds):
+        with self._lock:
+            totals = self._stage(s.stage)
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["bytes"] += s.bytes
+            totals["errors"] += 1 if s.error else 0
+            totals["cache_hits"] += s.cache == "hit"
+            totals["cache_misses"] += s.cache == "miss"
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    totals["buckets"][i] += 1
+
+        record = {"ts": round(s.start, 3), "stage": s.stage, "seconds": round(seconds, 4),
+                  "thread": threading.current_thread().name, **s.fields}
+        if s.bytes:
+            record["bytes"] = s.bytes
+        if s.cache:
+            record["cache"] = s.cache
+        if s.error:
+            record["error"] = s.error
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with self._lock:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+                    full = f.tell() >= self.trace_max_bytes
+                if full:
+                    os.replace(self.trace_path, self.trace_path + ".1")
+        except OSError as e:
+            logger.warning(f"Could not write trace: {e}")
+
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.write_prometheus()
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Copy of the per-stage totals (calls, errors, seconds, bytes, cache hits/misses)."""
+        with self._lock:
+            return {stage: {k: v for k, v in totals.items() if k != "buckets"}
+                    for stage, totals in self.stages.items()}
+
+    def prometheus_text(self):
+        with self._lock:
+            stages = {stage: dict(totals, buckets=list(totals["buckets"])) for stage, totals in self.stages.items()}
+            counters = dict(self.counters)
+
+        lines = []
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("racing_stage_seconds", "histogram", "Time spent per pipeline stage.")
+        for stage, t in sorted(stages.items()):
+            for bound, n in zip(BUCKETS, t["buckets"]):
+                lines.append(f'racing_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+            lines.append(f'racing_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {t["calls"]}')
+            lines.append(f'racing_stage_seconds_sum{{stage="{stage}"}} {t["seconds"]:.6f}')
+            lines.append(f'racing_stage_seconds_count{{stage="{stage}"}} {t["calls"]}')
+        for key, kind, help_text in (
+            ("errors", "racing_stage_errors_total", "Failed calls per stage."),
+            ("bytes", "racing_stage_bytes_total", "Bytes downloaded, written or uploaded per stage."),
+            ("cache_hits", "racing_stage_cache_hits_total", "Cache hits per stage."),
+            ("cache_misses", "racing_stage_cache_misses_total", "Cache misses per stage."),
+        ):
+            family(kind, "counter", help_text)
+            for stage, t in sorted(stages.items()):
+                lines.append(f'{kind}{{stage="{stage}"}} {t[key]}')
+        for name, value in sorted(counters.items()):
+            family(f"racing_{name}_total", "counter", name.replace("_", " ").capitalize() + ".")
+            lines.append(f"racing_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        if not self.enabled:
+            return
+        self._last_flush = time.time()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.prom_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self.prom_path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics file: {e}")
+
+
+# Process-wide instance used by the agents; METRICS=0 turns recording off
+metrics = Metrics(directory=os.getenv("METRICS_DIR", "output/metrics/"), enabled=os.getenv("METRICS", "1") != "0",
+                  trace_max_bytes=int(float(os.getenv("TRACE_MAX_MB", "50")) * 1024 * 1024))
+atexit.register(lambda: metrics.write_prometheus() if metrics.stages else None)
+
+
+def span(stage, **fields):
+    """Time a block against the process-wide metrics: `with span("studio.tts") as s: ...`"""
+    return metrics.span(stage, **fields)
+
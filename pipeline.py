@@ -0,0 +1,250 @@
+import time
+import queue
+import logging
+import threading
+from brands import wants
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Pipeline")
+
+_DONE = object() # End-of-stream marker, one per downstream worker
+
+
+class Stage:
+    """
+    One pipeline stage: `workers` threads taking from `inbox`, calling `fn(item)` and putting
+    every returned output on `outbox`. `fn` returns an iterable (or None to drop the item).
+
+    A full outbox blocks the stage (backpressure). When the last worker sees the end of its
+    input it runs `on_close()` (for outputs that need everything, e.g. the reel) and then
+    passes the end marker downstream.
+    """
+
+    def __init__(self, name, fn, workers=1, inbox=None, outbox=None, on_close=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_close = on_close
+        self.downstream_workers = 1
+        self.processed = 0
+        self.errors = 0
+        self._active = workers
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self, stop_event):
+        for n in range(self.workers):
+            t = threading.Thread(target=self._run, args=(stop_event,), name=f"{self.name}-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def join(self, timeout=None):
+        for t in self._threads:
+            t.join(timeout)
+
+    def _emit(self, outputs, stop_event):
+        for output in outputs or ():
+            if self.outbox is None:
+                continue
+            while not stop_event.is_set():
+                try:
+                    self.outbox.put(output, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _run(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                item = self.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                break
+            try:
+                self._emit(self.fn(item), stop_event)
+                with self._lock:
+                    self.processed += 1
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+                with self._lock:
+                    self.errors += 1
+
+        with self._lock:
+            self._active -= 1
+            last = self._active == 0
+        if not last:
+            return
+        if self.on_close and not stop_event.is_set():
+            try:
+                self._emit(self.on_close(), stop_event)
+            except Exception as e:
+                logger.error(f"{self.name} failed while closing: {e}")
+        if self.outbox is not None and not stop_event.is_set():
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_DONE)
+
+
+class Pipeline:
+    """
+    Scout -> Studio -> Publisher as concurrent stages joined by bounded queues.
+
+    Each story moves on as soon as it is ready: while one article is being downloaded the
+    previous card is rendering and the one before that uploading. Queue sizes bound how far
+    a fast stage can run ahead of a slow one.
+
+    approve(asset) -> bool decides on each draft; approved assets are re-rendered at final
+    quality and handed to publish(asset). Without publish, approved assets are only logged.
+
+    `studio` may also be {brand name: Studio}: each story is then fetched and scraped once and
+    rendered for every brand that wants it (brands.wants); assets carry their "brand" and each
+    brand gets its own reel.
+    """
+
+    def __init__(self, scout, studio, approve=None, publish=None, scout_workers=4, render_workers=2,
+                 publish_workers=2, queue_size=8, reel_min_items=3, new_only=False):
+        self.scout = scout
+        self.studios = studio if isinstance(studio, dict) else {None: studio}
+        self.studio = next(iter(self.studios.values()))
+        self.approve = approve or (lambda asset: True)
+        self.publish = publish
+        self.scout_workers = scout_workers
+        self.render_workers = render_workers
+        self.publish_workers = publish_workers
+        self.queue_size = queue_size
+        self.reel_min_items = reel_min_items
+        self.new_only = new_only # Skip stories the Scout already handed out (long-running use)
+
+        self._stop = threading.Event()
+        self._items = {} # brand -> every story rendered for it, for the reels
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def stop(self):
+        """Abort: workers finish their current item and exit."""
+        self._stop.set()
+
+    # --- Stage functions ---
+
+    def _scout(self, work):
+        entry, url = work
+        return [self.scout.build_item(entry, url)]
+
+    def _finalize(self, asset):
+        """Approval + final render. Returns the publishable asset or None."""
+        with self._lock:
+            self.stats["assets"] += 1
+        if not self.approve(asset):
+            return None
+        final_path = self.studios[asset.get('brand')].render_final(asset)
+        if not final_path:
+            logger.error(f"Final render failed for {asset['path']}")
+            return None
+        asset['path'] = final_path
+        asset['profile'] = "final"
+        return asset
+
+    def _asset(self, brand, asset):
+        if brand is not None:
+            asset["brand"] = brand
+        return self._finalize(asset)
+
+    def _render(self, item):
+        assets = []
+        for brand, studio in self.studios.items():
+            if brand is not None and not wants(studio.brand, item):
+                continue
+            image_path = studio.generate_image(item)
+            if not image_path:
+                continue
+            with self._lock:
+                self._items.setdefault(brand, []).append(item)
+            asset = self._asset(brand, {"type": "image", "path": image_path, "data": item, "profile": studio.profile})
+            if asset:
+                assets.append(asset)
+        return assets or None
+
+    def _render_reel(self):
+        assets = []
+        for brand, studio in self.studios.items():
+            with self._lock:
+                items = list(self._items.get(brand, []))
+            if len(items) < self.reel_min_items:
+                continue
+            video_path = studio.generate_video(items)
+            if not video_path:
+                continue
+            asset = self._asset(brand, {
+                "type": "video",
+                "path": video_path,
+                "data": {"headline_en": "Top Stories", "id": "reel"}, # Generic data for reel
+                "items": items,
+                "profile": studio.profile
+            })
+            if asset:
+                assets.append(asset)
+        return assets or None
+
+    def _publish(self, asset):
+        if self.publish:
+            self.publish(asset)
+        else:
+            logger.info(f"(Dry Run) Publishing {asset['type']}: {asset['path']}")
+        with self._lock:
+            self.stats["published"] += 1
+            if self.stats["first_publish_seconds"] is None:
+                self.stats["first_publish_seconds"] = round(time.time() - self._started, 3)
+        return None
+
+    # --- Run ---
+
+    def run(self):
+        """Run one pass over the feeds and block until every stage has drained. Returns stats."""
+        self._stop.clear()
+        self._items = {}
+        self._started = time.time()
+        self.stats = {"items": 0, "assets": 0, "published": 0, "first_publish_seconds": None, "seconds": None}
+
+        entries = queue.Queue(self.queue_size)
+        items = queue.Queue(self.queue_size)
+        assets = queue.Queue(self.queue_size)
+        stages = [
+            Stage("scout", self._scout, self.scout_workers, entries, items),
+            Stage("render", self._render, self.render_workers, items, assets, on_close=self._render_reel),
+            Stage("publish", self._publish, self.publish_workers, assets),
+        ]
+        for upstream, downstream in zip(stages, stages[1:]):
+            upstream.downstream_workers = downstream.workers
+
+        for stage in stages:
+            stage.start(self._stop)
+
+        # Feed listing is cheap and sequential; it only blocks when the scouts fall behind
+        try:
+            for work in self.scout.iter_entries(new_only=self.new_only):
+                while not self._stop.is_set():
+                    try:
+                        entries.put(work, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if self._stop.is_set():
+                    break
+        except Exception as e:
+            logger.error(f"Feed listing failed: {e}")
+        finally:
+            if not self._stop.is_set():
+                for _ in range(stages[0].workers):
+                    entries.put(_DONE)
+
+        for stage in stages:
+            stage.join()
+
+        self.stats["items"] = stages[0].processed
+        self.stats["errors"] = {stage.name: stage.errors for stage in stages}
+        self.stats["seconds"] = round(time.time() - self._started, 3)
+        logger.info(f"Pipeline finished: {self.stats}")
+        return self.stats
@@ -0,0 +1,290 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+import unicodedata
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from brands import get_brand
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Policy")
+
+DEFAULT_POLICY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "approval_policy.json")
+
+ACTIONS = ("approve", "reject", "escalate")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    asset TEXT NOT NULL,
+    rule TEXT,
+    reasons TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    created_at REAL NOT NULL,
+    decided_at REAL
+);
+CREATE INDEX IF NOT EXISTS reviews_state ON reviews (state);
+CREATE TABLE IF NOT EXISTS review_keys (
+    fingerprint TEXT NOT NULL,
+    review_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS review_keys_fingerprint ON review_keys (fingerprint);
+CREATE TABLE IF NOT EXISTS seen (
+    fingerprint TEXT PRIMARY KEY,
+    item_id TEXT,
+    first_seen REAL NOT NULL
+);
+"""
+
+
+def fingerprints(asset, default_brand):
+    """
+    Dedup keys for an asset: the story id and its normalised headline (same story, other feed).
+    Always scoped to a brand, since every brand may post the same story once: the asset's own
+    (multi-brand runs tag it) or `default_brand` for untagged assets, so one brand gets the same
+    keys whichever way it is run.
+    """
+    if asset['type'] != 'image':
+        return []
+    item = asset['data']
+    headline = unicodedata.normalize("NFKD", item.get('headline_en', ''))
+    headline = "".join(c for c in headline if not unicodedata.combining(c)).casefold()
+    keys = ["title:" + " ".join(sorted(set(re.findall(r"\w+", headline))))]
+    if item.get('id'):
+        keys.append("id:" + str(item['id']))
+    return [f"{asset.get('brand') or default_brand}:{key}" for key in keys]
+
+
+class ReviewQueue:
+    """
+    SQLite store for escalated assets (waiting for a person) and the dedup index of
+    every story that was queued for upload or decided by a reviewer. A story waiting
+    for review also counts as a duplicate until it is decided.
+
+    `brand` (default: the first brand) owns the assets that carry no brand tag, i.e. those of
+    single-brand runs and of a dashboard serving that brand.
+    """
+
+    def __init__(self, db_path="output/review.db", brand=None):
+        self.db_path = db_path
+        self.brand = brand or get_brand()["name"]
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        """
+        Version 1: dedup keys are always brand-scoped. Older unscoped keys were written by
+        single-brand runs, i.e. the first brand, so they move under its name.
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        primary = get_brand()["name"]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1: # Another process may have got here first
+                for table in ("seen", "review_keys"):
+                    unscoped = "fingerprint LIKE 'title:%' OR fingerprint LIKE 'id:%'"
+                    conn.execute(f"UPDATE OR IGNORE {table} SET fingerprint = ? || ':' || fingerprint WHERE {unscoped}",
+                                 (primary,))
+                    conn.execute(f"DELETE FROM {table} WHERE {unscoped}") # Already had a scoped twin
+                conn.execute("PRAGMA user_version = 1")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row):
+        review = dict(row)
+        review["asset"] = json.loads(review["asset"])
+        review["reasons"] = json.loads(review["reasons"]) if review["reasons"] else []
+        return review
+
+    # --- Dedup index ---
+
+    def fingerprints(self, asset):
+        return fingerprints(asset, self.brand)
+
+    def is_duplicate(self, keys):
+        if not keys:
+            return False
+        marks = ','.join('?' * len(keys))
+        with self._db() as conn:
+            row = conn.execute(f"SELECT 1 FROM seen WHERE fingerprint IN ({marks}) "
+                               f"UNION ALL SELECT 1 FROM review_keys JOIN reviews ON reviews.id = review_id "
+                               f"WHERE state = 'pending' AND fingerprint IN ({marks}) LIMIT 1",
+                               keys + keys).fetchone()
+        return row is not None
+
+    def remember(self, keys, item_id=None):
+        if not keys:
+            return
+        with self._db() as conn:
+            conn.executemany("INSERT OR IGNORE INTO seen (fingerprint, item_id, first_seen) VALUES (?, ?, ?)",
+                             [(k, item_id, time.time()) for k in keys])
+
+    # --- Escalations ---
+
+    def add(self, asset, decision):
+        with self._db() as conn:
+            cursor = conn.execute(
+                "INSERT INTO reviews (asset, rule, reasons, created_at) VALUES (?, ?, ?, ?)",
+                (json.dumps(asset, default=str), decision["rule"], json.dumps(decision["reasons"]), time.time()),
+            )
+            conn.executemany("INSERT INTO review_keys (fingerprint, review_id) VALUES (?, ?)",
+                             [(k, cursor.lastrowid) for k in self.fingerprints(asset)])
+            return cursor.lastrowid
+
+    def pending(self, limit=100):
+        with self._db() as conn:
+            rows = conn.execute("SELECT * FROM reviews WHERE state = 'pending' ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def pending_paths(self):
+        """Files of escalations still waiting for a reviewer (output GC leaves them alone)."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT asset FROM reviews WHERE state = 'pending'").fetchall()
+        return [json.loads(r["asset"])["path"] for r in rows]
+
+    def decide(self, review_id, approved):
+        """
+        Record the reviewer's call and remember the story either way. Returns the asset,
+        or None if it was already decided.
+        """
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM reviews WHERE id = ? AND state = 'pending'", (review_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE reviews SET state = ?, decided_at = ? WHERE id = ?",
+                         ("approved" if approved else "rejected", time.time(), review_id))
+        asset = self._row(row)["asset"]
+        self.remember(self.fingerprints(asset), asset['data'].get('id'))
+        return asset
+
+    def counts(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM reviews GROUP BY state").fetchall()
+        counts = {"pending": 0, "approved": 0, "rejected": 0}
+        counts.update({r["state"]: r["n"] for r in rows})
+        return counts
+
+
+class ApprovalPolicy:
+    """
+    Rule-based approval for drafts (config/approval_policy.json).
+
+    Rules are checked in order and the first whose conditions all hold decides:
+    approve, reject or escalate; with no match the policy default applies. Escalated
+    assets go to the ReviewQueue instead of blocking the run. Every decision is appended
+    to a JSON-lines audit log.
+
+    Conditions (all optional, all must hold):
+      asset_type:   ["image", "video"]
+      type:         item types, e.g. ["RESULT"]
+      source:       domains; the story link or feed URL must be on one of them
+      series:       ["Formula 1", "MotoGP"]
+      entities:     entity names; at least one must be mentioned
+      min_entities / max_entities: number of matched entities
+      keywords:     substrings; at least one must appear in the headline
+      duplicate:    true / false - story already queued for upload, decided by a reviewer,
+                    waiting for review, or approved earlier in this process
+
+    An instance is a callable(asset) -> bool, so it plugs into Pipeline / Daemon as the approver.
+    Approving does not add the story to the dedup index: that happens once it is really queued
+    for upload (main.enqueue_for_publish), so dry runs and failed final renders don't block it
+    later. Until then the approval is held in memory for this process only.
+    """
+
+    def __init__(self, path=DEFAULT_POLICY, review_queue=None, audit_path="output/approval_audit.jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.default = config.get("default", "escalate")
+        self.rules = config.get("rules", [])
+        for rule in self.rules + [{"name": "default", "action": self.default}]:
+            if rule["action"] not in ACTIONS:
+                raise ValueError(f"Unknown action '{rule['action']}' in rule {rule['name']}")
+        self.review_queue = review_queue or ReviewQueue()
+        self.audit_path = audit_path
+        self._lock = threading.Lock() # Decide + claim is one step, or two workers could both pass a duplicate
+        self._claimed = set() # Fingerprints approved in this process (not yet queued, or a dry run)
+
+    def _matches(self, when, asset, facts):
+        item = asset['data']
+        headline = item.get('headline_en', '').lower()
+        checks = {
+            "asset_type": lambda v: asset['type'] in v,
+            "type": lambda v: item.get('type', 'NEWS') in v,
+            "source": lambda v: any(host == d or host.endswith("." + d) for host in facts["hosts"] for d in v),
+            "series": lambda v: item.get('series') in v,
+            "entities": lambda v: bool(facts["entities"] & set(v)),
+            "min_entities": lambda v: len(facts["entities"]) >= v,
+            "max_entities": lambda v: len(facts["entities"]) <= v,
+            "keywords": lambda v: any(k.lower() in headline for k in v),
+            "duplicate": lambda v: facts["duplicate"] == v,
+        }
+        for key, value in when.items():
+            if key not in checks:
+                raise ValueError(f"Unknown policy condition: {key}")
+            if not checks[key](value):
+                return False
+        return True
+
+    def evaluate(self, asset):
+        """Decide without side effects. Returns {"action", "rule", "reasons"}."""
+        item = asset['data']
+        entities = item.get('entities') or []
+        keys = self.review_queue.fingerprints(asset)
+        facts = {
+            "hosts": {urlparse(u).hostname or "" for u in (item.get('link'), item.get('feed')) if u},
+            "entities": {e["name"] for e in entities} | {e["team"] for e in entities if e.get("team")},
+            "duplicate": bool(self._claimed.intersection(keys)) or self.review_queue.is_duplicate(keys),
+        }
+        for rule in self.rules:
+            if self._matches(rule.get("when", {}), asset, facts):
+                reasons = [f"{k}={v}" for k, v in rule.get("when", {}).items()]
+                return {"action": rule["action"], "rule": rule["name"], "reasons": reasons}
+        return {"action": self.default, "rule": "default", "reasons": []}
+
+    def _audit(self, asset, decision):
+        record = {
+            "ts": time.time(),
+            "asset_type": asset['type'],
+            "path": asset.get('path'),
+            "item_id": asset['data'].get('id'),
+            "headline": asset['data'].get('headline_en'),
+            **decision,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.audit_path)), exist_ok=True)
+        with open(self.audit_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def decide(self, asset):
+        """Evaluate, record the decision and queue escalations. Returns the decision."""
+        with self._lock:
+            decision = self.evaluate(asset)
+            if decision["action"] == "approve":
+                self._claimed.update(self.review_queue.fingerprints(asset))
+            if decision["action"] == "escalate":
+                decision["review_id"] = self.review_queue.add(asset, decision)
+        self._audit(asset, decision)
+        logger.info(f"{decision['action'].upper()} ({decision['rule']}): {asset['data'].get('headline_en')}")
+        return decision
+
+    def __call__(self, asset):
+        return self.decide(asset)["action"] == "approve"
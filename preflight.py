@@ -0,0 +1,415 @@
+import os
+import re
+import json
+import struct
+import hashlib
+import logging
+import threading
+import subprocess
+from PIL import Image
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Preflight")
+
+# What each upload target accepts. Anything outside these is fixed locally (or rejected)
+# before a single byte goes over the network.
+PLATFORM_SPECS = {
+    "instagram_photo": {
+        "kind": "image",
+        "formats": ("JPEG",),
+        "min_aspect": 0.8,          # 4:5 portrait
+        "max_aspect": 1.91,         # 1.91:1 landscape
+        "min_width": 320,
+        "max_width": 1440,
+        "max_bytes": 8 * 1024 * 1024,
+    },
+    "instagram_reel": {
+        "kind": "video",
+        "video_codecs": ("h264",),
+        "pix_fmts": ("yuv420p",),
+        "audio_codecs": ("aac",),
+        "sample_rates": (44100, 48000),
+        "min_aspect": 0.5625,       # 9:16 only, anything else gets letterboxed by Instagram
+        "max_aspect": 0.5625,
+        "frame": (1080, 1920),      # Frame used when the aspect has to be fixed
+        "min_width": 540,
+        "min_fps": 23,
+        "max_fps": 60,
+        "min_duration": 3,
+        "max_duration": 90,
+        "max_video_bitrate": 25_000_000,
+        "max_bytes": 1024 * 1024 * 1024,
+    },
+    "youtube_short": {
+        "kind": "video",
+        "video_codecs": ("h264",),
+        "pix_fmts": ("yuv420p",),
+        "audio_codecs": ("aac",),
+        "sample_rates": (44100, 48000),
+        "min_aspect": 0.5625,       # Vertical or square, otherwise it is not a Short
+        "max_aspect": 1.0,
+        "frame": (1080, 1920),
+        "min_width": 540,
+        "min_fps": 23,
+        "max_fps": 60,
+        "min_duration": 1,
+        "max_duration": 180,
+        "max_video_bitrate": 25_000_000,
+        "max_bytes": 2 * 1024 * 1024 * 1024,
+    },
+}
+ASPECT_TOLERANCE = 0.01
+
+
+class PreflightError(Exception):
+    """The asset can't be made to fit the target's spec locally (e.g. too long)."""
+    pass
+
+
+def ffmpeg_binary():
+    """MoviePy's ffmpeg (FFMPEG_BINARY or the imageio download). moviepy.config loads on first use."""
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+
+def file_hash(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def has_faststart(path):
+    """True if the MP4 'moov' atom comes before 'mdat', so playback/processing can start before the download ends."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            size, kind = struct.unpack(">I4s", header)
+            if kind == b"moov":
+                return True
+            if kind == b"mdat":
+                return False
+            if size == 1: # 64-bit size follows the header
+                size = struct.unpack(">Q", f.read(8))[0] - 8
+            elif size == 0: # Atom runs to the end of the file
+                return False
+            f.seek(size - 8, os.SEEK_CUR)
+
+
+class Preflight:
+    """
+    Local pre-flight check for uploads.
+
+    Probes the file, compares it with PLATFORM_SPECS[target] and fixes only what is wrong:
+    a remux for container / faststart problems, an audio-only re-encode for audio problems,
+    a video re-encode only when the picture itself is off. Results are cached per content hash,
+    so the same asset is never probed (or transcoded) twice, even across restarts. The publish
+    workers discard() a file's fixed copies once all of its uploads are done.
+    """
+
+    def __init__(self, cache_dir="output/preflight/", specs=None):
+        self.cache_dir = cache_dir
+        self.specs = specs or PLATFORM_SPECS
+        self._hashes = {} # (path, size, mtime) -> sha256
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- Cache ---
+
+    def _content_hash(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(path)
+        return self._hashes[key]
+
+    def _lock(self, digest):
+        with self._locks_guard:
+            return self._locks.setdefault(digest, threading.Lock())
+
+    def _record_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load_record(self, digest):
+        try:
+            with open(self._record_path(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"probe": None, "targets": {}}
+
+    def _save_record(self, digest, record):
+        tmp_path = self._record_path(digest) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, self._record_path(digest))
+
+    # --- Probe ---
+
+    def probe(self, path):
+        """Container / stream facts for a file, from PIL for images and the ffmpeg banner for video."""
+        try:
+            with Image.open(path) as img:
+                return {"kind": "image", "format": img.format, "mode": img.mode,
+                        "width": img.width, "height": img.height, "bytes": os.path.getsize(path)}
+        except Exception:
+            pass
+        return self._probe_video(path)
+
+    def _probe_video(self, path):
+        # No ffprobe alongside MoviePy's ffmpeg, so parse what `ffmpeg -i` prints
+        result = subprocess.run([ffmpeg_binary(), "-hide_banner", "-i", path],
+                                capture_output=True, text=True)
+        info = {"kind": "video", "bytes": os.path.getsize(path), "container": None, "duration": None,
+                "bitrate": None, "video": None, "audio": None, "faststart": False}
+
+        container = re.search(r"Input #0, ([\w,]+), from", result.stderr)
+        if not container:
+            raise PreflightError(f"Unreadable media file: {path}")
+        info["container"] = "mp4" if "mp4" in container.group(1).split(",") else container.group(1)
+
+        duration = re.search(r"Duration: (\d+):(\d+):([\d.]+)", result.stderr)
+        if duration:
+            h, m, s = duration.groups()
+            info["duration"] = int(h) * 3600 + int(m) * 60 + float(s)
+        bitrate = re.search(r"Duration: .*?bitrate: (\d+) kb/s", result.stderr)
+        if bitrate:
+            info["bitrate"] = int(bitrate.group(1)) * 1000
+
+        for line in result.stderr.splitlines():
+            stream = re.search(r"Stream #0:\d+.*?: (Video|Audio): (.*)", line)
+            if not stream:
+                continue
+            # Drop parenthesised details first, they contain commas of their own
+            fields = stream.group(2)
+            while re.search(r"\([^()]*\)", fields):
+                fields = re.sub(r"\s*\([^()]*\)", "", fields)
+            fields = [f.strip() for f in fields.split(",")]
+            kbps = next((int(m.group(1)) * 1000 for f in fields if (m := re.fullmatch(r"(\d+) kb/s", f))), None)
+
+            if stream.group(1) == "Video" and info["video"] is None:
+                size = next((m for f in fields if (m := re.match(r"(\d+)x(\d+)", f))), None)
+                fps = next((float(m.group(1)) for f in fields if (m := re.fullmatch(r"([\d.]+) fps", f))), None)
+                info["video"] = {
+                    "codec": fields[0].split(" ")[0],
+                    "pix_fmt": fields[1] if len(fields) > 1 else None,
+                    "width": int(size.group(1)) if size else None,
+                    "height": int(size.group(2)) if size else None,
+                    "fps": fps,
+                    "bitrate": kbps,
+                }
+            elif stream.group(1) == "Audio" and info["audio"] is None:
+                rate = next((int(m.group(1)) for f in fields if (m := re.fullmatch(r"(\d+) Hz", f))), None)
+                info["audio"] = {
+                    "codec": fields[0].split(" ")[0],
+                    "sample_rate": rate,
+                    "channels": fields[2] if len(fields) > 2 else None,
+                    "bitrate": kbps,
+                }
+
+        if info["container"] == "mp4":
+            info["faststart"] = has_faststart(path)
+        return info
+
+    # --- Validate ---
+
+    def check(self, probe, target):
+        """
+        Compare a probe with the target's spec.
+        Returns {"fatal": [...], "remux": [...], "audio": [...], "video": [...]} issue lists.
+        """
+        spec = self.specs[target]
+        issues = {"fatal": [], "remux": [], "audio": [], "video": []}
+
+        if probe["kind"] != spec["kind"]:
+            issues["fatal"].append(f"{target} needs an {spec['kind']}, got {probe['kind']}")
+            return issues
+
+        if spec["kind"] == "image":
+            aspect = probe["width"] / probe["height"]
+            if probe["format"] not in spec["formats"]:
+                issues["video"].append(f"format {probe['format']}")
+            if not spec["min_aspect"] - ASPECT_TOLERANCE <= aspect <= spec["max_aspect"] + ASPECT_TOLERANCE:
+                issues["video"].append(f"aspect {aspect:.3f}")
+            if probe["width"] > spec["max_width"]:
+                issues["video"].append(f"width {probe['width']}")
+            if probe["width"] < spec["min_width"]:
+                issues["fatal"].append(f"width {probe['width']} below {spec['min_width']}")
+            if probe["bytes"] > spec["max_bytes"] and not issues["video"]:
+                issues["video"].append(f"size {probe['bytes']} bytes")
+            return issues
+
+        duration = probe["duration"] or 0
+        if duration < spec["min_duration"] or duration > spec["max_duration"]:
+            issues["fatal"].append(f"duration {duration:.1f}s outside {spec['min_duration']}-{spec['max_duration']}s")
+        if probe["bytes"] > spec["max_bytes"]:
+            issues["fatal"].append(f"file is {probe['bytes']} bytes, limit {spec['max_bytes']}")
+
+        video = probe["video"]
+        if video is None or not video["width"]:
+            issues["fatal"].append("no video stream")
+            return issues
+        aspect = video["width"] / video["height"]
+        if video["codec"] not in spec["video_codecs"]:
+            issues["video"].append(f"video codec {video['codec']}")
+        if video["pix_fmt"] not in spec["pix_fmts"]:
+            issues["video"].append(f"pixel format {video['pix_fmt']}")
+        if not spec["min_aspect"] - ASPECT_TOLERANCE <= aspect <= spec["max_aspect"] + ASPECT_TOLERANCE:
+            issues["video"].append(f"aspect {aspect:.3f}")
+        if video["width"] < spec["min_width"]:
+            issues["video"].append(f"width {video['width']}")
+        if video["fps"] and not spec["min_fps"] <= video["fps"] <= spec["max_fps"]:
+            issues["video"].append(f"{video['fps']} fps")
+        if (video["bitrate"] or 0) > spec["max_video_bitrate"]:
+            issues["video"].append(f"video bitrate {video['bitrate']}")
+
+        audio = probe["audio"]
+        if audio is None:
+            issues["audio"].append("no audio track")
+        else:
+            if audio["codec"] not in spec["audio_codecs"]:
+                issues["audio"].append(f"audio codec {audio['codec']}")
+            if audio["sample_rate"] not in spec["sample_rates"]:
+                issues["audio"].append(f"sample rate {audio['sample_rate']}")
+
+        if probe["container"] != "mp4":
+            issues["remux"].append(f"container {probe['container']}")
+        elif not probe["faststart"]:
+            issues["remux"].append("moov atom after mdat")
+        return issues
+
+    # --- Fix ---
+
+    def _fix_image(self, path, probe, spec, out_path):
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            # Crop to the nearest allowed aspect, then cap the width
+            aspect = img.width / img.height
+            if aspect < spec["min_aspect"]:
+                h = round(img.width / spec["min_aspect"])
+                top = (img.height - h) // 2
+                img = img.crop((0, top, img.width, top + h))
+            elif aspect > spec["max_aspect"]:
+                w = round(img.height * spec["max_aspect"])
+                left = (img.width - w) // 2
+                img = img.crop((left, 0, left + w, img.height))
+            if img.width > spec["max_width"]:
+                img = img.resize((spec["max_width"], round(img.height * spec["max_width"] / img.width)), Image.LANCZOS)
+            img.save(out_path, "JPEG", quality=95)
+
+    def _ffmpeg_args(self, probe, spec, issues):
+        args = []
+        if probe["audio"] is None:
+            args += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
+                     "-map", "0:v:0", "-map", "1:a:0", "-shortest"]
+        else:
+            args += ["-map", "0:v:0", "-map", "0:a:0"]
+
+        if issues["video"]:
+            video = probe["video"]
+            filters = []
+            aspect = video["width"] / video["height"]
+            if (not spec["min_aspect"] - ASPECT_TOLERANCE <= aspect <= spec["max_aspect"] + ASPECT_TOLERANCE
+                    or video["width"] < spec["min_width"]):
+                w, h = spec["frame"]
+                filters.append(f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+            if video["fps"] and not spec["min_fps"] <= video["fps"] <= spec["max_fps"]:
+                filters.append(f"fps={min(max(video['fps'], 30), spec['max_fps'])}")
+            if filters:
+                args += ["-vf", ",".join(filters)]
+            maxrate = min(spec["max_video_bitrate"], 12_000_000)
+            args += ["-c:v", "libx264", "-preset", "medium", "-crf", "20", "-pix_fmt", "yuv420p",
+                     "-maxrate", str(maxrate), "-bufsize", str(maxrate * 2)]
+        else:
+            args += ["-c:v", "copy"]
+
+        if issues["audio"]:
+            args += ["-c:a", "aac", "-b:a", "128k", "-ar", "44100", "-ac", "2"]
+        else:
+            args += ["-c:a", "copy"]
+        return args + ["-movflags", "+faststart"]
+
+    def _fix_video(self, path, args, out_path):
+        tmp_path = out_path + ".part.mp4"
+        cmd = [ffmpeg_binary(), "-y", "-loglevel", "error", "-i", path] + args + [tmp_path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise PreflightError(f"Transcode failed: {result.stderr.strip()[:300]}")
+        os.replace(tmp_path, out_path)
+
+    # --- Entry point ---
+
+    def prepare(self, path, target):
+        """
+        Return the path to upload for `target`: the original file if it already fits,
+        otherwise a fixed copy in cache_dir. Raises PreflightError if it can't be made to fit.
+        """
+        if target not in self.specs:
+            return path
+        os.makedirs(self.cache_dir, exist_ok=True)
+        digest = self._content_hash(path)
+
+        with self._lock(digest):
+            record = self._load_record(digest)
+            cached = record["targets"].get(target)
+            if cached and cached.get("error"):
+                raise PreflightError(cached["error"])
+            if cached and (not cached["path"] or os.path.exists(cached["path"])):
+                return cached["path"] or path
+
+            if record["probe"] is None:
+                record["probe"] = self.probe(path)
+            probe, spec = record["probe"], self.specs[target]
+            issues = self.check(probe, target)
+
+            if issues["fatal"]:
+                error = f"{os.path.basename(path)} rejected for {target}: {'; '.join(issues['fatal'])}"
+                record["targets"][target] = {"error": error}
+                self._save_record(digest, record)
+                raise PreflightError(error)
+
+            actions = [step for step in ("video", "audio", "remux") if issues[step]]
+            out_path = ""
+            if actions:
+                logger.info(f"Pre-flight {target}: fixing {os.path.basename(path)} ({', '.join(sum(issues.values(), []))})")
+                if probe["kind"] == "image":
+                    out_path = os.path.join(self.cache_dir, f"{digest[:16]}_{target}.jpg")
+                    self._fix_image(path, probe, spec, out_path)
+                else:
+                    # Named after the ffmpeg arguments, so targets needing the same fix share one transcode
+                    args = self._ffmpeg_args(probe, spec, issues)
+                    fix_key = hashlib.sha1(json.dumps(args).encode()).hexdigest()[:10]
+                    out_path = os.path.join(self.cache_dir, f"{digest[:16]}_{fix_key}.mp4")
+                    if not os.path.exists(out_path):
+                        self._fix_video(path, args, out_path)
+
+                remaining = self.check(self.probe(out_path), target)
+                if any(remaining.values()):
+                    raise PreflightError(f"Still out of spec for {target} after fixing: {sum(remaining.values(), [])}")
+
+            record["targets"][target] = {"path": out_path, "actions": actions, "issues": sum(issues.values(), [])}
+            self._save_record(digest, record)
+            return out_path or path
+
+    def discard(self, path):
+        """Delete the fixed copies and the record made for a file, once every upload of it has settled."""
+        try:
+            digest = self._content_hash(path)
+        except OSError:
+            return
+        with self._lock(digest):
+            record = self._load_record(digest)
+            fixed = {result["path"] for result in record["targets"].values() if result.get("path")}
+            for fixed_path in fixed | {self._record_path(digest)}:
+                try:
+                    os.remove(fixed_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not delete {fixed_path}: {e}")
+        self._hashes = {key: value for key, value in self._hashes.items() if value != digest}
@@ -1,135 +1,338 @@
 import os
 import json
+import time
 import logging
-from instagrapi import Client
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uploads import ResumableUploader
+from preflight import Preflight, PreflightError
+from brands import get_brand
+from metrics import span
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Publisher")
 
+# Upload targets per asset type, and the platform each one counts against
+PUBLISH_TARGETS = {
+    "image": ["instagram_photo"],
+    "video": ["instagram_reel", "youtube_short"],
+}
+TARGET_PLATFORM = {
+    "instagram_photo": "instagram",
+    "instagram_reel": "instagram",
+    "youtube_short": "youtube",
+}
+
 class Publisher:
-    def __init__(self):
-        self.ig_client = Client()
-        self.ig_session_file = "settings.json"
+    def __init__(self, brand=None):
+        # Accounts (session / token files) come from the brand profile; one Publisher per brand
+        self.brand = brand or get_brand()
+        accounts = self.brand["accounts"]
+        self._ig_client = None # instagrapi is slow to import, so the client is created on first use
+        self._ig_client_lock = threading.Lock()
+        self.ig_session_file = accounts["instagram"]["session_file"]
+        self.ig_validate_interval = 300 # Seconds a validated session is trusted before checking again
+        self._ig_lock = threading.Lock()
+        self._ig_logged_in = False
+        self._ig_validated_at = 0
         
         # YouTube Setup
         self.youtube_scopes = ["https://www.googleapis.com/auth/youtube.upload"]
-        self.youtube_service = None
+        self.youtube_token_file = accounts["youtube"]["token_file"]
+        self.youtube_client_secret_file = accounts["youtube"]["client_secret_file"]
+        self.youtube_session = None # Authorized HTTP session (token refresh handled by google-auth)
+        self.youtube_upload_url = "https://www.googleapis.com/upload/youtube/v3/videos"
+        self.youtube_chunk_size = 8 * 1024 * 1024 # Multiple of 256 KiB
+        self.youtube_max_retries = 8
+        self.youtube_backoff_base = 1.0 # Seconds, doubled per retry
+        self.upload_state_dir = "output/upload_state/" # Resumable session URIs + offsets
+
+        # Concurrent uploads allowed per platform
+        # (one Instagram client = one upload at a time)
+        self.platform_limits = {"instagram": 1, "youtube": 2}
+        self._platform_slots = {p: threading.BoundedSemaphore(n) for p, n in self.platform_limits.items()}
+
+        # Local spec check (and minimal fix) before anything is uploaded; None disables it
+        self.preflight = Preflight()
+
+    @property
+    def ig_client(self):
+        if self._ig_client is None:
+            with self._ig_client_lock:
+                if self._ig_client is None:
+                    from instagrapi import Client
+                    self._ig_client = Client()
+        return self._ig_client
+
+    @ig_client.setter
+    def ig_client(self, client):
+        self._ig_client = client
 
     def login_instagram(self, username, password):
         """
         Logins to Instagram with session management.
+        Reuses the stored session when one cheap call confirms it is still valid,
+        and only does a full login when it isn't.
         """
-        if os.path.exists(self.ig_session_file):
-            logger.info("Loading Instagram session from settings.json")
-            self.ig_client.load_settings(self.ig_session_file)
-            
+        with self._ig_lock:
+            # Same long-lived client, recently validated: nothing to do
+            if self._ig_logged_in and time.time() - self._ig_validated_at < self.ig_validate_interval:
+                return True
+
+            if not self._ig_logged_in and os.path.exists(self.ig_session_file):
+                logger.info(f"Loading Instagram session from {self.ig_session_file}")
+                try:
+                    self.ig_client.load_settings(self.ig_session_file)
+                except Exception as e:
+                    logger.warning(f"Could not load Instagram session: {e}")
+
+            if self.ig_client.user_id and self._validate_instagram_session():
+                self._ig_logged_in = True
+                self._ig_validated_at = time.time()
+                self.save_instagram_session()
+                logger.info("Instagram session reused.")
+                return True
+
+            try:
+                # Stored session missing or rejected: full login, keeping the same device identity
+                self.ig_client.login(username, password, relogin=bool(self.ig_client.user_id))
+                self._ig_logged_in = True
+                self._ig_validated_at = time.time()
+                self.save_instagram_session()
+                logger.info("Instagram login successful.")
+                return True
+            except Exception as e:
+                self._ig_logged_in = False
+                logger.error(f"Instagram login failed: {e}")
+                return False
+
+    def _validate_instagram_session(self):
+        """One light authenticated request; fails if the session was revoked or expired."""
         try:
-            # Check if session is valid by making a light request? 
-            # Or just try login. login() in instagrapi handles re-login if session invalid usually.
-            self.ig_client.login(username, password)
-            self.ig_client.dump_settings(self.ig_session_file)
-            logger.info("Instagram login successful.")
+            self.ig_client.get_timeline_feed()
             return True
         except Exception as e:
-            logger.error(f"Instagram login failed: {e}")
+            logger.info(f"Stored Instagram session is no longer valid: {e}")
             return False
 
+    def save_instagram_session(self):
+        """Write the client's session (cookies, device, auth) atomically so a crash never leaves a torn file."""
+        settings = self.ig_client.get_settings()
+        directory = os.path.dirname(os.path.abspath(self.ig_session_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".settings_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(settings, f, indent=4)
+            os.replace(tmp_path, self.ig_session_file)
+        except Exception as e:
+            logger.warning(f"Could not save Instagram session: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def upload_instagram_photo(self, image_path, caption):
         """
         Uploads a photo to Instagram.
         """
         logger.info(f"Uploading photo to Instagram: {image_path}")
-        try:
-            self.ig_client.photo_upload(image_path, caption=caption)
-            logger.info("Photo uploaded successfully.")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to upload photo to Instagram: {e}")
-            return False
+        with span("publish.instagram_photo") as s:
+            try:
+                self.ig_client.photo_upload(image_path, caption=caption)
+                s.add_file(image_path)
+                logger.info("Photo uploaded successfully.")
+                self.save_instagram_session() # Keep refreshed cookies
+                return True
+            except Exception as e:
+                logger.error(f"Failed to upload photo to Instagram: {e}")
+                s.fail(e)
+                self._ig_validated_at = 0 # Re-check the session before the next upload
+                return False
 
     def upload_instagram_reel(self, video_path, caption):
         """
         Uploads a reel to Instagram.
         """
         logger.info(f"Uploading reel to Instagram: {video_path}")
-        try:
-            self.ig_client.clip_upload(video_path, caption=caption)
-            logger.info("Reel uploaded successfully.")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to upload reel to Instagram: {e}")
-            return False
+        with span("publish.instagram_reel") as s:
+            try:
+                self.ig_client.clip_upload(video_path, caption=caption)
+                s.add_file(video_path)
+                logger.info("Reel uploaded successfully.")
+                self.save_instagram_session() # Keep refreshed cookies
+                return True
+            except Exception as e:
+                logger.error(f"Failed to upload reel to Instagram: {e}")
+                s.fail(e)
+                self._ig_validated_at = 0 # Re-check the session before the next upload
+                return False
 
     def authenticate_youtube(self):
         """
         Authenticates with YouTube API.
         """
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request, AuthorizedSession
         creds = None
-        if os.path.exists("token.json"):
-            creds = Credentials.from_authorized_user_file("token.json", self.youtube_scopes)
+        if os.path.exists(self.youtube_token_file):
+            creds = Credentials.from_authorized_user_file(self.youtube_token_file, self.youtube_scopes)
         
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
-                if os.path.exists("client_secret.json"):
-                     flow = InstalledAppFlow.from_client_secrets_file("client_secret.json", self.youtube_scopes)
+                if os.path.exists(self.youtube_client_secret_file):
+                     flow = InstalledAppFlow.from_client_secrets_file(self.youtube_client_secret_file, self.youtube_scopes)
                      creds = flow.run_local_server(port=0)
                 else:
-                    logger.error("client_secret.json not found for YouTube.")
+                    logger.error(f"{self.youtube_client_secret_file} not found for YouTube.")
                     return False
             
-            with open("token.json", "w") as token:
+            with open(self.youtube_token_file, "w") as token:
                 token.write(creds.to_json())
                 
-        self.youtube_service = build("youtube", "v3", credentials=creds)
+        self.youtube_session = AuthorizedSession(creds)
         logger.info("YouTube authentication successful.")
         return True
 
     def upload_youtube_short(self, video_path, title, description=""):
         """
         Uploads a Short to YouTube.
+        Chunked resumable upload: retries with backoff on 5xx / network errors and,
+        after a restart, resumes from the last byte the server committed.
         """
-        if not self.youtube_service:
+        if not self.youtube_session:
             if not self.authenticate_youtube():
                 return False
 
         logger.info(f"Uploading Short to YouTube: {video_path}")
-        try:
-            body = {
-                "snippet": {
-                    "title": title,
-                    "description": description,
-                    "tags": ["F1", "MotoGP", "RacingTamizhan", "Shorts"],
-                    "categoryId": "17" # Sports
-                },
-                "status": {
-                    "privacyStatus": "private", # Default to private for safety
-                    "selfDeclaredMadeForKids": False,
+        with span("publish.youtube_short") as s:
+            try:
+                body = {
+                    "snippet": {
+                        "title": title,
+                        "description": description,
+                        "tags": self.youtube_tags(),
+                        "categoryId": "17" # Sports
+                    },
+                    "status": {
+                        "privacyStatus": "private", # Default to private for safety
+                        "selfDeclaredMadeForKids": False,
+                    }
                 }
-            }
-            
-            media = MediaFileUpload(video_path, chunksize=-1, resumable=True)
-            request = self.youtube_service.videos().insert(
-                part=",".join(body.keys()),
-                body=body,
-                media_body=media
-            )
-            
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    logger.info(f"Uploaded {int(status.progress() * 100)}%")
+
+                uploader = ResumableUploader(
+                    session=self.youtube_session,
+                    state_dir=self.upload_state_dir,
+                    chunk_size=self.youtube_chunk_size,
+                    max_retries=self.youtube_max_retries,
+                    backoff_base=self.youtube_backoff_base,
+                )
+                init_url = f"{self.youtube_upload_url}?uploadType=resumable&part={','.join(body.keys())}"
+                uploader.upload(init_url, video_path, body, content_type="video/*",
+                                progress=lambda sent, total: logger.info(f"Uploaded {int(sent * 100 / total)}%"))
             
-            logger.info("YouTube upload complete.")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to upload to YouTube: {e}")
-            return False
+                s.add_file(video_path)
+                logger.info("YouTube upload complete.")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to upload to YouTube: {e}")
+                s.fail(e)
+                return False
+
+    def youtube_tags(self):
+        """The brand's hashtags as YouTube tags (no '#'), plus Shorts."""
+        return [t.lstrip("#") for t in self.brand["hashtags"]] + ["Shorts"]
+
+    def set_platform_limit(self, platform, limit):
+        """Change how many uploads may run at once on a platform (takes effect for new uploads)."""
+        self.platform_limits[platform] = limit
+        self._platform_slots[platform] = threading.BoundedSemaphore(limit)
+
+    def publish_target(self, asset, target, queued_at=None):
+        """
+        Upload one asset to one target (see PUBLISH_TARGETS), waiting for a free slot on its platform.
+        The file goes through pre-flight first; the fixed copy (if any) is what gets uploaded.
+        Returns {"ok": bool, "seconds": float, "upload_seconds": float}, plus "error" and
+        "retryable": False when pre-flight rejects the asset (retrying can't fix it). "seconds" runs from queued_at (default: now) to the end, so it includes
+        pre-flight and the wait for a slot; "upload_seconds" is the upload alone.
+        """
+        if target not in TARGET_PLATFORM:
+            raise ValueError(f"Unknown publish target: {target}")
+        start = queued_at or time.time()
+        caption = asset.get('caption', 'No caption')
+
+        # Probe / fix outside the platform slot, it is local work
+        path = asset['path']
+        if self.preflight:
+            try:
+                path = self.preflight.prepare(path, target)
+            except PreflightError as e:
+                logger.error(f"Pre-flight failed: {e}")
+                return {"ok": False, "seconds": round(time.time() - start, 3), "upload_seconds": 0.0, "error": str(e),
+                        "retryable": False}
+
+        with self._platform_slots[TARGET_PLATFORM[target]]:
+            upload_start = time.time()
+            if target == "instagram_photo":
+                ok = self.upload_instagram_photo(path, caption)
+            elif target == "instagram_reel":
+                ok = self.upload_instagram_reel(path, caption)
+            else:
+                ok = self.upload_youtube_short(path, asset['data']['headline_en'], caption)
+        end = time.time()
+        return {"ok": ok, "seconds": round(end - start, 3), "upload_seconds": round(end - upload_start, 3)}
+
+    def publish_many(self, assets):
+        """
+        Publish several assets to all of their targets concurrently, bounded by platform_limits.
+        Each platform gets its own threads (as many as its limit), so a backlog on one platform
+        never holds up uploads to another. Wall time approaches the slowest platform's queue
+        instead of the sum of every upload.
+        Returns one {target: result} dict per asset, in order.
+        """
+        jobs = [(i, target) for i, asset in enumerate(assets) for target in PUBLISH_TARGETS.get(asset['type'], [])]
+        results = [{} for _ in assets]
+        if not jobs:
+            return results
+
+        per_platform = {}
+        for i, target in jobs:
+            per_platform[TARGET_PLATFORM[target]] = per_platform.get(TARGET_PLATFORM[target], 0) + 1
+        pools = {platform: ThreadPoolExecutor(max_workers=min(n, self.platform_limits[platform]),
+                                              thread_name_prefix=f"publish-{platform}")
+                 for platform, n in per_platform.items()}
+        try:
+            futures = {(i, target): pools[TARGET_PLATFORM[target]].submit(self.publish_target, assets[i], target,
+                                                                          queued_at=time.time())
+                       for i, target in jobs}
+            for (i, target), future in futures.items():
+                try:
+                    results[i][target] = future.result()
+                except Exception as e:
+                    logger.error(f"Publish to {target} crashed: {e}")
+                    results[i][target] = {"ok": False, "seconds": 0.0, "upload_seconds": 0.0}
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+        return results
+
+    def publish_asset(self, asset):
+        """Publish one asset to all of its targets concurrently."""
+        return self.publish_many([asset])[0]
+
+
+_shared_publishers = {} # brand name -> Publisher
+_shared_lock = threading.Lock()
+
+def get_publisher(brand=None):
+    """
+    One long-lived Publisher per brand and process, shared by dashboard sessions and daemon cycles,
+    so the Instagram session is logged in (or validated) once instead of per run.
+    """
+    brand = brand or get_brand()
+    with _shared_lock:
+        if brand["name"] not in _shared_publishers:
+            _shared_publishers[brand["name"]] = Publisher(brand)
+        return _shared_publishers[brand["name"]]
@@ -0,0 +1,416 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from brands import get_brand
+from manifest import AssetManifest, render_key
+from preflight import file_hash
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("RenderQueue")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS render_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    items TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS render_jobs_due ON render_jobs (state, id);
+"""
+
+KINDS = ("image", "video")
+
+
+class RenderBroker(ABC):
+    """
+    Where render jobs wait for workers and finished outputs wait for the caller.
+
+    A job is {"id", "kind", "profile", "brand", "items", "state", "attempts", "result", ...};
+    its result is {"name", "hash", "size", "artifact"}. Implement these methods to move
+    jobs through something else (Redis, a cloud queue + object store...) and pass the
+    instance to RenderWorker / RemoteStudio; SQLiteRenderBroker is the default, for
+    workers on one host. Workers on several machines need a broker built on a shared service.
+    """
+
+    @abstractmethod
+    def submit(self, kind, profile, brand, items):
+        """Queue a render. Identical requests share one job. Returns the job id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id):
+        """Atomically take the next queued job (leased to worker_id), or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job_id, path):
+        """Store the rendered file with its content hash and mark the job done."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job_id, error):
+        """Requeue the job, or give up after max_attempts."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id):
+        """The job as a dict, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch(self, result, dest_dir):
+        """Copy a finished output into dest_dir and verify its hash. Returns the local path."""
+        raise NotImplementedError
+
+    def recover(self):
+        """Requeue jobs whose worker died (lease expired). Returns how many."""
+        return 0
+
+
+class SQLiteRenderBroker(RenderBroker):
+    """
+    Render jobs in a SQLite table and outputs in a content-addressed directory next to it.
+
+    Single host: any number of worker processes on the machine that holds the database can
+    pull jobs. The database runs in WAL mode, which relies on shared memory and does not
+    work on network filesystems, so don't share it over a mount. Claims are leased: a worker
+    that dies mid-render loses its lease and the job goes back to the queue.
+    """
+
+    STATES = ("queued", "running", "done", "failed")
+
+    def __init__(self, db_path="output/render_queue.db", store_dir="output/render_store/", max_attempts=3,
+                 lease_seconds=900):
+        self.db_path = db_path
+        self.store_dir = store_dir
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        os.makedirs(store_dir, exist_ok=True)
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row):
+        job = dict(row)
+        job["items"] = json.loads(job["items"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, kind, profile, brand, items):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown render kind: {kind}")
+        key = render_key(kind, profile, items, {"brand": brand})
+        now = time.time()
+        with self._db() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO render_jobs (job_key, kind, profile, brand, items, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, profile, brand, json.dumps(items, default=str), now, now),
+            )
+            if cursor.rowcount:
+                return cursor.lastrowid
+            job = self._row(conn.execute("SELECT * FROM render_jobs WHERE job_key = ?", (key,)).fetchone())
+            # Same render asked for again: reuse it, unless it failed or its output is gone
+            stale = job["state"] == "failed" or (job["state"] == "done" and not os.path.exists(job["result"]["artifact"]))
+            if stale:
+                conn.execute(
+                    "UPDATE render_jobs SET state = 'queued', attempts = 0, result = NULL, worker = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (now, job["id"]),
+                )
+            return job["id"]
+
+    def claim(self, worker_id):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM render_jobs WHERE state = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE render_jobs SET state = 'running', attempts = attempts + 1, worker = ?, lease_until = ?, "
+                "updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            job = self._row(row)
+            job["attempts"] += 1
+            job["state"] = "running"
+            job["worker"] = worker_id
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, job_id, path):
+        digest = file_hash(path)
+        ext = os.path.splitext(path)[1]
+        artifact = os.path.join(self.store_dir, digest + ext)
+        if not os.path.exists(artifact):
+            tmp_path = f"{artifact}.{uuid.uuid4().hex[:8]}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, artifact)
+        result = {"name": os.path.basename(path), "hash": digest, "size": os.path.getsize(artifact),
+                  "artifact": artifact}
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE render_jobs SET state = 'done', result = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id),
+            )
+        return result
+
+    def fail(self, job_id, error):
+        with self._db() as conn:
+            row = conn.execute("SELECT attempts FROM render_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            state = "failed" if row["attempts"] >= self.max_attempts else "queued"
+            conn.execute(
+                "UPDATE render_jobs SET state = ?, last_error = ?, lease_until = NULL, worker = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (state, error, time.time(), job_id),
+            )
+        if state == "failed":
+            logger.error(f"Render job {job_id} failed permanently: {error}")
+        else:
+            logger.warning(f"Render job {job_id} failed ({error}), requeued")
+
+    def get(self, job_id):
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM render_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def fetch(self, result, dest_dir):
+        os.makedirs(dest_dir, exist_ok=True)
+        path = os.path.join(dest_dir, result["name"])
+        if os.path.exists(path) and os.path.getsize(path) == result["size"] and file_hash(path) == result["hash"]:
+            return path
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(result["artifact"], tmp_path)
+        if file_hash(tmp_path) != result["hash"]:
+            os.remove(tmp_path)
+            raise IOError(f"Render output {result['name']} doesn't match its content hash")
+        os.replace(tmp_path, path)
+        return path
+
+    def recover(self):
+        now = time.time()
+        with self._db() as conn:
+            cursor = conn.execute(
+                "UPDATE render_jobs SET state = 'queued', worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE state = 'running' AND lease_until < ?",
+                (now, now),
+            )
+            return cursor.rowcount
+
+    def counts(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM render_jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in self.STATES}
+        counts.update({r["state"]: r["n"] for r in rows})
+        return counts
+
+
+class RenderWorker:
+    """
+    Pulls render jobs from a broker and runs them on a local Studio (one per brand,
+    created on first use), so photos and voiceovers are fetched into this machine's cache.
+    Start as many as there are cores to spare (with SQLiteRenderBroker, on the broker's host).
+    """
+
+    def __init__(self, broker, worker_id=None, poll_interval=0.5, studio_factory=None):
+        self.broker = broker
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.poll_interval = poll_interval
+        self.studio_factory = studio_factory # callable(brand) -> Studio; default: a draft Studio for the brand
+        self.processed = 0
+        self.failed = 0
+        self._studios = {}
+        self._stop = threading.Event()
+
+    def _studio(self, brand_name):
+        if brand_name not in self._studios:
+            brand = get_brand(brand_name)
+            if self.studio_factory:
+                self._studios[brand_name] = self.studio_factory(brand)
+            else:
+                from studio import Studio
+                self._studios[brand_name] = Studio(profile="draft", brand=brand)
+        return self._studios[brand_name]
+
+    def run_job(self, job):
+        studio = self._studio(job["brand"])
+        if job["kind"] == "image":
+            path = studio.generate_image(job["items"][0], profile=job["profile"])
+        else:
+            path = studio.generate_video(job["items"], profile=job["profile"])
+        if not path:
+            raise RuntimeError(f"{job['kind']} render produced no file")
+        return self.broker.complete(job["id"], path)
+
+    def run_once(self):
+        """Claim and run one job. Returns False when the queue was empty."""
+        job = self.broker.claim(self.worker_id)
+        if job is None:
+            return False
+        started = time.time()
+        try:
+            result = self.run_job(job)
+            self.processed += 1
+            logger.info(f"{self.worker_id}: job {job['id']} ({job['kind']}) done in {time.time() - started:.1f}s "
+                        f"-> {result['name']}")
+        except Exception as e:
+            self.failed += 1
+            self.broker.fail(job["id"], str(e))
+        return True
+
+    def run(self, max_jobs=None, exit_when_idle=False):
+        while not self._stop.is_set():
+            if max_jobs is not None and self.processed + self.failed >= max_jobs:
+                break
+            if not self.run_once():
+                if exit_when_idle:
+                    break
+                self.broker.recover()
+                self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+class RemoteStudio:
+    """
+    Stand-in for Studio that sends generate_image / generate_video to render workers through
+    a broker and waits for the result, so Pipeline, Daemon and the dashboard can offload
+    rendering without changes. Outputs are copied into this machine's output_path and
+    recorded in the local manifest, so repeated requests don't go to the workers at all.
+    """
+
+    def __init__(self, broker, profile="final", brand=None, timeout=900, poll_interval=0.1):
+        self.broker = broker
+        self.profile = profile
+        self.brand = brand or get_brand()
+        self.output_path = self.brand["output_path"]
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.manifest = AssetManifest()
+
+    def _render(self, kind, items, profile):
+        from studio import RENDER_PROFILES
+        profile = profile or self.profile
+        key = render_key(kind, profile, items, dict(RENDER_PROFILES[profile], brand=self.brand["name"]))
+        if self.manifest:
+            record = self.manifest.lookup(key)
+            if record:
+                return record["path"]
+
+        job_id = self.broker.submit(kind, profile, self.brand["name"], items)
+        deadline = time.time() + self.timeout
+        while True:
+            job = self.broker.get(job_id)
+            if job["state"] == "done":
+                break
+            if job["state"] == "failed":
+                logger.error(f"Render job {job_id} failed: {job['last_error']}")
+                return None
+            if time.time() > deadline:
+                logger.error(f"Render job {job_id} still {job['state']} after {self.timeout}s")
+                return None
+            time.sleep(self.poll_interval)
+
+        path = self.broker.fetch(job["result"], self.output_path)
+        if self.manifest:
+            self.manifest.record(key, kind, profile, path, items)
+        return path
+
+    def generate_image(self, news_item, profile=None):
+        return self._render("image", [news_item], profile)
+
+    def generate_video(self, news_items, profile=None, streaming=None):
+        return self._render("video", news_items, profile)
+
+    def render_final(self, asset):
+        if asset.get('profile', 'final') == 'final':
+            return asset['path']
+        if asset['type'] == 'image':
+            return self.generate_image(asset['data'], profile="final")
+        if asset['type'] == 'video':
+            return self.generate_video(asset.get('items', []), profile="final")
+        return None
+
+
+def make_studio(profile="final", brand=None):
+    """A local Studio, or a RemoteStudio on the render queue when RENDER_QUEUE is set."""
+    if os.getenv("RENDER_QUEUE"):
+        broker = SQLiteRenderBroker(os.getenv("RENDER_QUEUE"), os.getenv("RENDER_STORE", "output/render_store/"))
+        return RemoteStudio(broker, profile=profile, brand=brand)
+    from studio import Studio
+    return Studio(profile=profile, brand=brand)
+
+
+def _worker_process(db_path, store_dir):
+    worker = RenderWorker(SQLiteRenderBroker(db_path, store_dir))
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render worker processes pulling from the render queue.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("RENDER_PROCESSES", str(os.cpu_count() or 1))))
+    parser.add_argument("--db", default=os.getenv("RENDER_QUEUE", "output/render_queue.db"))
+    parser.add_argument("--store", default=os.getenv("RENDER_STORE", "output/render_store/"))
+    args = parser.parse_args()
+
+    logger.info(f"Starting {args.workers} render worker(s) on {args.db}")
+    processes = [multiprocessing.Process(target=_worker_process, args=(args.db, args.store), daemon=True)
+                 for _ in range(args.workers)]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping render workers...")
+        for p in processes:
+            p.terminate()
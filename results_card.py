@@ -0,0 +1,284 @@
+import os
+import re
+import logging
+from contextlib import contextmanager
+import numpy as np
+from PIL import Image, ImageDraw
+from metrics import span
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Results")
+
+CARD_SIZE = (1080, 1350) # Same as the "feed" news card
+HEADER_H = 230
+ROW_TOP = 270
+FOOTER_H = 70
+MAX_ROW_H = 52
+GAP_BAR_W = (6, 200) # Gap bar length range (px), scaled to the largest gap on the lead lap
+FASTF1_CACHE = "output/fastf1_cache/"
+
+SESSION_NAMES = {"R": "RACE", "S": "SPRINT", "Q": "QUALIFYING", "SQ": "SPRINT QUALIFYING",
+                 "FP1": "PRACTICE 1", "FP2": "PRACTICE 2", "FP3": "PRACTICE 3"}
+
+
+@contextmanager
+def fastf1_cache(cache_dir=None, offline=False):
+    """
+    The fastf1 module with its on-disk cache enabled (FASTF1_CACHE). offline=True serves cached
+    data only; FastF1's offline mode is process-wide, so it is switched off again on the way out.
+    """
+    import fastf1 # Pulls in pandas / matplotlib; only needed here
+    cache_dir = cache_dir or FASTF1_CACHE
+    os.makedirs(cache_dir, exist_ok=True)
+    fastf1.Cache.enable_cache(cache_dir)
+    if offline:
+        fastf1.Cache.offline_mode(True)
+    try:
+        yield fastf1
+    finally:
+        if offline:
+            fastf1.Cache.offline_mode(False)
+
+
+def load_session_results(year, gp, session="R", cache_dir=None, offline=False):
+    """
+    (event name, results DataFrame) for one session, through FastF1's on-disk cache.
+    offline=True never touches the network: only sessions loaded once before are available.
+    """
+    with fastf1_cache(cache_dir, offline) as fastf1:
+        s = fastf1.get_session(year, gp, session)
+        s.load(laps=False, telemetry=False, weather=False, messages=False)
+        return s.event["EventName"], s.results
+
+
+def _race_time(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours)}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def results_records(results):
+    """
+    Session results DataFrame (FastF1 columns) -> JSON-able rows in finishing order.
+
+    Gaps are computed column-wise: the winner gets the race time, the rest of the lead lap
+    "+s.sss", everyone else their status ("+1 Lap", "Retired"...).
+    """
+    df = results.sort_values("Position", na_position="last")
+    n = len(df)
+    seconds = df["Time"].dt.total_seconds().to_numpy(dtype=float) if "Time" in df else np.full(n, np.nan)
+    status = df["Status"].fillna("").astype(str).to_numpy() if "Status" in df else np.full(n, "")
+    on_time = ~np.isnan(seconds)
+    gap = np.where(on_time, np.char.add("+", np.char.mod("%.3f", np.nan_to_num(seconds))), status)
+    if n and on_time[0]:
+        gap[0] = _race_time(seconds[0])
+
+    def column(name, default=None):
+        return df[name].tolist() if name in df else [default] * n
+
+    colors = [f"#{c}" if c and not str(c).startswith("#") else (c or "") for c in column("TeamColor", "")]
+    return [
+        {
+            "position": int(position) if position == position else None, # NaN -> None
+            "abbreviation": abbreviation,
+            "name": name,
+            "team": team,
+            "team_color": color,
+            "gap": str(g),
+            "gap_seconds": None if i == 0 or not t else float(s),
+            "status": str(st),
+            "points": float(points) if points == points else 0.0,
+            "grid": int(grid) if grid == grid and grid else None,
+        }
+        for i, (position, abbreviation, name, team, color, g, t, s, st, points, grid) in enumerate(zip(
+            column("Position"), column("Abbreviation", ""), column("FullName", ""), column("TeamName", ""),
+            colors, gap, on_time, seconds, status, column("Points", 0.0), column("GridPosition")))
+    ]
+
+
+def _hex_color(value):
+    value = (value or "").lstrip("#")
+    if not re.fullmatch(r"[0-9a-fA-F]{6}", value):
+        return None
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class ResultsRenderer:
+    """
+    Classification card and one card per driver for a session, in team palettes.
+
+    Everything cards have in common is drawn once and kept as a layer: the classification
+    background (gradient, header, row stripes), and one backdrop per team for the driver
+    cards. Row positions, colour chips and gap bars for the whole grid are computed as arrays
+    in one pass, so a 20-driver grid is one background, at most one backdrop per team and
+    a text pass per card instead of 20 full renders.
+    """
+
+    def __init__(self, studio):
+        self.studio = studio # Fonts, logo, brand, palettes and output settings
+        self._layers = {}
+        self._palettes = {}
+
+    def _layer(self, key, build):
+        if key not in self._layers:
+            self._layers[key] = build()
+        return self._layers[key]
+
+    def team_palette(self, team, team_color=""):
+        """(primary, accent): the entity index colours, else FastF1's team colour on a dark base."""
+        if team not in self._palettes:
+            index = self.studio.entity_index
+            colors = index.colors([m for m in index.match(team) if m["kind"] == "team"])
+            if colors == index.default_colors:
+                accent = _hex_color(team_color)
+                colors = ((15, 20, 35), accent) if accent else self.studio.get_team_colors(team, matches=[])
+            self._palettes[team] = tuple(tuple(int(v) for v in c) for c in colors)
+        return self._palettes[team]
+
+    # --- Layout (vectorized over the grid) ---
+
+    def layout(self, rows):
+        """Row geometry and colours for the classification, as arrays indexed by row."""
+        n = len(rows)
+        width, height = CARD_SIZE
+        row_h = max(min(MAX_ROW_H, (height - ROW_TOP - FOOTER_H) // max(n, 1)), 1)
+        gaps = np.array([r["gap_seconds"] if r["gap_seconds"] is not None else np.nan for r in rows], dtype=float)
+        finite = ~np.isnan(gaps)
+        largest = gaps[finite].max() if finite.any() else 0.0
+        bars = np.zeros(n, dtype=int)
+        if largest > 0:
+            bars[finite] = np.interp(gaps[finite], [0, largest], GAP_BAR_W).astype(int)
+        palettes = np.array([self.team_palette(r["team"], r["team_color"]) for r in rows], dtype=np.uint8).reshape(n, 2, 3)
+        return {
+            "n": n,
+            "row_h": row_h,
+            "y": ROW_TOP + np.arange(n) * row_h,
+            "bars": bars,
+            "primary": palettes[:, 0],
+            "accent": palettes[:, 1],
+        }
+
+    # --- Cached layers ---
+
+    def _background(self, n, row_h):
+        """Gradient, header band and alternating row stripes (depends only on the row count and brand)."""
+        def build():
+            width, height = CARD_SIZE
+            top, bottom = (np.array(c, dtype=float) for c in self.studio.get_team_colors("", matches=[]))
+            t = np.linspace(0.0, 1.0, height)[:, None]
+            rows = (np.array([8, 10, 18], dtype=float) * (1 - t) + top * 0.35 * t).astype(np.uint8)
+            canvas = np.repeat(rows[:, None, :], width, axis=1)
+            canvas[:HEADER_H] = (canvas[:HEADER_H] * 0.4 + bottom * 0.6).astype(np.uint8)
+            canvas[HEADER_H:HEADER_H + 8] = bottom.astype(np.uint8)
+
+            row = (np.arange(height) - ROW_TOP) // row_h
+            stripes = (np.arange(height) >= ROW_TOP) & (row < n) & (row % 2 == 1)
+            canvas[stripes] = np.minimum(canvas[stripes].astype(int) + 18, 255).astype(np.uint8)
+            return Image.fromarray(canvas)
+        return self._layer(("classification", n, row_h), build)
+
+    def _team_backdrop(self, primary, accent):
+        """Full-card gradient in a team's colours with a diagonal accent band."""
+        def build():
+            width, height = CARD_SIZE
+            t = np.linspace(0.0, 1.0, height)[:, None, None]
+            base = np.array(primary, dtype=float) * (1 - t) * 0.9 + np.array([5, 5, 10], dtype=float) * t
+            canvas = np.repeat(base, width, axis=1)
+            ys, xs = np.mgrid[0:height, 0:width]
+            band = np.abs((xs - width * 0.88) + (ys - height * 0.5) * 0.25) < 40
+            canvas[band] = canvas[band] * 0.3 + np.array(accent, dtype=float) * 0.7
+            return Image.fromarray(canvas.astype(np.uint8))
+        return self._layer(("team", primary, accent), build)
+
+    # --- Cards ---
+
+    def _header(self, draw, event, session):
+        width = CARD_SIZE[0]
+        draw.text((60, 50), self.studio.brand["title"].upper(), font=self.studio._get_font(28), fill=(255, 255, 255))
+        draw.text((60, 95), event.upper(), font=self.studio._get_font(54), fill=(255, 255, 255))
+        draw.text((60, 165), SESSION_NAMES.get(session, session), font=self.studio._get_font(32), fill=(200, 200, 200))
+        logo = self.studio._get_logo()
+        if logo is not None:
+            return logo, (width - logo.width - 50, 50)
+        return None, None
+
+    def classification(self, rows, event, session, layout=None):
+        layout = layout or self.layout(rows)
+        n, row_h = layout["n"], layout["row_h"]
+        canvas = np.array(self._background(n, row_h))
+
+        # Team chips and gap bars for every row at once
+        width = CARD_SIZE[0]
+        block = slice(ROW_TOP, ROW_TOP + n * row_h)
+        per_pixel_row = np.repeat(np.arange(n), row_h)
+        canvas[block, 150:160] = layout["accent"][per_pixel_row][:, None, :]
+        bar_x0 = width - 60 - GAP_BAR_W[1]
+        xs = np.arange(GAP_BAR_W[1])
+        inside = (xs[None, :] < layout["bars"][per_pixel_row][:, None])
+        inset = (np.arange(n * row_h) % row_h >= row_h // 3) & (np.arange(n * row_h) % row_h < row_h - row_h // 3)
+        mask = inside & inset[:, None]
+        region = canvas[block, bar_x0:bar_x0 + GAP_BAR_W[1]]
+        region[mask] = np.repeat(layout["accent"], row_h, axis=0)[np.nonzero(mask)[0]]
+
+        img = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(img)
+        logo, logo_at = self._header(draw, event, session)
+        if logo is not None:
+            img.paste(logo, logo_at, logo)
+
+        font = self.studio._get_font(max(min(row_h - 22, 30), 10))
+        small = self.studio._get_font(max(min(row_h - 28, 22), 8))
+        for r, y in zip(rows, layout["y"].tolist()):
+            text_y = y + (row_h - font.size) // 2 if hasattr(font, "size") else y
+            draw.text((60, text_y), str(r["position"] or "-"), font=font, fill=(255, 255, 255))
+            draw.text((180, text_y), r["abbreviation"] or r["name"][:3].upper(), font=font, fill=(255, 255, 255))
+            draw.text((300, text_y + 4), r["team"].upper(), font=small, fill=(190, 190, 190))
+            draw.text((660, text_y), r["gap"], font=font, fill=(255, 255, 255))
+        return img
+
+    def driver_card(self, row, event, session):
+        primary, accent = self.team_palette(row["team"], row["team_color"])
+        img = self._team_backdrop(primary, accent).copy()
+        draw = ImageDraw.Draw(img)
+        logo, logo_at = self._header(draw, event, session)
+        if logo is not None:
+            img.paste(logo, logo_at, logo)
+
+        draw.text((60, 300), f"P{row['position'] or '-'}", font=self.studio._get_font(260), fill=(255, 255, 255))
+        draw.text((60, 640), row["name"].upper(), font=self.studio._get_font(70), fill=(255, 255, 255))
+        draw.text((60, 730), row["team"].upper(), font=self.studio._get_font(40), fill=accent)
+
+        stats = [("GAP", row["gap"]), ("POINTS", f"{row['points']:g}")]
+        if row["grid"] and row["position"]:
+            moved = row["grid"] - row["position"]
+            stats.append(("GRID", f"P{row['grid']} ({'+' if moved > 0 else ''}{moved})" if moved else f"P{row['grid']}"))
+        for i, (label, value) in enumerate(stats):
+            y = 900 + i * 120
+            draw.text((60, y), label, font=self.studio._get_font(28), fill=(200, 200, 200))
+            draw.text((60, y + 35), value, font=self.studio._get_font(54), fill=(255, 255, 255))
+        return img
+
+    def render(self, news_item, profile_name, settings, drivers=True):
+        """
+        Classification card (+ one card per driver) for a RESULT item carrying session
+        results (see Scout.fetch_telemetry). Returns {"classification": path, "drivers": {abbreviation: path}}.
+        """
+        rows = news_item["results"]
+        event = news_item.get("event", news_item.get("headline_en", ""))
+        session = news_item.get("session", "R")
+        with span("studio.results", profile=profile_name, drivers=len(rows) if drivers else 0) as s:
+            layout = self.layout(rows)
+            path = self.studio._save_card(self.classification(rows, event, session, layout), news_item,
+                                          profile_name, settings)
+            s.add_file(path)
+            paths = {"classification": path, "drivers": {}}
+            if drivers:
+                for row in rows:
+                    key = row["abbreviation"] or str(row["position"])
+                    card = self.driver_card(row, event, session)
+                    paths["drivers"][key] = self.studio._save_card(card, {"id": f"{news_item['id']}_{key}"},
+                                                                   profile_name, settings)
+                    s.add_file(paths["drivers"][key])
+        logger.info(f"Rendered results for {event} ({len(rows)} drivers, {len(self._layers)} cached layers)")
+        return paths
@@ -1,97 +1,188 @@
 import feedparser
 import requests
 from bs4 import BeautifulSoup
-from newspaper import Article
-import fastf1
-import pandas as pd
 import json
 import logging
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from entities import load_index
+from brands import get_brand
+from metrics import metrics, span
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Scout")
 
 class Scout:
-    def __init__(self):
-        self.rss_feeds = [
-            "https://www.motorsport.com/rss/f1/news/",
-            "https://www.autosport.com/rss/feed/f1",
-            "https://www.motorsport.com/rss/motogp/news/",
-            "https://www.autosport.com/rss/feed/motogp"
-        ]
+    def __init__(self, feeds=None):
+        # One Scout can serve several brands: pass the union of their feeds (brands.feed_union)
+        self.rss_feeds = list(feeds) if feeds is not None else list(get_brand()["feeds"])
+        self.entity_index = load_index()
+
+        # Warm state, reused when one Scout serves many cycles (daemon)
+        self.http = requests.Session() # Keep-alive connections to the news sites
+        self.http.headers["User-Agent"] = "Mozilla/5.0 (compatible; RacingTamizhan/1.0)"
+        self.feed_state = {} # url -> {"etag", "modified", "entries"} for conditional GETs
+        self.article_cache = OrderedDict() # link -> summary
+        self.article_cache_size = 500
+        self._cache_lock = threading.Lock() # build_item runs on several threads in the pipeline
+        self.seen_ids = OrderedDict() # Items already handed out
+        self.seen_limit = 5000
         # Enable FastF1 cache - assuming a default location or user config
         # fastf1.Cache.enable_cache('path/to/cache') # Uncomment and set path if needed
 
-    def fetch_news(self):
+    def fetch_news(self, force=False):
         """
         Fetches latest news from RSS feeds.
         Filters for 'Breaking', 'Results', 'Driver Transfers' logic to be improved.
+        force=True downloads every feed in full (no conditional GET).
+        """
+        with span("scout.fetch_news") as s:
+            items = list(self.iter_news(force=force))
+            s.set(items=len(items))
+        return items
+
+    def iter_news(self, force=False):
+        """Yields news items one by one as each article is fetched, so later stages can start early."""
+        for entry, url in self.iter_entries(force=force):
+            yield self.build_item(entry, url)
+
+    def iter_entries(self, new_only=False, force=False):
+        """
+        Yields (entry, feed_url) for the top entries of each feed. Cheap: one request per feed.
+        new_only=True (daemon, pipeline) skips entries this Scout has already yielded.
+        Feeds are fetched with ETag / Last-Modified, so an unchanged feed costs a 304: a poll for
+        new stories skips it, otherwise its last entries are yielded again. force=True skips the
+        conditional headers.
         """
         logger.info("Fetching news from RSS feeds...")
-        news_items = []
-        
         for url in self.rss_feeds:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]: # Check top 5 from each
-                # Basic filtering logic (can be expanded)
-                title = entry.title
-                link = entry.link
-                image_url = self._extract_image(entry)
-                
-                # Check for keywords
-                title_lower = title.lower()
-                item_type = "NEWS" # Default
-                
-                if "result" in title_lower or "qualifying" in title_lower or "practice" in title_lower or "winner" in title_lower:
-                    item_type = "RESULT"
-                elif "transfer" in title_lower or "sign" in title_lower or "contract" in title_lower:
-                     item_type = "OFFICIAL"
-                elif "rumour" in title_lower or "report" in title_lower or "suggests" in title_lower or "could" in title_lower:
-                     item_type = "RUMOUR"
-                elif "breaking" in title_lower:
-                     item_type = "BREAKING"
-                elif "analysis" in title_lower or "tech" in title_lower:
-                     item_type = "ANALYSIS"
-                
-                # Clean summary
-                summary = ""
-                # Clean summary
-                summary = ""
-                try:
-                    # Attempt full text extraction
-                    article = Article(link)
-                    article.download()
-                    article.parse()
-                    
-                    # Use the first 500-600 characters but try to end on a full sentence
-                    full_text = article.text.strip()
-                    if len(full_text) > 600:
-                        summary = full_text[:600].rsplit('.', 1)[0] + "."
-                    else:
-                        summary = full_text
-                except Exception as e:
-                    logger.warning(f"Scraping failed for {link}: {e}")
-
-                if not summary and 'summary' in entry:
-                    # Fallback to RSS summary
-                    soup = BeautifulSoup(entry.summary, "html.parser")
-                    summary = soup.get_text()[:400] + "..."
-                
-                # Create item
-                item = {
-                    "id": entry.id if 'id' in entry else link,
-                    "headline_en": title,
-                    "headline_ta": self.translate_headline(title),
-                    "summary": summary,
-                    "image_url": image_url,
-                    "link": link,
-                    "type": item_type,
-                    "source": "RSS"
-                }
-                news_items.append(item)
-                
-        return news_items
+            state = self.feed_state.get(url, {})
+            # Without the previous entries to fall back on, only a poll for new stories can use a 304
+            conditional = (new_only or "entries" in state) and not force
+            with span("scout.feed", feed=url) as s:
+                feed = feedparser.parse(url, etag=state.get("etag") if conditional else None,
+                                        modified=state.get("modified") if conditional else None)
+                if getattr(feed, "status", None) == 304:
+                    s.hit() # Unchanged since the last poll
+                else:
+                    s.miss()
+            if s.cache == "hit":
+                if new_only or "entries" not in state:
+                    continue
+                entries = state["entries"]
+            else:
+                entries = feed.entries[:5] # Check top 5 from each
+                self.feed_state[url] = {"etag": getattr(feed, "etag", None), "modified": getattr(feed, "modified", None),
+                                        "entries": entries}
+
+            for entry in entries:
+                entry_id = entry.id if 'id' in entry else entry.link
+                if new_only and entry_id in self.seen_ids:
+                    continue
+                self.seen_ids[entry_id] = True
+                self.seen_ids.move_to_end(entry_id)
+                while len(self.seen_ids) > self.seen_limit:
+                    self.seen_ids.popitem(last=False)
+                yield entry, url
+
+    def build_item(self, entry, url):
+        """Turns one feed entry into a news item (downloads the full article)."""
+        # Basic filtering logic (can be expanded)
+        title = entry.title
+        link = entry.link
+        image_url = self._extract_image(entry)
+
+        # Check for keywords
+        title_lower = title.lower()
+        item_type = "NEWS" # Default
+
+        if "result" in title_lower or "qualifying" in title_lower or "practice" in title_lower or "winner" in title_lower:
+            item_type = "RESULT"
+        elif "transfer" in title_lower or "sign" in title_lower or "contract" in title_lower:
+             item_type = "OFFICIAL"
+        elif "rumour" in title_lower or "report" in title_lower or "suggests" in title_lower or "could" in title_lower:
+             item_type = "RUMOUR"
+        elif "breaking" in title_lower:
+             item_type = "BREAKING"
+        elif "analysis" in title_lower or "tech" in title_lower:
+             item_type = "ANALYSIS"
+
+        # Clean summary
+        summary = self._fetch_summary(link)
+
+        if not summary and 'summary' in entry:
+            # Fallback to RSS summary
+            soup = BeautifulSoup(entry.summary, "html.parser")
+            summary = soup.get_text()[:400] + "..."
+
+        # Entities (drivers, riders, teams, series) - one pass, reused by Studio & Dashboard
+        entities = self.entity_index.match(title)
+        series = self.entity_index.series(entities)
+        if not series:
+            series = "MotoGP" if "motogp" in url else "Formula 1"
+
+        # Feed date (UTC, ISO 8601) for filtering; feedparser normalises the RSS / Atom formats
+        published = entry.get('published_parsed') or entry.get('updated_parsed')
+        if published:
+            published = datetime(*published[:6], tzinfo=timezone.utc).isoformat()
+
+        metrics.count("news_items")
+
+        # Create item
+        return {
+            "id": entry.id if 'id' in entry else link,
+            "headline_en": title,
+            "headline_ta": self.translate_headline(title),
+            "summary": summary,
+            "image_url": image_url,
+            "link": link,
+            "type": item_type,
+            "source": "RSS",
+            "feed": url,
+            "published": published,
+            "series": series,
+            "entities": entities
+        }
+
+    def _fetch_summary(self, link):
+        """Full-text summary of an article, downloaded once per link."""
+        with span("scout.article") as s:
+            with self._cache_lock:
+                if link in self.article_cache:
+                    self.article_cache.move_to_end(link)
+                    s.hit()
+                    return self.article_cache[link]
+            s.miss()
+
+            summary = ""
+            try:
+                # Attempt full text extraction
+                response = self.http.get(link, timeout=15)
+                response.raise_for_status()
+                s.add_bytes(len(response.content))
+                from newspaper import Article # Heavy (lxml, nltk); loaded on the first article
+                article = Article(link)
+                article.download(input_html=response.text)
+                article.parse()
+
+                # Use the first 500-600 characters but try to end on a full sentence
+                full_text = article.text.strip()
+                if len(full_text) > 600:
+                    summary = full_text[:600].rsplit('.', 1)[0] + "."
+                else:
+                    summary = full_text
+            except Exception as e:
+                logger.warning(f"Scraping failed for {link}: {e}")
+                s.fail(e)
+                return summary # Not cached, retried next time
+
+        with self._cache_lock:
+            self.article_cache[link] = summary
+            while len(self.article_cache) > self.article_cache_size:
+                self.article_cache.popitem(last=False)
+        return summary
 
     def _extract_image(self, entry):
         """
@@ -105,29 +196,54 @@ class Scout:
                      return l.href
         return None
 
-    def fetch_telemetry(self, year=None, gp=None, session='R'):
+    def fetch_telemetry(self, year=None, gp=None, session='R', offline=False):
         """
-        Fetches race results using FastF1.
-        Defaults to latest race if not specified.
+        Session results as a RESULT item (Studio renders it as a classification card).
+        Defaults to the latest completed race. Goes through FastF1's on-disk cache
+        (output/fastf1_cache/); offline=True only uses sessions already in it.
         """
         logger.info("Fetching telemetry/results...")
-        if not year or not gp:
-            # Logic to find latest race could happen here
-            # For now, let's just return a placeholder or specific race for testing
-            # Getting the schedule for current year
-            try:
-                current_year = datetime.now().year
-                schedule = fastf1.get_event_schedule(current_year)
-                # Logic to find last completed race
-                # This is complex, for MVP we might manual trigger or just check recent
-                pass
-            except Exception as e:
-                logger.error(f"Error fetching schedule: {e}")
-                return []
+        from results_card import fastf1_cache, load_session_results, results_records
+        try:
+            if not year or not gp:
+                year = year or datetime.now().year
+                # The schedule goes through the same cache (and offline mode) as the session
+                with fastf1_cache(offline=offline) as fastf1:
+                    schedule = fastf1.get_event_schedule(year, include_testing=False)
+                past = schedule[schedule["EventDate"] < datetime.now()]
+                if past.empty:
+                    logger.info(f"No completed {year} event yet.")
+                    return []
+                gp = int(past.iloc[-1]["RoundNumber"])
+            event, results = load_session_results(year, gp, session, offline=offline)
+        except Exception as e:
+            logger.error(f"Error fetching results: {e}")
+            return []
 
-        # Example: Return dummy result data structure for now
-        # In a real scenario, we would `fastf1.get_session(year, gp, session).load()`
-        return []
+        rows = results_records(results)
+        if not rows:
+            return []
+        podium = ", ".join(f"{r['position']}. {r['name']}" for r in rows[:3])
+        headline = f"{event}: {rows[0]['name']} wins" if session == 'R' else f"{event}: {rows[0]['name']} tops {session}"
+        entities = self.entity_index.match(headline)
+        metrics.count("news_items")
+        return [{
+            "id": f"results_{year}_{gp}_{session}".replace(" ", "_"),
+            "headline_en": headline,
+            "headline_ta": self.translate_headline(headline),
+            "summary": podium,
+            "image_url": None,
+            "link": "",
+            "type": "RESULT",
+            "source": "FastF1",
+            "feed": None,
+            "published": datetime.now(timezone.utc).isoformat(),
+            "series": "Formula 1",
+            "entities": entities,
+            "event": event,
+            "session": session,
+            "results": rows,
+        }]
 
     def translate_headline(self, text):
         """
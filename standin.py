@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import uuid
+import random
+import tempfile
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import requests
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("StandIn")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Emulates the upload endpoints Publisher talks to:
+      Instagram (instagrapi photo_upload / clip_upload):
+        POST /rupload_igphoto/<name>, POST /rupload_igvideo/<name>,
+        POST /api/v1/media/configure/, POST /api/v1/media/configure_to_clips/,
+        GET  /api/v1/feed/timeline/ (session check)
+      YouTube (videos.insert, resumable):
+        POST /upload/youtube/v3/videos?uploadType=resumable, PUT /upload/youtube/v3/videos?upload_id=<id>
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    # --- Helpers ---
+
+    def _reply(self, code, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(code)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        """Read the request body, throttled to the configured bandwidth."""
+        remaining = int(self.headers.get("Content-Length", 0))
+        bandwidth = self.server.bandwidth
+        chunks = []
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            if bandwidth:
+                time.sleep(len(chunk) / bandwidth)
+        data = b"".join(chunks)
+        with self.server.lock:
+            self.server.stats["bytes_in"] += len(data)
+        return data
+
+    def _inject(self):
+        """Latency + failure injection. Returns True if this request should fail."""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.stats["requests"] += 1
+            fail = server.rng.random() < server.failure_rate
+            if fail:
+                server.stats["injected_failures"] += 1
+        return fail
+
+    # --- Routing ---
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/stats":
+            with self.server.lock:
+                return self._reply(200, dict(self.server.stats))
+        if path == "/api/v1/feed/timeline/":
+            return self._reply(200, {"status": "ok", "feed_items": []})
+        self._reply(404, {"status": "fail", "message": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        data = self._read_body()
+        if self._inject():
+            return self._reply(503, {"status": "fail", "message": "injected failure"})
+
+        if url.path.startswith("/rupload_igphoto/") or url.path.startswith("/rupload_igvideo/"):
+            upload_id = self.headers.get("X-Instagram-Rupload-Params-Upload-Id") or str(int(time.time() * 1000))
+            with self.server.lock:
+                self.server.stats["ig_rupload"] += 1
+            return self._reply(200, {"status": "ok", "upload_id": upload_id, "xsharing_nonces": {}})
+
+        if url.path in ("/api/v1/media/configure/", "/api/v1/media/configure_to_clips/"):
+            with self.server.lock:
+                self.server.stats["ig_configure"] += 1
+                pk = self.server.stats["ig_configure"]
+            return self._reply(200, {"status": "ok", "media": {"pk": str(pk), "code": f"STANDIN{pk}"}})
+
+        if url.path == "/upload/youtube/v3/videos" and parse_qs(url.query).get("uploadType") == ["resumable"]:
+            session_id = uuid.uuid4().hex
+            total = int(self.headers.get("X-Upload-Content-Length", 0))
+            with self.server.lock:
+                self.server.sessions[session_id] = {"total": total, "received": 0, "metadata": json.loads(data or b"{}")}
+            host = self.headers.get("Host", f"127.0.0.1:{self.server.server_port}")
+            return self._reply(200, {}, {"Location": f"http://{host}/upload/youtube/v3/videos?upload_id={session_id}"})
+
+        self._reply(404, {"status": "fail", "message": "not found"})
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        data = self._read_body()
+        session_id = (parse_qs(url.query).get("upload_id") or [None])[0]
+        with self.server.lock:
+            session = self.server.sessions.get(session_id)
+        if url.path != "/upload/youtube/v3/videos" or session is None:
+            return self._reply(404, {"error": "unknown upload session"})
+        if self._inject():
+            return self._reply(503, {"error": "injected failure"}) # Chunk not committed
+
+        content_range = self.headers.get("Content-Range", "")
+        if not content_range.startswith("bytes */"):
+            start = int(content_range.split(" ")[1].split("-")[0])
+            if start == session["received"]:
+                session["received"] += len(data)
+
+        if session["received"] >= session["total"]:
+            with self.server.lock:
+                self.server.stats["yt_complete"] += 1
+            return self._reply(200, {"id": f"standin-{session_id[:11]}", "status": {"uploadStatus": "uploaded"}})
+        headers = {"Range": f"bytes=0-{session['received'] - 1}"} if session["received"] else {}
+        self._reply(308, None, headers)
+
+
+class StandinServer:
+    """
+    Local stand-in for the Instagram and YouTube upload endpoints.
+
+    latency:      seconds added to every request
+    bandwidth:    bytes/second cap per connection (None = unlimited)
+    failure_rate: probability [0, 1] of answering 503 instead of handling the request
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, bandwidth=None, failure_rate=0.0, seed=0):
+        self.httpd = ThreadingHTTPServer((host, port), StandinHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.bandwidth = bandwidth
+        self.httpd.failure_rate = failure_rate
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.sessions = {}
+        self.httpd.stats = {"requests": 0, "bytes_in": 0, "injected_failures": 0,
+                            "ig_rupload": 0, "ig_configure": 0, "yt_complete": 0}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self):
+        with self.httpd.lock:
+            return dict(self.httpd.stats)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in upload service listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StandinInstagramClient:
+    """
+    Drop-in for the parts of instagrapi.Client that Publisher uses, speaking the same
+    rupload + configure sequence to a StandinServer instead of i.instagram.com.
+    """
+
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.user_id = None
+        self.settings = {}
+
+    def _check(self, response):
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def _rupload(self, kind, path):
+        upload_id = str(int(time.time() * 1000))
+        name = f"{upload_id}_0_{random.randint(1000000000, 9999999999)}"
+        with open(path, "rb") as f:
+            data = f.read()
+        self._check(self.http.post(
+            f"{self.base_url}/rupload_{kind}/{name}", data=data, timeout=self.timeout,
+            headers={"X-Instagram-Rupload-Params-Upload-Id": upload_id, "X-Entity-Length": str(len(data))},
+        ))
+        return upload_id
+
+    def photo_upload(self, path, caption=""):
+        upload_id = self._rupload("igphoto", path)
+        return self._check(self.http.post(f"{self.base_url}/api/v1/media/configure/", timeout=self.timeout,
+                                          data={"upload_id": upload_id, "caption": caption}))["media"]
+
+    def clip_upload(self, path, caption=""):
+        upload_id = self._rupload("igvideo", path)
+        return self._check(self.http.post(f"{self.base_url}/api/v1/media/configure_to_clips/", timeout=self.timeout,
+                                          data={"upload_id": upload_id, "caption": caption}))["media"]
+
+    def get_timeline_feed(self):
+        return self._check(self.http.get(f"{self.base_url}/api/v1/feed/timeline/", timeout=self.timeout))
+
+    def login(self, username, password, relogin=False):
+        self.user_id = "1"
+        return True
+
+    def load_settings(self, path):
+        with open(path) as f:
+            self.settings = json.load(f)
+
+    def get_settings(self):
+        return self.settings
+
+
+def attach_publisher(publisher, server_url):
+    """Point a Publisher at a stand-in server (Instagram client + YouTube upload endpoint)."""
+    publisher.ig_client = StandinInstagramClient(server_url)
+    publisher.ig_client.user_id = "1"
+    publisher.youtube_session = requests.Session()
+    publisher.youtube_upload_url = f"{server_url}/upload/youtube/v3/videos"
+    publisher.ig_session_file = os.path.join(tempfile.gettempdir(), "standin_settings.json") # Never touch the real session
+    return publisher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Instagram / YouTube upload endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bytes/second per connection")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of a 503 per request")
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, args.latency, args.bandwidth, args.failure_rate)
+    logger.info(f"Stand-in upload service listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,13 +1,22 @@
 import os
+import re
 import requests
 from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageOps
 import numpy as np
 import logging
 import asyncio
-import edge_tts
-from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip, CompositeAudioClip, CompositeVideoClip, TextClip
 from datetime import datetime
-import random
+import hashlib
+import shutil
+import gc
+import subprocess
+import threading
+from entities import load_index
+from brands import get_brand
+from manifest import AssetManifest, render_key
+from results_card import ResultsRenderer
+from metrics import span
+import compositing
 
 # MONKEYPATCH: Fix MoviePy compatibility with Pillow 10+
 if not hasattr(Image, 'ANTIALIAS'):
@@ -17,40 +26,103 @@ if not hasattr(Image, 'ANTIALIAS'):
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Studio")
 
+# Render Profiles
+# "draft" is for quick review in the dashboard / CLI, "final" is what gets published.
+# Both render from the same cached inputs (photos + TTS), so approving a draft only pays for the final encode.
+RENDER_PROFILES = {
+    "draft": {
+        "scale": 0.5,           # 540x674 cards
+        "fps": 15,
+        "preset": "ultrafast",
+        "image_format": "WEBP", # Dashboard previews: a fraction of the JPEG bytes
+        "image_quality": 80,
+        "image_effort": 2,      # WebP method (0-6)
+    },
+    "final": {
+        "scale": 1.0,           # 1080x1350 cards
+        "fps": 30,
+        "preset": "medium",     # libx264 default
+        "image_format": "JPEG", # What Instagram takes as is (pre-flight would re-encode a PNG to JPEG anyway)
+        "image_quality": 95,
+        "image_effort": 1,      # Optimized Huffman tables
+    },
+}
+
+# Card encoders: file extension and PIL save options from (quality, effort).
+# Set "image_format": "PNG" on a profile for lossless cards (image_quality is then ignored).
+IMAGE_ENCODERS = {
+    "JPEG": ("jpg", lambda quality, effort: {"quality": quality, "optimize": effort > 0,
+                                             # Full chroma for the coloured headline / tag edges
+                                             "subsampling": 0 if quality >= 90 else 2}),
+    "WEBP": ("webp", lambda quality, effort: {"quality": quality, "method": min(effort, 6)} if quality is not None
+                                             else {"lossless": True, "method": min(effort, 6)}),
+    "PNG": ("png", lambda quality, effort: {"compress_level": min(effort, 9)}),
+}
+
+# Output Formats (width, height). The info card is always the bottom CARD_H px, the photo fills the rest.
+FORMATS = {
+    "feed": (1080, 1350),    # 4:5 Instagram feed
+    "story": (1080, 1920),   # 9:16 Reels / Shorts / Stories
+    "square": (1080, 1080),  # 1:1
+}
+CARD_W = 1080
+CARD_H = 500
+PHOTO_FADE = 200 # Bottom rows of the photo that fade into the info card
+
+# Shared by every Studio in the process (one per brand): fonts are parsed once per file and size,
+# and a photo or voiceover several brands need at the same time is fetched / synthesized once.
+_font_cache = {}
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _inflight_for(path):
+    with _inflight_lock:
+        return _inflight.setdefault(path, threading.Lock())
+
 class Studio:
-    def __init__(self):
-        self.branding_path = "assets/branding/"
+    def __init__(self, profile="final", brand=None):
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {profile}")
+        self.profile = profile
+
+        # Branding assets, palette, voice and output directory come from the brand profile (config/brands.json);
+        # the photo / TTS cache is shared by every brand
+        self.brand = brand or get_brand()
+        self.branding_path = self.brand["branding_path"]
         self.audio_path = "assets/audio/"
-        self.output_path = "output/review_queue/"
+        self.output_path = self.brand["output_path"]
+        self.cache_path = "output/cache/"
+        self.voice = self.brand["voice"]
         
         # Fonts
         self.font_bold_path = os.path.join(self.branding_path, "font_bold.ttf")
         self.font_reg_path = os.path.join(self.branding_path, "font_regular.ttf")
         self.logo_path = os.path.join(self.branding_path, "logo.png")
         
-        # Team Colors (Primary, Accent)
-        self.team_colors = {
-            "Red Bull": ((6, 29, 66), (255, 0, 0)),        # Navy / Red
-            "Verstappen": ((6, 29, 66), (255, 0, 0)),
-            "Perez": ((6, 29, 66), (255, 0, 0)),
-            "Ferrari": ((200, 0, 0), (255, 242, 0)),      # Red / Yellow
-            "Leclerc": ((200, 0, 0), (255, 242, 0)),
-            "Sainz": ((200, 0, 0), (255, 242, 0)),
-            "Mercedes": ((0, 0, 0), (0, 161, 155)),       # Black / Teal
-            "Hamilton": ((0, 0, 0), (0, 161, 155)),
-            "Russell": ((0, 0, 0), (0, 161, 155)),
-            "McLaren": ((255, 128, 0), (71, 199, 252)),   # Papaya / Blue
-            "Norris": ((255, 128, 0), (71, 199, 252)),
-            "Piastri": ((255, 128, 0), (71, 199, 252)),
-            "Aston Martin": ((0, 111, 98), (206, 220, 0)), # Green / Lime
-            "Alonso": ((0, 111, 98), (206, 220, 0)),
-            # Defaults
-            "Default": ((15, 20, 35), (255, 0, 50))
-        }
+        self._logo = None
+        self._results = None # ResultsRenderer, created for the first RESULT item with session data
+
+        # Identical render requests are served from here; None renders every time
+        self.manifest = AssetManifest()
+
+        # Team Colors (Primary, Accent) come from the shared entity index (config/entities.json)
+        self.entity_index = load_index()
 
         os.makedirs(self.output_path, exist_ok=True)
+        os.makedirs(self.cache_path, exist_ok=True)
         os.makedirs(self.branding_path, exist_ok=True)
 
+    def _get_profile(self, profile=None):
+        name = profile or self.profile
+        if name not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {name}")
+        return name, RENDER_PROFILES[name]
+
+    def _cache_file(self, prefix, key, ext):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_path, f"{prefix}_{digest}.{ext}")
+
     def download_image(self, url, filename):
         try:
             response = requests.get(url, stream=True)
@@ -61,92 +133,149 @@ class Studio:
         except Exception:
             return None
 
-    def get_team_colors(self, text):
-        """Detect team colors from text."""
-        for key, colors in self.team_colors.items():
-            if key.lower() in text.lower():
-                return colors
-        return self.team_colors["Default"]
+    def fetch_photo(self, url):
+        """Download a press photo once and reuse it for every render of the same item."""
+        if not url:
+            return None
+        cached = self._cache_file("photo", url, "img")
+        with span("studio.photo") as s, _inflight_for(cached):
+            if os.path.exists(cached):
+                s.hit()
+                return cached
+            s.miss()
+            path = self.download_image(url, cached)
+            if path:
+                s.add_file(path)
+            else:
+                s.fail(f"download failed: {url}")
+            return path
+
+    def get_team_colors(self, text, matches=None):
+        """Detect team colors from text (or from entity matches already extracted for it)."""
+        if matches is None:
+            matches = self.entity_index.match(text)
+        colors = self.entity_index.colors(matches)
+        if colors == self.entity_index.default_colors and self.brand["palette"]:
+            return tuple(tuple(c) for c in self.brand["palette"])
+        return colors
 
     def create_gradient(self, width, height, color1, color2):
         """Create a vertical gradient."""
-        base = Image.new('RGB', (width, height), color1)
-        top = Image.new('RGB', (width, height), color2)
-        mask = Image.linear_gradient('L')
-        # Rotating mask for vertical gradient
-        mask = mask.resize((width, height))
-        return Image.composite(base, top, mask)
-
-    def generate_image(self, news_item):
-        logger.info(f"Generating PRO image for: {news_item['id']}")
-        
-        WIDTH, HEIGHT = 1080, 1350
-        SPLIT_Y = 850  # Image ends at 850
-        CARD_H = HEIGHT - SPLIT_Y
-        
+        return Image.fromarray(compositing.vertical_gradient(width, height, color2, color1))
+
+    def _get_font(self, size):
+        """TrueType fonts are parsed once per file and size and reused across renders (and brands)."""
+        key = (self.font_bold_path, size)
+        if key not in _font_cache:
+            try:
+                _font_cache[key] = ImageFont.truetype(self.font_bold_path, size)
+            except:
+                _font_cache[key] = ImageFont.load_default()
+        return _font_cache[key]
+
+    def _get_logo(self):
+        if self._logo is None and os.path.exists(self.logo_path):
+            logo = Image.open(self.logo_path).convert("RGBA")
+            logo.thumbnail((120, 120))
+            self._logo = logo
+        return self._logo
+
+    def layout_story(self, news_item):
+        """
+        Everything about a card that doesn't depend on its aspect ratio: palette,
+        decoded photo and the fitted headline. Computed once, composed into any FORMATS entry.
+        """
         headline = news_item.get('headline_en', '')
-        primary_color, accent_color = self.get_team_colors(headline)
-        
-        # 1. Base Canvas
-        canvas = Image.new('RGB', (WIDTH, HEIGHT), primary_color)
-        
-        # 2. Main Image
-        temp_img_path = os.path.join(self.output_path, f"temp_{news_item['id']}.jpg")
-        if self.download_image(news_item['image_url'], temp_img_path):
-            img = Image.open(temp_img_path)
+        primary_color, accent_color = self.get_team_colors(headline, self.entity_index.match_item(news_item))
+
+        # Main Image (cached, so the final render reuses the draft's download)
+        photo = None
+        photo_path = self.fetch_photo(news_item.get('image_url'))
+        if photo_path:
+            img = Image.open(photo_path)
+            # Decode & scale once to just cover the largest photo area of any format,
+            # every format then crops from this instead of the full-size press photo
+            cover_w = CARD_W
+            cover_h = max(h for _, h in FORMATS.values()) - CARD_H + 150
+            img.draft("RGB", (cover_w, cover_h)) # JPEG: decode at reduced scale
+            img = img.convert("RGB")
+            scale = max(cover_w / img.width, cover_h / img.height)
+            if scale < 1:
+                img = img.resize((round(img.width * scale), round(img.height * scale)), Image.Resampling.LANCZOS)
             # Enhance
             enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(1.1)            
-            
-            img = self._resize_and_crop(img, WIDTH, SPLIT_Y + 150) # Bleed into card
-            
-            # Fade bottom of image
-            mask = Image.new('L', (WIDTH, img.height), 255)
-            draw_mask = ImageDraw.Draw(mask)
-            draw_mask.rectangle([(0, img.height - 200), (WIDTH, img.height)], fill=0)
-            # Blur/Gradient mask manually or just paste
-             
-            canvas.paste(img, (0, 0))
-            if os.path.exists(temp_img_path): os.remove(temp_img_path)
-
-        # 3. Info Card Background (Gradient)
-        # Create a gradient from Darker Primary to Lighter Primary
-        card_bg = self.create_gradient(WIDTH, CARD_H, (5,5,10), primary_color)
-        canvas.paste(card_bg, (0, SPLIT_Y))
+            photo = enhancer.enhance(1.1)
+
+        # Text Content - Headline
+        # UPPERCASE everything for impact
+        text_to_draw = headline.upper()
         
-        # 4. Separator Line & Accents
-        draw = ImageDraw.Draw(canvas)
+        # Dynamic Font Scaling
+        # Available height: CARD_H (500) - Top Offset (100) - Bottom Padding (50) = 350px
+        # We start at 80 and go down.
+        max_text_height = CARD_H - 100 - 50
+        current_font_size = 80
+        min_font_size = 40
         
-        # Glow Line
-        draw.line([(0, SPLIT_Y), (WIDTH, SPLIT_Y)], fill=accent_color, width=4)
+        # Iteratively optimize font size
+        with span("studio.text_fit") as s:
+            while True:
+                font_title = self._get_font(current_font_size)
+                lines = self._wrap_lines(text_to_draw, font_title, CARD_W - 100)
+                text_h = sum(h + 15 for _, _, h in lines) # Line spacing
+                if text_h <= max_text_height or current_font_size - 5 < min_font_size:
+                    break # It fits! (or we hit the minimum)
+                current_font_size -= 5
+            s.set(font_size=current_font_size)
+
+        return {
+            "id": news_item['id'],
+            "primary_color": primary_color,
+            "accent_color": accent_color,
+            "photo": photo,
+            "font_title": font_title,
+            "lines": lines,
+        }
+
+    def compose_card(self, layout, width, height):
+        """Draw a laid-out story at the given size. The info card is always the bottom CARD_H px."""
+        SPLIT_Y = height - CARD_H  # Image ends here (850 on the 1080x1350 feed card)
+        primary_color, accent_color = layout["primary_color"], layout["accent_color"]
         
-        # "Audio Wave" Visualizer
-        # Center X
-        wave_x_start = WIDTH // 2 - 150
-        wave_y = SPLIT_Y 
-        for i in range(30):
-            h = random.randint(20, 80)
-            x = wave_x_start + (i * 10)
-            # Draw vertical bars centered on the split line
-            draw.line([(x, wave_y - h/2), (x, wave_y + h/2)], fill=accent_color, width=4)
+        # 1-4. Background, photo, card gradient and accents are composited as one array
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        # Info card: gradient from the team colour down to near-black
+        canvas[SPLIT_Y:] = compositing.vertical_gradient(width, CARD_H, primary_color, (5,5,10))
 
-        # 5. Typography
-        try:
-            # Scaled fonts
-            font_title = ImageFont.truetype(self.font_bold_path, 80)
-            font_quote = ImageFont.truetype(self.font_bold_path, 50) # Use Bold for quote too to match ref
-            font_tag = ImageFont.truetype(self.font_bold_path, 25)
-        except:
-             font_title = ImageFont.load_default()
-             font_quote = ImageFont.load_default()
-             font_tag = ImageFont.load_default()
+        if layout["photo"] is not None:
+            img = self._resize_and_crop(layout["photo"], width, SPLIT_Y + 150) # Bleed into card
+            photo = np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+            # Bottom PHOTO_FADE px of the photo fade into the card instead of ending on a hard edge;
+            # above the card only that band shows the background, the photo covers the rest
+            canvas[photo.shape[0] - PHOTO_FADE:SPLIT_Y] = primary_color
+            compositing.blend(canvas, photo, compositing.fade_alpha(photo.shape[0], PHOTO_FADE))
+        else:
+            canvas[:SPLIT_Y] = primary_color
+
+        # Glow line
+        canvas[SPLIT_Y - 2:SPLIT_Y + 2] = accent_color
+
+        # "Audio Wave" visualizer: 30 bars centred on the split line, seeded by the story so
+        # re-renders are identical
+        heights = compositing.seeded_heights(layout["id"], 30, 20, 80)
+        compositing.visualizer_bars(canvas, width // 2 - 150 - 2, SPLIT_Y, heights, 10, 4, accent_color)
+
+        canvas = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(canvas)
 
+        # 5. Typography
         # Tag (Team Name or Category)
         # Draw skewed box
-        tag_text = "RACING TAMIZHAN"
+        font_tag = self._get_font(25)
+        tag_text = self.brand["title"].upper()
         tag_w = 300
         tag_h = 40
-        tag_x = WIDTH - tag_w - 50
+        tag_x = width - tag_w - 50
         tag_y = SPLIT_Y - 20 # Overlap split
         
         # Box background
@@ -159,53 +288,114 @@ class Studio:
         
         draw.text((tag_x + 30, tag_y + 5), tag_text, font=font_tag, fill=(0,0,0))
 
-        # Text Content - Headline
-        # UPPERCASE everything for impact
-        text_to_draw = headline.upper()
-        
-        # Dynamic Font Scaling
-        # Available height: HEIGHT (1350) - StartY (SPLIT_Y + 100 = 950) - Bottom Padding (50) = 400px
-        # We start at 80 and go down.
-        
-        max_text_height = HEIGHT - (SPLIT_Y + 100) - 50
-        current_font_size = 80
-        min_font_size = 40
-        
-        # Iteratively optimize font size
-        font_title = None
-        while current_font_size >= min_font_size:
-            try:
-                font_title = ImageFont.truetype(self.font_bold_path, current_font_size)
-            except:
-                font_title = ImageFont.load_default()
-                break
-            
-            # Check height
-            _, text_h = self._get_text_size(text_to_draw, font_title, WIDTH - 100)
-            if text_h <= max_text_height:
-                break # It fits!
-            
-            current_font_size -= 5
-            
-        self._draw_text_wrapped(draw, text_to_draw, font_title, (255, 255, 255), WIDTH - 100, SPLIT_Y + 100, align="center")
+        # Headline (pre-wrapped in layout_story)
+        y = SPLIT_Y + 100
+        for line, w, h in layout["lines"]:
+            draw.text(((width - w) // 2, y), line, font=layout["font_title"], fill=(255, 255, 255))
+            y += h + 15
 
         # 6. Logo
-        if os.path.exists(self.logo_path):
-            logo = Image.open(self.logo_path).convert("RGBA")
-            logo.thumbnail((120, 120))
+        logo = self._get_logo()
+        if logo is not None:
             canvas.paste(logo, (50, SPLIT_Y + 50), logo)
 
-        cover_filename = os.path.join(self.output_path, f"slide1_{news_item['id']}.png")
-        canvas.save(cover_filename)
-        logger.info(f"Generated Cover: {cover_filename}")
-        
-        # CLEANUP: User requested NO second slide. 
-        # Just return the single image.
-        
-        if os.path.exists(temp_img_path): os.remove(temp_img_path)
+        return canvas
+
+    def _scale_card(self, canvas, settings):
+        # Output size comes from the profile
+        if settings["scale"] != 1.0:
+            # Even dimensions, otherwise libx264 can't use yuv420p for the reel
+            size = (int(canvas.width * settings["scale"]) // 2 * 2, int(canvas.height * settings["scale"]) // 2 * 2)
+            canvas = canvas.resize(size, Image.Resampling.BILINEAR)
+        return canvas
+
+    def _save_card(self, canvas, news_item, profile_name, settings, fmt="feed"):
+        canvas = self._scale_card(canvas, settings)
 
+        # Feed ids are often article URLs; keep them usable as a file name
+        item_id = re.sub(r"[^\w.-]+", "_", str(news_item['id'])).strip("_")
+        name = f"slide1_{item_id}" if fmt == "feed" else f"slide1_{item_id}_{fmt}"
+        suffix = "" if profile_name == "final" else f"_{profile_name}"
+        ext, options = IMAGE_ENCODERS[settings["image_format"]]
+        cover_filename = os.path.join(self.output_path, f"{name}{suffix}.{ext}")
+        with span("studio.image_encode", format=settings["image_format"]) as s:
+            canvas.save(cover_filename, settings["image_format"],
+                        **options(settings["image_quality"], settings.get("image_effort", 0)))
+            s.add_file(cover_filename)
         return cover_filename
 
+    def generate_formats(self, news_item, formats=("feed", "story", "square"), profile=None):
+        """
+        Render one story in several aspect ratios from a single layout pass:
+        the photo is decoded and the headline fitted once, then composed per format.
+        Returns {format: path}.
+        """
+        profile_name, settings = self._get_profile(profile)
+        unknown = [f for f in formats if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown format(s): {', '.join(unknown)}")
+        logger.info(f"Generating PRO image ({profile_name}, {'/'.join(formats)}) for: {news_item['id']}")
+
+        with span("studio.image", profile=profile_name, formats=len(formats)) as s:
+            layout = self.layout_story(news_item)
+            paths = {}
+            for fmt in formats:
+                width, height = FORMATS[fmt]
+                canvas = self.compose_card(layout, width, height)
+                paths[fmt] = self._save_card(canvas, news_item, profile_name, settings, fmt)
+                s.add_file(paths[fmt])
+                logger.info(f"Generated Cover: {paths[fmt]}")
+        return paths
+
+    def render_frame(self, news_item, fmt="story", profile=None):
+        """
+        The card as an RGB array at the profile's size, for the video path: MoviePy takes the
+        frame straight from memory instead of an encoded image written and decoded again.
+        """
+        profile_name, settings = self._get_profile(profile)
+        with span("studio.frame", profile=profile_name, format=fmt):
+            width, height = FORMATS[fmt]
+            canvas = self.compose_card(self.layout_story(news_item), width, height)
+            return np.asarray(self._scale_card(canvas, settings))
+
+    def _from_manifest(self, kind, profile_name, settings, items):
+        """(render key, path of an identical earlier render or None)."""
+        if not self.manifest:
+            return None, None
+        key = render_key(kind, profile_name, items, dict(settings, brand=self.brand["name"]))
+        record = self.manifest.lookup(key)
+        if record:
+            logger.info(f"Reusing {kind} ({profile_name}) from the manifest: {record['path']}")
+            return key, record['path']
+        return key, None
+
+    def generate_image(self, news_item, profile=None):
+        # CLEANUP: User requested NO second slide. 
+        # Just return the single (4:5 feed) image.
+        profile_name, settings = self._get_profile(profile)
+        key, path = self._from_manifest("image", profile_name, settings, [news_item])
+        if path:
+            return path
+        if news_item.get('results'):
+            # Session classification instead of a headline card
+            path = self.generate_results(news_item, profile=profile_name, drivers=False)["classification"]
+        else:
+            path = self.generate_formats(news_item, formats=("feed",), profile=profile_name)["feed"]
+        if key and path:
+            self.manifest.record(key, "image", profile_name, path, [news_item])
+        return path
+
+    def generate_results(self, news_item, profile=None, drivers=True):
+        """
+        Results graphics for a RESULT item carrying session results (Scout.fetch_telemetry):
+        the classification card and, with drivers=True, one card per driver in team colours.
+        Returns {"classification": path, "drivers": {abbreviation: path}}.
+        """
+        profile_name, settings = self._get_profile(profile)
+        if self._results is None:
+            self._results = ResultsRenderer(self)
+        return self._results.render(news_item, profile_name, settings, drivers=drivers)
+
     def _resize_and_crop(self, img, target_w, target_h):
         img_ratio = img.width / img.height
         target_ratio = target_w / target_h
@@ -222,8 +412,8 @@ class Studio:
         bottom = (img.height + target_h) / 2
         return img.crop((left, top, right, bottom))
 
-    def _get_text_size(self, text, font, max_width):
-        """Calculates the width and height of wrapped text."""
+    def _wrap_lines(self, text, font, max_width):
+        """Greedy word wrap. Returns [(line, width, height)]."""
         lines = []
         words = text.split()
         current_line = []
@@ -238,39 +428,23 @@ class Studio:
                 current_line = [word]
         if current_line:
             lines.append(' '.join(current_line))
-            
-        total_h = 0
-        max_w = 0
+
+        measured = []
         for line in lines:
             bbox = font.getbbox(line)
-            w = bbox[2] - bbox[0]
-            h = bbox[3] - bbox[1]
-            max_w = max(max_w, w)
-            total_h += h + 15 # Line spacing
-            
+            measured.append((line, bbox[2] - bbox[0], bbox[3] - bbox[1]))
+        return measured
+
+    def _get_text_size(self, text, font, max_width):
+        """Calculates the width and height of wrapped text."""
+        lines = self._wrap_lines(text, font, max_width)
+        max_w = max((w for _, w, _ in lines), default=0)
+        total_h = sum(h + 15 for _, _, h in lines) # Line spacing
         return max_w, total_h
 
     def _draw_text_wrapped(self, draw, text, font, color, max_width, start_y, align="center"):
-        lines = []
-        words = text.split()
-        current_line = []
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = font.getbbox(test_line) 
-            w = bbox[2] - bbox[0]
-            if w <= max_width:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-        if current_line:
-            lines.append(' '.join(current_line))
-            
         y = start_y
-        for line in lines:
-            bbox = font.getbbox(line)
-            w = bbox[2] - bbox[0]
-            h = bbox[3] - bbox[1]
+        for line, w, h in self._wrap_lines(text, font, max_width):
             if align == "center":
                 x = (1080 - w) // 2
             else:
@@ -280,11 +454,21 @@ class Studio:
 
     async def _generate_tts(self, text, output_file, voice="en-GB-SoniaNeural"):
         """Async helper to generate TTS."""
+        import edge_tts
         communicate = edge_tts.Communicate(text, voice)
         await communicate.save(output_file)
 
-    def _run_tts_sync(self, text, output_file):
+    def _run_tts_sync(self, text, output_file, voice=None):
         """Run async TTS in sync context, handling existing loops."""
+        with span("studio.tts_generate", chars=len(text)) as s:
+            ok = self._run_tts(text, output_file, voice or self.voice)
+            if ok:
+                s.add_file(output_file)
+            else:
+                s.fail("TTS generation failed")
+            return ok
+
+    def _run_tts(self, text, output_file, voice="en-GB-SoniaNeural"):
         try:
             try:
                 loop = asyncio.get_event_loop()
@@ -302,12 +486,12 @@ class Studio:
                     # Use a new loop in a safe generic way
                     import concurrent.futures
                     with concurrent.futures.ThreadPoolExecutor() as pool:
-                        future = pool.submit(asyncio.run, self._generate_tts(text, output_file))
+                        future = pool.submit(asyncio.run, self._generate_tts(text, output_file, voice))
                         future.result()
                     return True
             except RuntimeError:
                 # No loop running, standard run
-                asyncio.run(self._generate_tts(text, output_file))
+                asyncio.run(self._generate_tts(text, output_file, voice))
                 return True
         except Exception as e:
             logger.error(f"TTS Generation failed: {e}")
@@ -323,73 +507,118 @@ class Studio:
         
         return clip.resize(zoom)
 
-    def generate_video(self, news_items):
+    def get_voiceover(self, text):
+        """Return a cached TTS file for this text in the brand's voice, generating it on first use."""
+        audio_path = self._cache_file("tts", f"{self.voice}:{text}", "mp3")
+        with span("studio.tts") as s, _inflight_for(audio_path):
+            if os.path.exists(audio_path):
+                s.hit()
+                return audio_path
+            s.miss()
+            if self._run_tts_sync(text, audio_path) and os.path.exists(audio_path):
+                return audio_path
+            s.fail("no voiceover")
+            return None
+
+    def render_final(self, asset):
+        """
+        Re-render an approved draft asset with the "final" profile.
+        Photos and voiceovers come from the cache, so this is only the final encode.
+        """
+        if asset.get('profile', 'final') == 'final':
+            return asset['path']
+        if asset['type'] == 'image':
+            return self.generate_image(asset['data'], profile="final")
+        if asset['type'] == 'video':
+            return self.generate_video(asset.get('items', []), profile="final")
+        return None
+
+    def _background_music_path(self):
+        if os.path.exists(self.audio_path):
+            files = sorted(f for f in os.listdir(self.audio_path) if f.endswith(".mp3"))
+            if files:
+                return os.path.join(self.audio_path, files[0])
+        return None
+
+    def _voiceover_text(self, item):
+        # Use summary or headline
+        text_to_read = item.get('headline_en', '') + ". " + item.get('summary', '')
+        # Clean text lightly
+        return text_to_read.replace("#", "").replace("\n", " ")
+
+    def _reel_filename(self, profile_name):
+        suffix = "" if profile_name == "final" else f"_{profile_name}"
+        return os.path.join(self.output_path, f"reel_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}.mp4")
+
+    def generate_video(self, news_items, profile=None, streaming=True):
         """
         Generates a dynamic vertical video digest (Reel/Short) from news items.
         Features: AI Voiceover, Ken Burns Effect, Background Music.
+
+        streaming=True renders one segment at a time and releases it before the next,
+        so memory and open file handles stay flat however long the digest is.
+        streaming=False builds the whole digest as one MoviePy graph.
         """
-        logger.info(f"Generating advanced video digest for {len(news_items)} items...")
+        profile_name, settings = self._get_profile(profile)
+        key, path = self._from_manifest("video", profile_name, settings, news_items)
+        if path:
+            return path
+        with span("studio.video", profile=profile_name, items=len(news_items), streaming=streaming) as s:
+            if streaming:
+                path = self._generate_video_streaming(news_items, profile_name, settings)
+            else:
+                path = self._generate_video_composed(news_items, profile_name, settings)
+            if path:
+                s.add_file(path)
+            else:
+                s.fail("no video")
+        if key and path:
+            self.manifest.record(key, "video", profile_name, path, news_items)
+        return path
+
+    def _generate_video_composed(self, news_items, profile_name, settings):
+        """The whole digest as one MoviePy graph (streaming=False)."""
+        logger.info(f"Generating advanced video digest ({profile_name}) for {len(news_items)} items...")
+        from moviepy.editor import ImageClip, concatenate_videoclips, AudioFileClip, CompositeAudioClip
         
         clips = []
+        voice_clips = [] # Each holds an ffmpeg reader, closed after export
         
         # Background Audio (Music) - Load once
         bg_music = None
-        if os.path.exists(self.audio_path):
-            files = [f for f in os.listdir(self.audio_path) if f.endswith(".mp3")]
-            if files:
-                bg_music_path = os.path.join(self.audio_path, files[0])
-                try:
-                    bg_music = AudioFileClip(bg_music_path)
-                except:
-                    pass
-
-        temp_files = [] # Track for cleanup
+        bg_music_path = self._background_music_path()
+        if bg_music_path:
+            try:
+                bg_music = AudioFileClip(bg_music_path)
+            except:
+                pass
 
         for item in news_items:
             # 1. Get Image
-            img_path = self.generate_image(item) # This returns a single path now (Cover)
-            if not img_path: continue
+            frame = self.render_frame(item, "story", profile=profile_name) # Native 9:16 frame
             
             # 2. Generate Voiceover
-            # Use summary or headline
-            text_to_read = item.get('headline_en', '') + ". " + item.get('summary', '')
-            # Clean text lightly
-            text_to_read = text_to_read.replace("#", "").replace("\n", " ")
-            
-            audio_path = os.path.join(self.output_path, f"tts_{item['id']}.mp3")
-            
-            # Check if we should re-generate or reuse? Regenerate for now.
-            if self._run_tts_sync(text_to_read, audio_path):
-                temp_files.append(audio_path)
-            else:
-                audio_path = None # Fallback to silence/duration?
+            # Cached per text, so the final render reuses the draft's voiceover
+            audio_path = self.get_voiceover(self._voiceover_text(item)) # None -> fallback to silence/duration
 
             try:
                 # 3. Create Audio Clip
                 if audio_path and os.path.exists(audio_path):
                     voice_clip = AudioFileClip(audio_path)
+                    voice_clips.append(voice_clip)
                     duration = voice_clip.duration + 0.5 # Add small pause
                 else:
                     voice_clip = None
                     duration = 3.0 # Default fallback
                 
                 # 4. Create Image Clip
-                # Enforce resolution? Images are 1080x1350 (4:5). 
-                # YouTube Shorts is 1080x1920 (9:16).
-                # To fill 9:16 with 4:5, we can center it on black.
-                
-                img_clip = ImageClip(img_path).set_duration(duration)
+                # Cards are rendered natively at 1080x1920 (9:16) for Shorts / Reels, no letterboxing.
+                img_clip = ImageClip(frame).set_duration(duration)
                 
                 # 5. Apply Ken Burns (Zoom)
                 # Zoom from 1.0 to 1.15
                 img_clip = self._apply_ken_burns(img_clip, zoom_factor=1.15)
                 
-                # Center on 1080x1920 black background
-                # CompositeVideoClip allows layering
-                # Create background
-                # bg_clip = ColorClip(size=(1080, 1920), color=(0,0,0), duration=duration) # Need ColorClip import
-                # Simpler: Just rely on players handling 4:5 or set pos
-                
                 img_clip = img_clip.set_position("center")
                 
                 # Combine Audio (Voice)
@@ -430,19 +659,113 @@ class Studio:
             else:
                 final_video = final_video.set_audio(bg_music)
 
-        output_filename = os.path.join(self.output_path, f"reel_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
+        output_filename = self._reel_filename(profile_name)
         
         # Write file
-        # fps=30 for smooth motion
+        # fps / preset come from the render profile (30 fps for smooth motion in final)
         try:
-             final_video.write_videofile(output_filename, fps=30, codec="libx264", audio_codec="aac")
+             with span("studio.encode", profile=profile_name, seconds_of_video=round(final_video.duration, 2)):
+                 final_video.write_videofile(output_filename, fps=settings["fps"], codec="libx264",
+                                             audio_codec="aac", preset=settings["preset"])
              logger.info(f"Video generated: {output_filename}")
-             
-             # Cleanup
-             for f in temp_files:
-                 if os.path.exists(f): os.remove(f)
-                 
+             # Voiceovers stay in the cache for the final render
              return output_filename
         except Exception as e:
              logger.error(f"Video export failed: {e}")
              return None
+        finally:
+             # Release decoders (each AudioFileClip keeps an ffmpeg subprocess open)
+             for clip in clips + voice_clips:
+                 clip.close()
+             if bg_music:
+                 bg_music.close()
+
+    def _render_segment(self, item, profile_name, settings, segment_path):
+        """
+        Render one story (card + voiceover + Ken Burns) to its own MP4 and release everything it opened.
+        Every segment gets a stereo AAC track (silence if TTS failed) so the segments can be
+        joined with a stream copy.
+        """
+        frame = self.render_frame(item, "story", profile=profile_name) # Native 9:16 frame
+
+        audio_path = self.get_voiceover(self._voiceover_text(item))
+        from moviepy.editor import ImageClip, AudioFileClip, AudioClip, CompositeVideoClip
+        voice_clip = None
+        img_clip = None
+        segment = None
+        try:
+            if audio_path and os.path.exists(audio_path):
+                voice_clip = AudioFileClip(audio_path)
+                duration = voice_clip.duration + 0.5 # Add small pause
+                audio = voice_clip
+            else:
+                duration = 3.0 # Default fallback
+                audio = AudioClip(lambda t: np.zeros((len(t), 2)) if isinstance(t, np.ndarray) else [0, 0],
+                                  duration=duration, fps=44100)
+
+            img_clip = ImageClip(frame).set_duration(duration)
+            base_size = img_clip.size
+            img_clip = self._apply_ken_burns(img_clip, zoom_factor=1.15).set_position("center")
+
+            # Fixed frame size, the zoom is cropped like the composed digest does
+            segment = CompositeVideoClip([img_clip], size=base_size).set_duration(duration).set_audio(audio)
+            with span("studio.encode", profile=profile_name, seconds_of_video=round(duration, 2)) as s:
+                segment.write_videofile(segment_path, fps=settings["fps"], codec="libx264", audio_codec="aac",
+                                        audio_fps=44100, preset=settings["preset"], logger=None)
+                s.add_file(segment_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error rendering segment for {item['id']}: {e}")
+            return False
+        finally:
+            for clip in (segment, img_clip, voice_clip):
+                if clip is not None:
+                    clip.close()
+            # MoviePy clips form reference cycles; collect now so frame buffers don't pile up per segment
+            gc.collect()
+
+    def _generate_video_streaming(self, news_items, profile_name, settings):
+        logger.info(f"Generating streamed video digest ({profile_name}) for {len(news_items)} items...")
+
+        work_dir = os.path.join(self.output_path, f"segments_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(work_dir, exist_ok=True)
+        segments = []
+        try:
+            for idx, item in enumerate(news_items):
+                segment_path = os.path.join(work_dir, f"segment_{idx:04d}.mp4")
+                if self._render_segment(item, profile_name, settings, segment_path):
+                    segments.append(segment_path)
+
+            if not segments:
+                return None
+
+            # Join with the concat demuxer (stream copy) and mix the looped music in the same pass
+            logger.info(f"Joining {len(segments)} segments...")
+            list_file = os.path.join(work_dir, "segments.txt")
+            with open(list_file, "w") as f:
+                for path in segments:
+                    f.write(f"file '{os.path.abspath(path)}'\n")
+
+            output_filename = self._reel_filename(profile_name)
+            from moviepy.config import get_setting
+            cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                   "-f", "concat", "-safe", "0", "-i", list_file]
+            bg_music_path = self._background_music_path()
+            if bg_music_path:
+                cmd += ["-stream_loop", "-1", "-i", bg_music_path,
+                        "-filter_complex", "[1:a]volume=0.15[bg];[0:a][bg]amix=inputs=2:duration=first:normalize=0[a]",
+                        "-map", "0:v", "-map", "[a]", "-c:v", "copy", "-c:a", "aac"]
+            else:
+                cmd += ["-c", "copy"]
+            cmd += ["-movflags", "+faststart", output_filename]
+
+            with span("studio.concat", segments=len(segments)):
+                result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"Video export failed: {result.stderr.strip()}")
+                return None
+
+            logger.info(f"Video generated: {output_filename}")
+            return output_filename
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -5,6 +5,9 @@ import sys
 # Add project root to path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Don't append test runs to the real trace / metrics files
+os.environ.setdefault("METRICS", "0")
+
 @pytest.fixture
 def mock_news_item():
     return {
@@ -19,10 +22,11 @@ def mock_news_item():
 
 @pytest.fixture
 def sample_rss_entry():
-    class Entry:
-        def __init__(self):
-            self.title = "Max Verstappen wins again"
-            self.link = "http://example.com/f1/max-wins"
-            self.id = "http://example.com/f1/max-wins"
-            self.media_content = [{'url': 'http://example.com/max.jpg'}]
-    return Entry()
+    import feedparser
+    # Same type feedparser returns: attribute and `'key' in entry` access
+    return feedparser.FeedParserDict(
+        title="Max Verstappen wins again",
+        link="http://example.com/f1/max-wins",
+        id="http://example.com/f1/max-wins",
+        media_content=[{'url': 'http://example.com/max.jpg'}],
+    )
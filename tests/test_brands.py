@@ -0,0 +1,132 @@
+import pytest
+import json
+import threading
+import feedparser
+from unittest.mock import patch, MagicMock
+from brands import load_brands, get_brand, feed_union, wants
+from pipeline import Pipeline
+from scout import Scout
+from studio import Studio
+from publisher import Publisher
+
+F1 = "https://example.com/f1.rss"
+MOTOGP = "https://example.com/motogp.rss"
+
+@pytest.fixture
+def brands_file(tmp_path):
+    path = tmp_path / "brands.json"
+    path.write_text(json.dumps({"brands": [
+        {"name": "racing_tamizhan", "feeds": [F1, MOTOGP]},
+        {"name": "f1_tamil", "title": "F1 Tamil", "feeds": [F1], "series": ["Formula 1"], "voice": "ta-IN-PallaviNeural",
+         "palette": [[0, 0, 0], [255, 200, 0]], "accounts": {"instagram": {"username_env": "F1_TAMIL_IG_USERNAME"}}},
+    ]}))
+    return str(path)
+
+class FakeStudio:
+    profile = "draft"
+
+    def __init__(self, brand):
+        self.brand = brand
+        self.rendered = []
+
+    def generate_image(self, item):
+        self.rendered.append(item['id'])
+        return f"{self.brand['name']}_{item['id']}_draft.jpg"
+
+    def generate_video(self, items):
+        return f"{self.brand['name']}_reel_draft.mp4"
+
+    def render_final(self, asset):
+        return asset["path"].replace("_draft", "")
+
+class TestBrands:
+    def test_profiles_fill_in_defaults(self, brands_file, tmp_path):
+        main, f1 = load_brands(brands_file)
+        assert main["output_path"] == "output/review_queue/" and main["publish_queue"] == "output/publish_queue.db"
+        assert main["voice"] == "en-GB-SoniaNeural" and main["accounts"]["instagram"]["username_env"] == "IG_USERNAME"
+
+        assert f1["output_path"] == "output/brands/f1_tamil/review_queue/"
+        assert f1["publish_queue"] == "output/brands/f1_tamil/publish_queue.db"
+        # Partial account config keeps the other defaults
+        assert f1["accounts"]["instagram"]["username_env"] == "F1_TAMIL_IG_USERNAME"
+        assert f1["accounts"]["instagram"]["session_file"] == "settings.json"
+        assert get_brand("f1_tamil", brands_file)["title"] == "F1 Tamil"
+        assert get_brand(path=brands_file)["name"] == "racing_tamizhan"
+        assert feed_union([main, f1]) == [F1, MOTOGP]
+
+        assert wants(f1, {"feed": F1, "series": "Formula 1"})
+        assert not wants(f1, {"feed": F1, "series": "MotoGP"})
+        assert not wants(f1, {"feed": MOTOGP, "series": "Formula 1"})
+
+        # YouTube tags follow the brand's hashtags
+        assert Publisher(dict(f1, hashtags=["#F1Tamil", "#Formula1"])).youtube_tags() == ["F1Tamil", "Formula1", "Shorts"]
+
+        duplicate = tmp_path / "duplicate.json"
+        duplicate.write_text(json.dumps({"brands": [{"name": "a"}, {"name": "a"}]}))
+        with pytest.raises(ValueError):
+            load_brands(str(duplicate))
+        with pytest.raises(ValueError):
+            get_brand("nope", brands_file)
+
+    def test_brands_share_one_scout_pass(self, brands_file):
+        brands = load_brands(brands_file)
+        scout = Scout(feeds=feed_union(brands))
+        scout.entity_index = MagicMock(match=lambda title: [], series=lambda matches: None)
+        scraped = []
+        scout._fetch_summary = lambda link: scraped.append(link) or "Summary."
+
+        def parse(url, **kwargs):
+            feed = MagicMock(status=200)
+            names = {F1: ["f1-a", "f1-b", "f1-c"], MOTOGP: ["motogp-a"]}[url]
+            feed.entries = [feedparser.FeedParserDict(id=n, title=n, link=f"https://example.com/{n}") for n in names]
+            return feed
+
+        studios = {b["name"]: FakeStudio(b) for b in brands}
+        published = []
+        lock = threading.Lock()
+        def publish(asset):
+            with lock:
+                published.append(asset)
+        pipeline = Pipeline(scout, studios, publish=publish, scout_workers=2, render_workers=2)
+        with patch("feedparser.parse", side_effect=parse) as parse_mock:
+            stats = pipeline.run()
+
+        # Each feed fetched and each article scraped once, whatever the number of brands
+        assert parse_mock.call_count == 2
+        assert sorted(scraped) == sorted(f"https://example.com/{n}" for n in ["f1-a", "f1-b", "f1-c", "motogp-a"])
+        assert stats["items"] == 4
+        assert sorted(studios["racing_tamizhan"].rendered) == ["f1-a", "f1-b", "f1-c", "motogp-a"]
+        assert sorted(studios["f1_tamil"].rendered) == ["f1-a", "f1-b", "f1-c"]
+        # One reel per brand, each asset tagged with its brand and rendered by that brand's studio
+        reels = {a["brand"]: a["path"] for a in published if a["type"] == "video"}
+        assert reels == {"racing_tamizhan": "racing_tamizhan_reel.mp4", "f1_tamil": "f1_tamil_reel.mp4"}
+        assert all(a["path"].startswith(a["brand"]) for a in published)
+
+    def test_studios_share_photo_cache(self, brands_file, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        main, f1 = load_brands(brands_file)
+        studios = [Studio(profile="draft", brand=main), Studio(profile="draft", brand=f1)]
+        downloads = []
+
+        def download(url, filename):
+            downloads.append(url)
+            threading.Event().wait(0.05)
+            with open(filename, "wb") as f:
+                f.write(b"photo")
+            return filename
+
+        for studio in studios:
+            studio.download_image = download
+        paths = []
+        threads = [threading.Thread(target=lambda s=s: paths.append(s.fetch_photo("https://example.com/p.jpg")))
+                   for s in studios * 2]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert downloads == ["https://example.com/p.jpg"] # Fetched once for both brands
+        assert len(set(paths)) == 1
+
+        # Brand palette for stories without a team; team colours still win
+        assert studios[1].get_team_colors("Weather update", matches=[]) == ((0, 0, 0), (255, 200, 0))
+        assert studios[0].get_team_colors("Weather update", matches=[]) == studios[0].entity_index.default_colors
@@ -0,0 +1,18 @@
+from captions import default_caption, _caption
+
+class TestCaptions:
+    def test_caption_has_prefix_summary_and_entity_tags(self):
+        item = {"id": "1", "headline_en": "Verstappen wins in Monza", "summary": "Red Bull one-two.", "type": "RESULT"}
+        caption = default_caption(item)
+        assert caption.startswith("🏆 RESULT: Verstappen wins in Monza\n\nRed Bull one-two.")
+        assert "#RacingTamizhan" in caption
+        assert "#F1" in caption
+
+    def test_caption_is_memoized(self):
+        _caption.cache_clear()
+        item = {"headline_en": "Marquez signs with Ducati", "summary": "", "type": "OFFICIAL",
+                "entities": [{"name": "Marc Marquez"}]}
+        first = default_caption(item)
+        assert default_caption(dict(item)) is first
+        assert _caption.cache_info().hits == 1
+        assert default_caption(dict(item, summary="Two years.")) != first
@@ -0,0 +1,63 @@
+import pytest
+import os
+import numpy as np
+from PIL import Image
+from unittest.mock import patch
+import compositing
+from studio import Studio, CARD_H, PHOTO_FADE
+from preflight import file_hash
+
+class TestCompositing:
+    def test_gradient_and_fade(self):
+        grad = compositing.vertical_gradient(40, 100, (200, 0, 0), (0, 0, 100))
+        assert grad.shape == (100, 40, 3) and grad.dtype == np.uint8
+        assert tuple(grad[0, 0]) == (200, 0, 0) and tuple(grad[-1, -1]) == (0, 0, 100)
+        assert (grad == grad[:, :1]).all() # Vertical: every column is the same
+
+        canvas = compositing.solid(40, 100, (0, 0, 0))
+        photo = compositing.solid(40, 60, (255, 255, 255))
+        compositing.blend(canvas, photo, compositing.fade_alpha(60, 20))
+        column = canvas[:, 0, 0]
+        assert (column[:40] == 255).all() # Untouched above the fade
+        assert (np.diff(column[40:60].astype(int)) <= 0).all() and column[59] == 0 # Fades out
+        assert 0 < column[45] < 255
+        assert (column[60:] == 0).all() # Photo ends here
+
+    def test_bars_are_seeded(self):
+        a = compositing.seeded_heights("story_1", 30, 20, 80)
+        assert (a == compositing.seeded_heights("story_1", 30, 20, 80)).all()
+        assert (a != compositing.seeded_heights("story_2", 30, 20, 80)).any()
+        assert a.min() >= 20 and a.max() <= 80
+
+        canvas = compositing.solid(400, 200, (0, 0, 0))
+        compositing.visualizer_bars(canvas, 10, 100, [20, 40], 10, 4, (255, 0, 0))
+        lit = canvas[..., 0] > 0
+        assert lit[:, 10:14].any(axis=0).all() and not lit[:, 14:20].any() and not lit[:, 24:].any()
+        assert lit[:, 10].sum() == 21 and lit[:, 20].sum() == 41 # Centred, inclusive of both ends
+
+    def test_card_renders_are_reproducible(self, tmp_path):
+        def fake_download(url, filename):
+            Image.new("RGB", (1600, 1000), (240, 240, 240)).save(filename, "JPEG")
+            return filename
+
+        item = {"id": "repro_1", "headline_en": "Verstappen takes pole in Suzuka",
+                "image_url": "https://example.com/photo.jpg", "type": "NEWS"}
+        hashes = []
+        for run in range(2):
+            studio = Studio(profile="final")
+            studio.output_path = str(tmp_path / f"run{run}")
+            studio.cache_path = str(tmp_path / f"cache{run}")
+            studio.manifest = None
+            os.makedirs(studio.cache_path)
+            os.makedirs(studio.output_path)
+            with patch.object(studio, 'download_image', side_effect=fake_download):
+                path = studio.generate_image(item)
+            hashes.append(file_hash(path))
+        assert hashes[0] == hashes[1]
+
+        # The photo's bottom edge is faded into the card, not cut off
+        with Image.open(path) as img:
+            px = np.asarray(img.convert("RGB")).astype(int)
+        split = px.shape[0] - CARD_H
+        photo_end = split + 150 - 1
+        assert px[photo_end - PHOTO_FADE + 1, 5].sum() > px[photo_end - 60, 5].sum() > px[photo_end, 5].sum()
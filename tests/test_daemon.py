@@ -0,0 +1,116 @@
+import pytest
+import os
+import json
+import signal
+import threading
+import feedparser
+from unittest.mock import patch, MagicMock
+from scout import Scout
+from daemon import Daemon
+from policy import ApprovalPolicy, ReviewQueue
+
+def make_feed(*ids):
+    feed = MagicMock()
+    feed.status = 200
+    feed.entries = [feedparser.FeedParserDict(id=i, title=f"Story {i}", link=f"http://example.com/{i}") for i in ids]
+    return feed
+
+class FakeStudio:
+    profile = "draft"
+    manifest = None
+
+    def generate_image(self, item):
+        return f"{item['id']}_draft.jpg"
+
+    def generate_video(self, items):
+        return "reel_draft.mp4"
+
+    def render_final(self, asset):
+        return asset["path"].replace("_draft", "")
+
+class TestDaemon:
+    @pytest.fixture
+    def scout(self):
+        scout = Scout()
+        scout.rss_feeds = ["http://example.com/rss"]
+        scout._fetch_summary = lambda link: "Summary."
+        return scout
+
+    def daemon(self, scout, approved):
+        return Daemon(interval_minutes=0.001, approve=lambda asset: approved.append(asset) or False,
+                      scout=scout, studio=FakeStudio(), publisher=MagicMock())
+
+    def test_cycles_only_handle_new_stories(self, scout):
+        approved = []
+        daemon = self.daemon(scout, approved)
+
+        with patch("feedparser.parse", return_value=make_feed("a", "b")):
+            assert daemon.run_cycle()["items"] == 2
+        with patch("feedparser.parse", return_value=make_feed("a", "b", "c")):
+            assert daemon.run_cycle()["items"] == 1 # Same Scout, warm: only "c" is new
+
+        assert sorted(a["data"]["id"] for a in approved) == ["a", "b", "c"]
+
+    def test_unchanged_feed_is_skipped(self, scout):
+        daemon = self.daemon(scout, [])
+        not_modified = make_feed()
+        not_modified.status = 304
+
+        with patch("feedparser.parse", return_value=not_modified) as parse:
+            assert daemon.run_cycle()["items"] == 0
+            daemon.scout.feed_state["http://example.com/rss"] = {"etag": "abc", "modified": None}
+            daemon.run_cycle()
+        assert parse.call_args.kwargs["etag"] == "abc"
+
+    def test_dry_run_does_not_mark_stories_seen(self, tmp_path):
+        path = tmp_path / "policy.json"
+        path.write_text(json.dumps({"default": "approve",
+                                    "rules": [{"name": "duplicate", "when": {"duplicate": True}, "action": "reject"}]}))
+        def run(dry_run, publish_queue=None):
+            scout = Scout() # A fresh process: nothing cached or claimed from the last run
+            scout.rss_feeds = ["http://example.com/rss"]
+            scout._fetch_summary = lambda link: "Summary."
+            policy = ApprovalPolicy(str(path), review_queue=ReviewQueue(str(tmp_path / "review.db")),
+                                    audit_path=str(tmp_path / "audit.jsonl"))
+            daemon = Daemon(approve=policy, dry_run=dry_run, scout=scout, studio=FakeStudio(),
+                            publisher=MagicMock(), publish_queue=publish_queue)
+            with patch("feedparser.parse", return_value=make_feed("a")):
+                return daemon.run_cycle()
+
+        assert run(dry_run=True)["published"] == 1 # Logged only
+        publish_queue = MagicMock()
+        publish_queue.enqueue_asset.return_value = {}
+        assert run(dry_run=False, publish_queue=publish_queue)["published"] == 1
+        assert publish_queue.enqueue_asset.call_args.args[0]["data"]["id"] == "a"
+
+        # Queued for real now, so the next run rejects it as a duplicate
+        publish_queue.reset_mock()
+        assert run(dry_run=False, publish_queue=publish_queue)["published"] == 0
+        publish_queue.enqueue_asset.assert_not_called()
+
+    def test_sigterm_stops_gracefully(self, scout):
+        daemon = self.daemon(scout, [])
+        previous = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            daemon.install_signal_handlers()
+            with patch("feedparser.parse", return_value=make_feed("a")):
+                thread = threading.Thread(target=daemon.run_forever, kwargs={"poll_seconds": 0.01})
+                thread.start()
+                threading.Event().wait(0.3)
+                os.kill(os.getpid(), signal.SIGTERM)
+                thread.join(5)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+        assert not thread.is_alive()
+        assert daemon.cycles >= 1
+
+    def test_article_downloaded_once(self):
+        scout = Scout()
+        entry = feedparser.FeedParserDict(id="a", title="Story", link="http://example.com/a")
+        scout.http.get = MagicMock(return_value=MagicMock(text="<html><body><p>Body.</p></body></html>"))
+
+        scout.build_item(entry, "http://example.com/rss")
+        scout.build_item(entry, "http://example.com/rss")
+        scout.http.get.assert_called_once()
@@ -0,0 +1,41 @@
+import pytest
+from entities import EntityIndex, load_index
+
+class TestEntities:
+    @pytest.fixture
+    def index(self):
+        return load_index()
+
+    def test_match_spans(self, index):
+        text = "Verstappen beats Pérez as Red Bull Racing dominate F1 weekend"
+        matches = index.match(text)
+
+        names = [m["name"] for m in matches]
+        assert names == ["Max Verstappen", "Sergio Perez", "Red Bull Racing", "Formula 1"]
+        for m in matches:
+            assert text[m["start"]:m["end"]] == m["text"]
+
+    def test_colors_from_driver(self, index):
+        matches = index.match("Leclerc on pole in Monaco")
+        assert index.colors(matches) == ((200, 0, 0), (255, 242, 0))
+        assert index.colors([]) == index.default_colors
+
+    def test_hashtags_and_series(self, index):
+        matches = index.match("Bagnaia wins in Jerez")
+        assert index.hashtags(matches) == ["#PeccoBagnaia", "#MotoGP", "#BikeRacing"]
+        assert index.series(matches) == "MotoGP"
+
+    def test_no_partial_word_matches(self, index):
+        assert index.match("Haasbroek interview") == []
+
+    def test_bare_manufacturer_is_not_a_motogp_team(self, index):
+        # Honda also supplies F1 engines: only the team's own names tag the MotoGP squad
+        matches = index.match("Honda confirms new engine for Aston Martin")
+        assert [m["name"] for m in matches] == ["Aston Martin"]
+        assert index.series(matches) == "Formula 1" and "#HondaHRC" not in index.hashtags(matches)
+        assert [m["name"] for m in index.match("Repsol Honda sign Mir")] == ["Honda HRC"]
+
+    def test_large_roster(self):
+        config = {"drivers": [{"name": f"Driver {i}", "aliases": [f"Zz{i}"]} for i in range(2000)]}
+        index = EntityIndex(config)
+        assert [m["name"] for m in index.match("Zz1999 beats Zz7")] == ["Driver 1999", "Driver 7"]
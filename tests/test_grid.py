@@ -0,0 +1,37 @@
+import pytest
+from datetime import datetime, timezone
+from grid import filter_items, paginate, facets, item_source
+
+@pytest.fixture
+def items():
+    return [
+        {"id": "a", "headline_en": "Verstappen wins in Monza", "summary": "Red Bull one-two", "type": "RESULT",
+         "feed": "https://www.motorsport.com/rss/f1/news/", "published": "2024-09-01T10:00:00+00:00",
+         "entities": [{"name": "Max Verstappen"}]},
+        {"id": "b", "headline_en": "Marquez signs with Ducati", "summary": "", "type": "OFFICIAL",
+         "feed": "https://www.autosport.com/rss/feed/motogp", "published": "2024-09-03T08:00:00+00:00"},
+        {"id": "c", "headline_en": "Hamilton could stay", "summary": "Report", "type": "RUMOUR",
+         "link": "https://www.autosport.com/f1/news/x", "published": None},
+    ]
+
+class TestGrid:
+    def test_filters_combine(self, items):
+        assert [i["id"] for i in filter_items(items, types=["RESULT", "RUMOUR"])] == ["a", "c"]
+        assert [i["id"] for i in filter_items(items, sources=["autosport.com"])] == ["b", "c"]
+        since = datetime(2024, 9, 2, tzinfo=timezone.utc)
+        assert [i["id"] for i in filter_items(items, since=since)] == ["b"] # Undated items drop out
+        assert [i["id"] for i in filter_items(items, query="red BULL")] == ["a"]
+        assert [i["id"] for i in filter_items(items, query="max verstappen")] == ["a"] # Entity names too
+        assert filter_items(items, types=["RESULT"], sources=["autosport.com"]) == []
+        assert filter_items(items) == items
+
+    def test_paginate_clamps_page(self):
+        values = list(range(25))
+        assert paginate(values, 2, 10) == (list(range(10, 20)), 2, 3)
+        assert paginate(values, 9, 10) == ([20, 21, 22, 23, 24], 3, 3)
+        assert paginate([], 1, 10) == ([], 1, 1)
+
+    def test_facets(self, items):
+        assert item_source(items[0]) == "motorsport.com"
+        assert item_source({"source": "RSS"}) == "RSS"
+        assert facets(items) == (["OFFICIAL", "RESULT", "RUMOUR"], ["autosport.com", "motorsport.com"])
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import MagicMock
+from jobqueue import PublishQueue, PublishWorkerPool
+
+class TestPublishQueue:
+    @pytest.fixture
+    def queue(self, tmp_path):
+        return PublishQueue(db_path=str(tmp_path / "queue.db"), backoff_base=0, max_attempts=3)
+
+    @pytest.fixture
+    def video(self, tmp_path):
+        path = tmp_path / "reel.mp4"
+        path.write_bytes(b"video-bytes")
+        return {"type": "video", "path": str(path), "caption": "c", "data": {"headline_en": "Digest"}}
+
+    def test_enqueue_is_idempotent(self, queue, video):
+        first = queue.enqueue_asset(video)
+        again = queue.enqueue_asset(dict(video))
+
+        assert set(first) == {"instagram_reel", "youtube_short"}
+        assert all(created for _, created in first.values())
+        assert not any(created for _, created in again.values())
+        assert queue.counts()["queued"] == 2
+
+    def test_retry_then_fail(self, queue, video):
+        queue.enqueue(video, "youtube_short")
+        for _ in range(3):
+            job = queue.claim("w1")
+            queue.fail(job["id"], "boom")
+        assert queue.claim("w1") is None
+        assert queue.counts()["failed"] == 1
+
+    def test_recover_expired_lease(self, queue, video):
+        queue.lease_seconds = -1 # Lease already expired: the worker "crashed"
+        queue.enqueue(video, "youtube_short")
+        assert queue.claim("w1") is not None
+        assert queue.recover() == 1
+        assert queue.claim("w2")["attempts"] == 2
+
+    def test_worker_pool_drains_and_cleans_up(self, queue, video):
+        import os
+        publisher = MagicMock()
+        calls = []
+
+        def publish_target(asset, target):
+            calls.append(target)
+            if target == "youtube_short" and calls.count(target) == 1:
+                return {"ok": False, "seconds": 0.0} # Fails once, retried
+            return {"ok": True, "seconds": 0.0}
+
+        publisher.publish_target.side_effect = publish_target
+        queue.enqueue_asset(video)
+
+        pool = PublishWorkerPool(queue, publisher, workers=2, poll_interval=0.01).start()
+        assert pool.drain(timeout=5)
+        pool.stop()
+
+        assert queue.counts()["done"] == 2
+        assert sorted(calls) == ["instagram_reel", "youtube_short", "youtube_short"]
+        publisher.preflight.discard.assert_called_once_with(video["path"]) # Fixed copies go first
+        assert not os.path.exists(video["path"])
+
+    def test_failed_target_keeps_the_file(self, queue, video):
+        import os
+        publisher = MagicMock()
+        publisher.publish_target.side_effect = lambda asset, target: (
+            {"ok": True, "seconds": 0.0} if target == "instagram_reel" else
+            {"ok": False, "seconds": 0.0, "error": "Still out of spec", "retryable": False})
+        queue.enqueue_asset(video)
+
+        pool = PublishWorkerPool(queue, publisher, workers=1, poll_interval=0.01).start()
+        assert pool.drain(timeout=5)
+        pool.stop()
+
+        assert queue.counts()["done"] == 1 and queue.counts()["failed"] == 1
+        assert publisher.publish_target.call_count == 2 # Pre-flight rejection: no retries
+        # The YouTube job can still be retried from the dashboard, so the file stays (and GC spares it)
+        assert not queue.asset_settled(video["path"])
+        assert os.path.exists(video["path"])
+        publisher.preflight.discard.assert_not_called()
+        assert queue.pending_paths() == [video["path"]]
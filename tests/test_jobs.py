@@ -0,0 +1,73 @@
+import pytest
+import threading
+from jobs import JobRunner
+
+@pytest.fixture
+def runner():
+    r = JobRunner(workers=2)
+    yield r
+    r.shutdown()
+
+class TestJobRunner:
+    def test_runs_in_background_and_reports_progress(self, runner):
+        release = threading.Event()
+
+        def work(job, items):
+            for i, item in enumerate(items):
+                job.update(i / len(items), f"item {item}")
+            release.wait(5)
+            return [item * 2 for item in items]
+
+        job = runner.submit("images", work, [1, 2, 3], label="3 designs")
+        assert job.active # submit() returned before the work finished
+        release.set()
+        done = runner.wait(job.id, timeout=5)
+        assert done.state == "done"
+        assert done.result == [2, 4, 6]
+        assert done.progress == 1.0
+        assert runner.get(job.id) is job
+
+    def test_same_key_reattaches_to_running_job(self, runner):
+        release = threading.Event()
+        calls = []
+
+        def work(job):
+            calls.append(1)
+            release.wait(5)
+            return "reel.mp4"
+
+        first = runner.submit("reel", work, key=("reel", "draft", ("a", "b")))
+        second = runner.submit("reel", work, key=("reel", "draft", ("a", "b")))
+        assert second is first
+        assert runner.jobs(active_only=True) == [first]
+        release.set()
+        runner.wait(first.id, timeout=5)
+        assert calls == [1]
+
+        # Finished jobs don't block a fresh run of the same work
+        third = runner.submit("reel", work, key=("reel", "draft", ("a", "b")))
+        assert third is not first
+        runner.wait(third.id, timeout=5)
+
+    def test_failure_and_cancel(self, runner):
+        def broken(job):
+            raise RuntimeError("render failed")
+
+        failed = runner.wait(runner.submit("images", broken).id, timeout=5)
+        assert failed.state == "failed"
+        assert "render failed" in failed.error
+
+        started = threading.Event()
+
+        def slow(job):
+            started.set()
+            while not job.cancelled:
+                job.log("working")
+                started.wait(0.01)
+            return "partial"
+
+        job = runner.submit("publish", slow)
+        started.wait(5)
+        job.cancel()
+        assert runner.wait(job.id, timeout=5).state == "cancelled"
+        assert job.result == "partial"
@@ -0,0 +1,109 @@
+import pytest
+import os
+import time
+from unittest.mock import patch
+from PIL import Image
+from manifest import AssetManifest, render_key, collect_output_garbage
+from policy import ReviewQueue
+
+@pytest.fixture
+def manifest(tmp_path):
+    return AssetManifest(db_path=str(tmp_path / "assets.db"))
+
+def write(path, size=1000, age=0):
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    if age:
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+    return str(path)
+
+class TestAssetManifest:
+    def test_identical_request_served_until_file_changes(self, manifest, tmp_path):
+        item = {"id": "s1", "headline_en": "Verstappen wins"}
+        key = render_key("image", "draft", [item], {"scale": 0.5})
+        assert key == render_key("image", "draft", [dict(item)], {"scale": 0.5})
+        assert key != render_key("image", "final", [item], {"scale": 0.5})
+        assert key != render_key("image", "draft", [dict(item, headline_en="Verstappen wins again")], {"scale": 0.5})
+
+        path = write(tmp_path / "slide1_s1_draft.jpg")
+        assert manifest.lookup(key) is None
+        manifest.record(key, "image", "draft", path, [item])
+        record = manifest.lookup(key)
+        assert record["path"] == path and record["item_ids"] == ["s1"] and record["state"] == "rendered"
+        assert len(record["content_hash"]) == 64
+
+        manifest.set_state(path, "queued")
+        assert manifest.assets(state="queued")[0]["items"] == [item]
+
+        write(path, size=2000) # Overwritten by another render
+        assert manifest.lookup(key) is None
+        assert manifest.assets() == []
+
+    def test_studio_reuses_recorded_render(self, manifest, tmp_path, mock_news_item):
+        from studio import Studio
+        studio = Studio(profile="draft")
+        studio.output_path = str(tmp_path)
+        studio.manifest = manifest
+
+        def render(item, formats, profile):
+            return {"feed": write(tmp_path / f"slide1_{item['id']}_{profile}.jpg")}
+
+        with patch.object(studio, "generate_formats", side_effect=render) as generate:
+            first = studio.generate_image(mock_news_item)
+            assert studio.generate_image(dict(mock_news_item)) == first
+            studio.generate_image(mock_news_item, profile="final")
+        assert generate.call_count == 2
+
+    def test_garbage_collection(self, manifest, tmp_path):
+        out = tmp_path / "review_queue"
+        out.mkdir()
+        orphan = write(out / "slide1_old_story_draft.jpg", age=7200)
+        fresh_orphan = write(out / "slide1_new_story_draft.jpg")
+        segments = out / "segments_20240101"
+        segments.mkdir()
+        write(segments / "segment_0000.mp4", age=7200)
+        os.utime(segments, (time.time() - 7200, time.time() - 7200))
+        # Not a Studio output: queue / review DBs and caches may share the directory
+        other = write(out / "publish_queue.db", age=7200)
+
+        paths = []
+        for n in range(4):
+            path = write(out / f"asset{n}.jpg", size=10_000)
+            manifest.record(f"key{n}", "image", "draft", path, [{"id": str(n)}])
+            paths.append(path)
+        manifest.lookup("key0") # Most recently used
+        manifest.set_state(paths[1], "queued")
+
+        stats = manifest.collect_garbage(str(out), max_bytes=32_000, protected=[paths[2]], dry_run=True)
+        assert os.path.exists(orphan) # Dry run
+
+        stats = manifest.collect_garbage(str(out), max_bytes=32_000, protected=[paths[2]])
+        assert stats["orphans"] == 2 # Old file + abandoned segment dir
+        assert not os.path.exists(orphan) and not segments.exists()
+        assert os.path.exists(fresh_orphan) # Within the grace period
+        assert os.path.exists(other)
+        # Over quota: the least recently used unprotected asset goes, queued / protected ones stay
+        assert stats["evicted"] == 1
+        assert not os.path.exists(paths[3])
+        assert all(os.path.exists(p) for p in paths[:3])
+        assert manifest.lookup("key3") is None
+
+        stats = manifest.collect_garbage(str(out), max_age_days=0, protected=[paths[2]])
+        assert stats["expired"] == 1 and not os.path.exists(paths[0])
+        assert os.path.exists(paths[1]) # Queued
+
+    def test_pending_review_drafts_are_kept(self, manifest, tmp_path, monkeypatch):
+        out = tmp_path / "review_queue"
+        out.mkdir()
+        reviewed, other = write(out / "slide1_a_draft.jpg"), write(out / "slide1_b_draft.jpg")
+        manifest.record("key_a", "image", "draft", reviewed, [{"id": "a"}])
+        manifest.record("key_b", "image", "draft", other, [{"id": "b"}])
+        review_queue = ReviewQueue(str(tmp_path / "review.db"))
+        review_queue.add({"type": "image", "path": reviewed, "data": {"id": "a", "headline_en": "Crash"}},
+                         {"rule": "sensitive", "reasons": []})
+
+        monkeypatch.setenv("OUTPUT_RETENTION_DAYS", "0")
+        stats = collect_output_garbage(manifest, str(out), review_queue=review_queue)
+        assert stats["removed"] == [os.path.abspath(other)]
+        assert os.path.exists(reviewed)
@@ -0,0 +1,86 @@
+import pytest
+import json
+import time
+from unittest.mock import MagicMock
+import metrics as metrics_module
+from metrics import Metrics, span
+from publisher import Publisher
+
+class TestMetrics:
+    @pytest.fixture
+    def m(self, tmp_path, monkeypatch):
+        m = Metrics(directory=str(tmp_path), flush_interval=0)
+        monkeypatch.setattr(metrics_module, "metrics", m) # What the agents' span() calls record into
+        return m
+
+    def test_span_records_duration_bytes_and_cache(self, m):
+        with span("studio.photo") as s:
+            s.miss()
+            s.add_bytes(2048)
+            time.sleep(0.02)
+        with span("studio.photo") as s:
+            s.hit()
+
+        totals = m.snapshot()["studio.photo"]
+        assert totals["calls"] == 2 and totals["bytes"] == 2048
+        assert totals["cache_hits"] == 1 and totals["cache_misses"] == 1
+        assert totals["seconds"] >= 0.02
+
+    def test_errors_counted_and_reraised(self, m):
+        with pytest.raises(RuntimeError):
+            with span("scout.feed"):
+                raise RuntimeError("timeout")
+        with span("scout.feed") as s:
+            s.fail("HTTP 503")
+        assert m.snapshot()["scout.feed"]["errors"] == 2
+
+    def test_trace_and_prometheus_files(self, m):
+        with span("studio.tts", chars=120) as s:
+            s.add_bytes(10)
+        m.count("news_items", 3)
+        m.write_prometheus()
+
+        with open(m.trace_path) as f:
+            record = json.loads(f.readline())
+        assert record["stage"] == "studio.tts" and record["chars"] == 120 and record["bytes"] == 10
+
+        with open(m.prom_path) as f:
+            text = f.read()
+        assert 'racing_stage_seconds_count{stage="studio.tts"} 1' in text
+        assert 'racing_stage_seconds_bucket{stage="studio.tts",le="+Inf"} 1' in text
+        assert 'racing_stage_bytes_total{stage="studio.tts"} 10' in text
+        assert "racing_news_items_total 3" in text
+
+    def test_trace_rolls_over(self, tmp_path):
+        m = Metrics(directory=str(tmp_path), trace_max_bytes=1000)
+        for n in range(40):
+            with m.span("studio.image", n=n):
+                pass
+        with open(m.trace_path + ".1") as f:
+            rolled = [json.loads(line)["n"] for line in f]
+        with open(m.trace_path) as f:
+            current = [json.loads(line)["n"] for line in f]
+        assert rolled and current and rolled[-1] + 1 == current[0] and current[-1] == 39
+        assert (tmp_path / "trace.jsonl.1").stat().st_size < 1200 and (tmp_path / "trace.jsonl").stat().st_size < 1000
+        assert sorted(p.name for p in tmp_path.glob("trace*")) == ["trace.jsonl", "trace.jsonl.1"]
+
+    def test_disabled_records_nothing(self, tmp_path):
+        m = Metrics(directory=str(tmp_path / "off"), enabled=False)
+        with m.span("studio.image"):
+            pass
+        assert m.snapshot() == {}
+        assert not (tmp_path / "off").exists()
+
+    def test_failed_upload_is_an_error(self, m, tmp_path):
+        photo = tmp_path / "card.jpg"
+        photo.write_bytes(b"jpeg")
+        publisher = Publisher()
+        publisher.ig_client = MagicMock()
+        publisher.ig_session_file = str(tmp_path / "settings.json")
+
+        assert publisher.upload_instagram_photo(str(photo), "c")
+        publisher.ig_client.photo_upload.side_effect = Exception("feedback_required")
+        assert not publisher.upload_instagram_photo(str(photo), "c")
+
+        totals = m.snapshot()["publish.instagram_photo"]
+        assert totals["calls"] == 2 and totals["errors"] == 1 and totals["bytes"] == 4
@@ -0,0 +1,75 @@
+import pytest
+import time
+import threading
+from pipeline import Pipeline
+
+class FakeScout:
+    def __init__(self, n, delay=0.0):
+        self.n = n
+        self.delay = delay
+
+    def iter_entries(self, new_only=False):
+        for i in range(self.n):
+            yield {"i": i}, "https://example.com/rss"
+
+    def build_item(self, entry, url):
+        time.sleep(self.delay)
+        if entry["i"] == 1:
+            raise RuntimeError("article download failed")
+        return {"id": f"s{entry['i']}", "headline_en": f"Story {entry['i']}"}
+
+class FakeStudio:
+    profile = "draft"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_image(self, item):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return f"{item['id']}_draft.jpg"
+
+    def generate_video(self, items):
+        return "reel_draft.mp4"
+
+    def render_final(self, asset):
+        return asset["path"].replace("_draft", "")
+
+class TestPipeline:
+    def test_items_flow_through_all_stages(self):
+        published = []
+        pipeline = Pipeline(FakeScout(6), FakeStudio(), publish=published.append,
+                            approve=lambda asset: asset["data"].get("id") != "s2")
+        stats = pipeline.run()
+
+        paths = sorted(a["path"] for a in published)
+        assert paths == ["reel.mp4", "s0.jpg", "s3.jpg", "s4.jpg", "s5.jpg"] # s1 failed, s2 rejected
+        assert all(a["profile"] == "final" for a in published)
+        assert stats["items"] == 5 and stats["assets"] == 6 and stats["published"] == 5
+        assert stats["errors"]["scout"] == 1
+
+    def test_stages_overlap(self):
+        # 8 articles at 0.1s each on 4 scouts, 8 renders at 0.1s on 2 workers: ~0.4s if they overlap, 0.6s+ if not
+        studio = FakeStudio(delay=0.1)
+        pipeline = Pipeline(FakeScout(8, delay=0.1), studio, scout_workers=4, render_workers=2, queue_size=2)
+        stats = pipeline.run()
+
+        assert stats["published"] == 8 # 7 cards (one article fails) + reel
+        assert stats["first_publish_seconds"] < 0.35
+        assert studio.max_in_flight <= 2
+
+    def test_stop_aborts_cleanly(self):
+        pipeline = Pipeline(FakeScout(50, delay=0.05), FakeStudio(), scout_workers=1, queue_size=1)
+        threading.Timer(0.2, pipeline.stop).start()
+
+        start = time.time()
+        stats = pipeline.run()
+        assert time.time() - start < 2
+        assert stats["items"] < 50
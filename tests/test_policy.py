@@ -0,0 +1,90 @@
+import pytest
+import json
+import sqlite3
+from policy import ApprovalPolicy, ReviewQueue
+from brands import get_brand
+
+def image(headline, item_type="RESULT", link="https://www.motorsport.com/f1/news/1", item_id="1", entities=None):
+    return {"type": "image", "path": f"slide1_{item_id}_draft.jpg", "profile": "draft",
+            "data": {"id": item_id, "headline_en": headline, "type": item_type, "link": link,
+                     "entities": entities or []}}
+
+class TestApprovalPolicy:
+    @pytest.fixture
+    def policy(self, tmp_path):
+        return ApprovalPolicy(review_queue=ReviewQueue(str(tmp_path / "review.db")),
+                              audit_path=str(tmp_path / "audit.jsonl"))
+
+    def test_trusted_result_is_approved(self, policy):
+        assert policy(image("Verstappen wins Dutch GP"))
+        assert policy.evaluate(image("Other", link="https://blog.example.com/x", item_id="2"))["action"] == "escalate"
+
+    def test_official_needs_a_known_entity(self, policy):
+        verstappen = [{"name": "Max Verstappen", "team": "Red Bull Racing"}]
+        assert policy.evaluate(image("Contract news", "OFFICIAL", entities=verstappen))["action"] == "approve"
+        assert policy.evaluate(image("Contract news", "OFFICIAL", item_id="2"))["action"] == "escalate"
+
+    def test_sensitive_and_video_escalate(self, policy, tmp_path):
+        assert not policy(image("Rider taken to hospital after crash in qualifying"))
+        reel = {"type": "video", "path": "reel_draft.mp4", "data": {"headline_en": "Top Stories", "id": "reel"}}
+        assert not policy(reel)
+
+        pending = policy.review_queue.pending()
+        assert [p["rule"] for p in pending] == ["sensitive", "reel"]
+        assert policy.review_queue.decide(pending[0]["id"], True)["path"] == "slide1_1_draft.jpg"
+        assert policy.review_queue.decide(pending[0]["id"], True) is None # Already decided
+
+    def test_duplicates_rejected(self, policy):
+        assert policy(image("Verstappen wins Dutch GP", item_id="a"))
+        # Same story from the other feed: different id, same headline words
+        decision = policy.decide(image("Dutch GP: Verstappen wins", link="https://www.autosport.com/f1/1", item_id="b"))
+        assert decision == {"action": "reject", "rule": "duplicate", "reasons": ["duplicate=True"]}
+
+    def test_only_queued_or_reviewed_stories_are_remembered(self, policy, tmp_path):
+        assert policy(image("Verstappen wins Dutch GP"))
+        assert not policy(image("Crash in qualifying", item_id="2")) # Escalated
+        # The approval was never queued (dry run, failed render): another process may still post it
+        later = ApprovalPolicy(review_queue=policy.review_queue, audit_path=str(tmp_path / "audit.jsonl"))
+        assert later.evaluate(image("Verstappen wins Dutch GP"))["action"] == "approve"
+        # A story waiting for review is a duplicate until it's decided, then it is remembered
+        assert later.evaluate(image("Crash in qualifying", item_id="2"))["rule"] == "duplicate"
+        later.review_queue.decide(later.review_queue.pending()[0]["id"], False)
+        assert later.evaluate(image("Crash in qualifying", item_id="2"))["rule"] == "duplicate"
+
+    def test_keys_are_always_brand_scoped(self, policy, tmp_path):
+        primary = get_brand()["name"]
+        untagged = image("Verstappen wins Dutch GP")
+        keys = policy.review_queue.fingerprints(untagged)
+        assert keys and all(k.startswith(f"{primary}:") for k in keys)
+        # A multi-brand run tags the same brand's assets: same keys, so switching modes doesn't repost
+        assert policy.review_queue.fingerprints(dict(untagged, brand=primary)) == keys
+        assert policy.review_queue.fingerprints(dict(untagged, brand="f1_tamil")) != keys
+
+        # Unscoped keys from before are migrated to the first brand
+        path = str(tmp_path / "old.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE seen (fingerprint TEXT PRIMARY KEY, item_id TEXT, first_seen REAL NOT NULL)")
+            conn.executemany("INSERT INTO seen VALUES (?, '1', 0)",
+                             [(k.split(":", 1)[1],) for k in keys] + [(keys[0],)])
+        migrated = ReviewQueue(path, brand="f1_tamil")
+        assert migrated.is_duplicate(keys)
+        with sqlite3.connect(path) as conn:
+            assert sorted(r[0] for r in conn.execute("SELECT fingerprint FROM seen")) == sorted(keys)
+        assert not migrated.is_duplicate(migrated.fingerprints(untagged)) # f1_tamil never posted it
+
+    def test_decisions_are_audited(self, policy, tmp_path):
+        policy(image("Verstappen wins Dutch GP"))
+        policy(image("Verstappen wins Dutch GP"))
+
+        with open(tmp_path / "audit.jsonl") as f:
+            records = [json.loads(line) for line in f]
+        assert [(r["item_id"], r["action"], r["rule"]) for r in records] == [
+            ("1", "approve", "trusted-results"), ("1", "reject", "duplicate")]
+
+    def test_unknown_condition_fails_loudly(self, tmp_path):
+        path = tmp_path / "policy.json"
+        path.write_text(json.dumps({"rules": [{"name": "bad", "when": {"colour": "red"}, "action": "approve"}]}))
+        policy = ApprovalPolicy(str(path), review_queue=ReviewQueue(str(tmp_path / "review.db")),
+                                audit_path=str(tmp_path / "audit.jsonl"))
+        with pytest.raises(ValueError):
+            policy.evaluate(image("Anything"))
@@ -0,0 +1,86 @@
+import pytest
+import os
+import subprocess
+from PIL import Image
+from moviepy.config import get_setting
+from preflight import Preflight, PreflightError, has_faststart
+
+def make_video(path, size="1080x1920", duration=3, vcodec=("-c:v", "libx264", "-pix_fmt", "yuv420p"),
+               audio=("-c:a", "aac"), faststart=True):
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+           "-f", "lavfi", "-i", f"testsrc=size={size}:rate=30:duration={duration}"]
+    if audio:
+        cmd += ["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}"]
+    cmd += ["-preset", "ultrafast", *vcodec, *(audio or ["-an"])]
+    if faststart:
+        cmd += ["-movflags", "+faststart"]
+    subprocess.run(cmd + [str(path)], check=True)
+    return str(path)
+
+class TestPreflight:
+    @pytest.fixture
+    def preflight(self, tmp_path):
+        return Preflight(cache_dir=str(tmp_path / "preflight"))
+
+    def test_compliant_video_passes_untouched(self, preflight, tmp_path):
+        video = make_video(tmp_path / "reel.mp4")
+
+        assert preflight.prepare(video, "instagram_reel") == video
+        assert preflight.prepare(video, "youtube_short") == video
+        assert [f for f in os.listdir(preflight.cache_dir) if f.endswith(".mp4")] == []
+
+    def test_faststart_only_remuxes(self, preflight, tmp_path):
+        video = make_video(tmp_path / "reel.mp4", faststart=False)
+        assert not has_faststart(video)
+
+        fixed = preflight.prepare(video, "youtube_short")
+        assert fixed != video and has_faststart(fixed)
+        probe = preflight.probe(fixed)
+        assert probe["video"]["codec"] == "h264" and probe["audio"]["codec"] == "aac"
+        record = preflight._load_record(preflight._content_hash(video))
+        assert record["targets"]["youtube_short"]["actions"] == ["remux"]
+
+    def test_wrong_aspect_and_missing_audio(self, preflight, tmp_path):
+        video = make_video(tmp_path / "reel.mp4", size="1080x1350", audio=None)
+
+        fixed = preflight.prepare(video, "instagram_reel")
+        probe = preflight.probe(fixed)
+        assert (probe["video"]["width"], probe["video"]["height"]) == (1080, 1920)
+        assert probe["audio"]["codec"] == "aac"
+        # A 4:5 frame is fine for a Short (vertical enough), only the audio is added there
+        assert preflight.prepare(video, "youtube_short") != fixed
+        record = preflight._load_record(preflight._content_hash(video))
+        assert record["targets"]["youtube_short"]["actions"] == ["audio"]
+
+    def test_duration_out_of_range_is_rejected(self, preflight, tmp_path):
+        video = make_video(tmp_path / "reel.mp4", size="270x480", duration=2)
+        with pytest.raises(PreflightError):
+            preflight.prepare(video, "instagram_reel") # Reels need at least 3s
+
+    def test_probe_cached_per_hash(self, preflight, tmp_path, monkeypatch):
+        video = make_video(tmp_path / "reel.mp4")
+        preflight.prepare(video, "instagram_reel")
+
+        # A fresh instance (restart) reads the cached record instead of probing again
+        fresh = Preflight(cache_dir=preflight.cache_dir)
+        monkeypatch.setattr(fresh, "probe", lambda path: pytest.fail("probed twice"))
+        assert fresh.prepare(video, "instagram_reel") == video
+        assert fresh._load_record(fresh._content_hash(video))["probe"]["video"]["codec"] == "h264"
+
+    def test_png_card_converted_to_jpeg(self, preflight, tmp_path):
+        card = tmp_path / "slide1.png"
+        Image.new("RGB", (1080, 1350), (200, 0, 0)).save(card)
+
+        fixed = preflight.prepare(str(card), "instagram_photo")
+        with Image.open(fixed) as img:
+            assert img.format == "JPEG" and img.size == (1080, 1350)
+
+    def test_discard_removes_fixed_copies(self, preflight, tmp_path):
+        card = tmp_path / "slide1.png"
+        Image.new("RGB", (1080, 1350), (200, 0, 0)).save(card)
+        fixed = preflight.prepare(str(card), "instagram_photo")
+        assert os.listdir(preflight.cache_dir)
+
+        preflight.discard(str(card))
+        assert not os.path.exists(fixed) and os.listdir(preflight.cache_dir) == []
+        assert card.exists()
@@ -0,0 +1,108 @@
+import pytest
+import json
+from unittest.mock import MagicMock
+from publisher import Publisher
+
+class TestPublisher:
+    @pytest.fixture
+    def publisher(self, tmp_path):
+        p = Publisher()
+        p.ig_client = MagicMock()
+        p.ig_client.get_settings.return_value = {"authorization_data": {"sessionid": "abc"}}
+        p.ig_session_file = str(tmp_path / "settings.json")
+        p.preflight = None # Fake media paths
+        return p
+
+    def test_reuses_valid_session(self, publisher):
+        with open(publisher.ig_session_file, "w") as f:
+            json.dump({}, f)
+        publisher.ig_client.user_id = "123"
+
+        assert publisher.login_instagram("user", "pass")
+        publisher.ig_client.get_timeline_feed.assert_called_once()
+        publisher.ig_client.login.assert_not_called()
+
+        # Second publish sequence within the validation window: no requests at all
+        assert publisher.login_instagram("user", "pass")
+        publisher.ig_client.get_timeline_feed.assert_called_once()
+
+    def test_relogin_when_session_invalid(self, publisher):
+        with open(publisher.ig_session_file, "w") as f:
+            json.dump({}, f)
+        publisher.ig_client.user_id = "123"
+        publisher.ig_client.get_timeline_feed.side_effect = Exception("login_required")
+
+        assert publisher.login_instagram("user", "pass")
+        publisher.ig_client.login.assert_called_once_with("user", "pass", relogin=True)
+
+    def test_session_written_atomically(self, publisher, tmp_path):
+        publisher.ig_client.user_id = None
+        assert publisher.login_instagram("user", "pass")
+
+        with open(publisher.ig_session_file) as f:
+            assert json.load(f) == {"authorization_data": {"sessionid": "abc"}}
+        assert [p.name for p in tmp_path.iterdir()] == ["settings.json"] # No temp files left behind
+
+    def test_publish_many_runs_platforms_concurrently(self, publisher):
+        import time
+
+        def slow_upload(*args):
+            time.sleep(0.3)
+            return True
+
+        publisher.upload_instagram_reel = MagicMock(side_effect=slow_upload)
+        publisher.upload_youtube_short = MagicMock(side_effect=slow_upload)
+        video = {"type": "video", "path": "reel.mp4", "caption": "c", "data": {"headline_en": "Digest"}}
+
+        start = time.time()
+        results = publisher.publish_many([video])
+        elapsed = time.time() - start
+
+        assert results[0]["instagram_reel"]["ok"] and results[0]["youtube_short"]["ok"]
+        assert elapsed < 0.55 # Reel and Short overlap instead of running back to back
+
+    def test_publish_respects_platform_limits(self, publisher):
+        import threading, time
+        active = {"n": 0, "max": 0}
+        lock = threading.Lock()
+
+        def upload(*args):
+            with lock:
+                active["n"] += 1
+                active["max"] = max(active["max"], active["n"])
+            time.sleep(0.05)
+            with lock:
+                active["n"] -= 1
+            return True
+
+        publisher.upload_instagram_photo = MagicMock(side_effect=upload)
+        images = [{"type": "image", "path": f"{i}.png", "caption": "c", "data": {"headline_en": "h"}} for i in range(5)]
+
+        results = publisher.publish_many(images)
+        assert all(r["instagram_photo"]["ok"] for r in results)
+        assert active["max"] == publisher.platform_limits["instagram"]
+
+    def test_platform_backlog_does_not_block_others(self, publisher):
+        import time
+        started = {}
+
+        def upload(platform):
+            def run(path, *args):
+                started.setdefault(platform, time.time())
+                time.sleep(0.1)
+                return True
+            return run
+
+        publisher.upload_instagram_photo = MagicMock(side_effect=upload("instagram"))
+        publisher.upload_instagram_reel = MagicMock(side_effect=upload("instagram"))
+        publisher.upload_youtube_short = MagicMock(side_effect=upload("youtube"))
+        images = [{"type": "image", "path": f"{i}.png", "caption": "c", "data": {"headline_en": "h"}} for i in range(6)]
+        video = {"type": "video", "path": "reel.mp4", "caption": "c", "data": {"headline_en": "Digest"}}
+
+        start = time.time()
+        results = publisher.publish_many(images + [video])
+        # The Short starts right away, not after the Instagram queue (6 photos + reel, one at a time)
+        assert started["youtube"] - start < 0.1
+        ig = [r["instagram_photo"] for r in results[:6]]
+        assert max(r["seconds"] for r in ig) > 0.5 # Includes the wait for the Instagram slot
+        assert all(0.09 < r["upload_seconds"] < 0.3 for r in ig)
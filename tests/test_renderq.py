@@ -0,0 +1,119 @@
+import pytest
+import os
+import time
+import threading
+from renderq import RenderBroker, SQLiteRenderBroker, RenderWorker, RemoteStudio
+from preflight import file_hash
+
+class FakeStudio:
+    """Writes a small file per render; `delay` stands in for the CPU time of a real one."""
+
+    def __init__(self, output_path, delay=0.0):
+        self.output_path = output_path
+        self.delay = delay
+
+    def generate_image(self, item, profile=None):
+        time.sleep(self.delay)
+        path = os.path.join(self.output_path, f"slide1_{item['id']}_{profile}.jpg")
+        with open(path, "wb") as f:
+            f.write(f"{item['id']}:{profile}".encode())
+        return path
+
+    def generate_video(self, items, profile=None):
+        if not items:
+            return None
+        path = os.path.join(self.output_path, f"reel_{profile}.mp4")
+        with open(path, "wb") as f:
+            f.write(b"reel")
+        return path
+
+@pytest.fixture
+def broker(tmp_path):
+    return SQLiteRenderBroker(str(tmp_path / "render_queue.db"), str(tmp_path / "store"), max_attempts=2)
+
+def workers(broker, tmp_path, n, delay=0.0):
+    result = []
+    for i in range(n):
+        out = tmp_path / f"worker{i}"
+        out.mkdir()
+        result.append(RenderWorker(broker, worker_id=f"w{i}", poll_interval=0.01,
+                                   studio_factory=lambda brand, out=out: FakeStudio(str(out), delay)))
+    return result
+
+def remote(broker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # Local manifest under tmp_path/output
+    studio = RemoteStudio(broker, profile="draft", poll_interval=0.01)
+    studio.output_path = str(tmp_path / "client")
+    return studio
+
+class TestRenderQueue:
+    def test_job_lifecycle(self, broker, tmp_path):
+        with pytest.raises(TypeError):
+            RenderBroker() # Abstract: a broker has to implement the whole interface
+        item = {"id": "s1", "headline_en": "Story"}
+        job_id = broker.submit("image", "draft", "racing_tamizhan", [item])
+        assert broker.submit("image", "draft", "racing_tamizhan", [dict(item)]) == job_id # Shared
+        assert broker.submit("image", "final", "racing_tamizhan", [item]) != job_id
+        with pytest.raises(ValueError):
+            broker.submit("gif", "draft", "racing_tamizhan", [item])
+
+        [worker] = workers(broker, tmp_path, 1)
+        assert worker.run_once() and worker.run_once()
+        assert not worker.run_once() # Empty
+
+        job = broker.get(job_id)
+        assert job["state"] == "done" and job["worker"] == "w0"
+        result = job["result"]
+        assert result["name"] == "slide1_s1_draft.jpg" and file_hash(result["artifact"]) == result["hash"]
+        path = broker.fetch(result, str(tmp_path / "client"))
+        assert open(path, "rb").read() == b"s1:draft"
+
+        with open(result["artifact"], "wb") as f: # Corrupted in the store
+            f.write(b"garbage")
+        os.remove(path)
+        with pytest.raises(IOError):
+            broker.fetch(result, str(tmp_path / "client"))
+
+    def test_failures_retry_then_give_up(self, broker, tmp_path):
+        job_id = broker.submit("video", "draft", "racing_tamizhan", [])
+        [worker] = workers(broker, tmp_path, 1)
+        worker.run(exit_when_idle=True)
+        job = broker.get(job_id)
+        assert job["state"] == "failed" and job["attempts"] == 2 and "no file" in job["last_error"]
+
+        # A worker that died mid-render: its lease runs out and the job is handed out again
+        job_id = broker.submit("image", "draft", "racing_tamizhan", [{"id": "s2"}])
+        broker.lease_seconds = -1
+        assert broker.claim("dead-worker")["id"] == job_id
+        assert broker.claim("w0") is None
+        assert broker.recover() == 1
+        assert broker.claim("w0")["id"] == job_id
+
+    def test_remote_studio_scales_with_workers(self, broker, tmp_path, monkeypatch):
+        studio = remote(broker, tmp_path, monkeypatch)
+        pool = workers(broker, tmp_path, 4, delay=0.2)
+        threads = [threading.Thread(target=w.run) for w in pool]
+        for t in threads:
+            t.start()
+        try:
+            paths = [None] * 8
+            callers = [threading.Thread(target=lambda i=i: paths.__setitem__(i, studio.generate_image({"id": f"s{i}"})))
+                       for i in range(8)]
+            for t in callers:
+                t.start()
+            for t in callers:
+                t.join()
+        finally:
+            for w in pool:
+                w.stop()
+            for t in threads:
+                t.join()
+
+        assert all(open(p, "rb").read() == f"s{i}:draft".encode() for i, p in enumerate(paths))
+        assert all(os.path.dirname(p) == str(tmp_path / "client") for p in paths)
+        # Spread over every worker (no wall-clock check: too flaky on a loaded machine)
+        assert sum(w.processed for w in pool) == 8 and all(w.processed for w in pool)
+
+        # Asked again: served from the local manifest, no new job
+        assert studio.generate_image({"id": "s0"}) == paths[0]
+        assert broker.counts() == {"queued": 0, "running": 0, "done": 8, "failed": 0}
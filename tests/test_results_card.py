@@ -0,0 +1,95 @@
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from PIL import Image
+from results_card import results_records
+from scout import Scout
+from studio import Studio
+
+TEAMS = ["Red Bull Racing", "McLaren", "Ferrari", "Mercedes", "Aston Martin",
+         "Alpine", "Williams", "RB", "Kick Sauber", "Haas F1 Team"]
+
+def session_results():
+    """A 20-car race classification shaped like FastF1's session.results."""
+    rows = []
+    for i in range(20):
+        lapped = i >= 16
+        rows.append({
+            "Position": float(i + 1),
+            "Abbreviation": f"D{i:02d}",
+            "FullName": f"Driver {i + 1}",
+            "TeamName": TEAMS[i // 2],
+            "TeamColor": "3671C6",
+            "Time": pd.NaT if lapped else pd.Timedelta(seconds=5400.123 if i == 0 else i * 2.5),
+            "Status": "+1 Lap" if i < 18 and lapped else ("Retired" if lapped else "Finished"),
+            "Points": float(max(10 - i, 0)),
+            "GridPosition": float(20 - i),
+        })
+    return pd.DataFrame(rows).sample(frac=1, random_state=1) # FastF1 order isn't guaranteed
+
+@pytest.fixture
+def studio(tmp_path):
+    s = Studio(profile="draft")
+    s.output_path = str(tmp_path)
+    s.manifest = None
+    return s
+
+class TestResultsCard:
+    def test_records(self):
+        rows = results_records(session_results())
+        assert [r["position"] for r in rows] == list(range(1, 21))
+        assert rows[0]["gap"] == "1:30:00.123" and rows[0]["gap_seconds"] is None
+        assert rows[1]["gap"] == "+2.500" and rows[1]["gap_seconds"] == 2.5
+        assert rows[16]["gap"] == "+1 Lap" and rows[19]["gap"] == "Retired"
+        assert rows[0]["team_color"] == "#3671C6" and rows[0]["grid"] == 20
+
+    def test_full_grid_in_one_pass(self, studio, tmp_path):
+        item = {"id": "results_2024_4_R", "event": "Japanese Grand Prix", "session": "R",
+                "headline_en": "Japanese Grand Prix: Driver 1 wins", "type": "RESULT",
+                "results": results_records(session_results())}
+        paths = studio.generate_results(item)
+        assert len(paths["drivers"]) == 20
+        with Image.open(paths["classification"]) as img:
+            assert img.size == (540, 674) # Draft scale
+        with Image.open(paths["drivers"]["D00"]) as img:
+            assert img.size == (540, 674)
+
+        renderer = studio._results
+        # One background for the grid and one backdrop per team, not one per driver
+        assert len(renderer._layers) == 1 + len(TEAMS)
+        palettes = {renderer.team_palette(t) for t in TEAMS}
+        assert len(palettes) > 1 # Team colours, not one brand colour for everybody
+
+        # RESULT items with session data become the classification card in the normal flow
+        assert studio.generate_image(item) == paths["classification"]
+
+    def test_scout_result_item_offline(self):
+        scout = Scout()
+        with patch("results_card.load_session_results", return_value=("Japanese Grand Prix", session_results())) as load:
+            [item] = scout.fetch_telemetry(2024, 4, offline=True)
+        assert load.call_args.kwargs["offline"] is True
+        assert item["type"] == "RESULT" and item["source"] == "FastF1"
+        assert item["headline_en"] == "Japanese Grand Prix: Driver 1 wins"
+        assert item["summary"].startswith("1. Driver 1, 2. Driver 2")
+        assert len(item["results"]) == 20
+
+    def test_latest_race_lookup_stays_offline(self, tmp_path, monkeypatch):
+        import fastf1
+        monkeypatch.setattr("results_card.FASTF1_CACHE", str(tmp_path / "fastf1"))
+        offline = lambda: fastf1.Cache._requests_session_cached.settings.only_if_cached
+        seen = {}
+
+        def schedule(year, include_testing=False):
+            seen["schedule"] = offline()
+            return pd.DataFrame({"EventDate": [pd.Timestamp("2024-04-07")], "RoundNumber": [4]})
+
+        def load(year, gp, session, offline=False):
+            seen["load"] = (year, gp, offline)
+            return "Japanese Grand Prix", session_results()
+
+        with patch("fastf1.get_event_schedule", side_effect=schedule), \
+             patch("results_card.load_session_results", side_effect=load):
+            [item] = Scout().fetch_telemetry(year=2024, offline=True)
+        assert seen == {"schedule": True, "load": (2024, 4, True)}
+        assert item["id"] == "results_2024_4_R"
+        assert not offline() # Later online fetches still reach the network
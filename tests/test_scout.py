@@ -14,12 +14,46 @@ class TestScout:
         mock_feed.entries = [sample_rss_entry]
         mock_parse.return_value = mock_feed
 
-        news = scout.fetch_news()
+        with patch.object(scout, '_fetch_summary', return_value="Summary."): # No article download
+            news = scout.fetch_news()
         
-        assert len(news) == 2 # 2 feeds * 1 item each (mocked same for both)
+        assert len(news) == len(scout.rss_feeds) # 1 item per feed (mocked same for all)
         assert news[0]['headline_en'] == "Max Verstappen wins again"
         assert news[0]['image_url'] == "http://example.com/max.jpg"
 
+    def test_unchanged_feeds_still_listed(self, scout, sample_rss_entry):
+        scout.rss_feeds = ["http://example.com/rss"]
+        feed = MagicMock(entries=[sample_rss_entry], etag="abc", modified=None, status=200)
+        not_modified = MagicMock(entries=[], status=304)
+
+        with patch('feedparser.parse', side_effect=[feed, not_modified]) as parse, \
+             patch.object(scout, '_fetch_summary', return_value="Summary."):
+            first = scout.fetch_news()
+            again = scout.fetch_news() # e.g. the dashboard refreshing with the same Scout
+        assert parse.call_args.kwargs["etag"] == "abc"
+        assert [n['id'] for n in again] == [n['id'] for n in first] and len(first) == 1
+
+        # A poll for new stories skips the unchanged feed
+        with patch('feedparser.parse', return_value=not_modified):
+            assert list(scout.iter_entries(new_only=True)) == []
+
+        # Forced refresh (dashboard "Bypass Cache"): no conditional headers
+        with patch('feedparser.parse', return_value=feed) as parse, \
+             patch.object(scout, '_fetch_summary', return_value="Summary."):
+            assert len(scout.fetch_news(force=True)) == 1
+        assert parse.call_args.kwargs["etag"] is None and parse.call_args.kwargs["modified"] is None
+
+    def test_build_item_published_date(self, scout, sample_rss_entry):
+        import time
+        sample_rss_entry['published_parsed'] = time.strptime("2024-09-01 10:30", "%Y-%m-%d %H:%M")
+        with patch.object(scout, '_fetch_summary', return_value="Summary."):
+            item = scout.build_item(sample_rss_entry, "https://www.motorsport.com/rss/f1/news/")
+            del sample_rss_entry['published_parsed']
+            undated = scout.build_item(sample_rss_entry, "https://www.motorsport.com/rss/f1/news/")
+
+        assert item['published'] == "2024-09-01T10:30:00+00:00"
+        assert undated['published'] is None
+
     def test_translate_headline(self, scout):
         original = "Hello World"
         translated = scout.translate_headline(original)
@@ -0,0 +1,43 @@
+import pytest
+from publisher import Publisher
+from standin import StandinServer, attach_publisher
+
+class TestStandin:
+    @pytest.fixture
+    def assets(self, tmp_path):
+        image = tmp_path / "card.jpg"
+        image.write_bytes(b"\xff\xd8" + b"0" * 50000)
+        video = tmp_path / "reel.mp4"
+        video.write_bytes(b"1" * 700000)
+        return [
+            {"type": "image", "path": str(image), "caption": "c", "data": {"headline_en": "Card"}},
+            {"type": "video", "path": str(video), "caption": "c", "data": {"headline_en": "Reel"}},
+        ]
+
+    def publisher(self, server, tmp_path):
+        publisher = attach_publisher(Publisher(), server.url)
+        publisher.upload_state_dir = str(tmp_path / "state")
+        publisher.youtube_chunk_size = 256 * 1024
+        publisher.preflight = None # Payloads are filler bytes, not real media
+        return publisher
+
+    def test_publish_against_standin(self, assets, tmp_path):
+        with StandinServer() as server:
+            results = self.publisher(server, tmp_path).publish_many(assets)
+            stats = server.stats
+
+        assert all(r["ok"] for per_asset in results for r in per_asset.values())
+        assert stats["ig_configure"] == 2
+        assert stats["yt_complete"] == 1
+
+    def test_injected_failures_are_retried(self, assets, tmp_path):
+        with StandinServer(failure_rate=0.3, seed=3) as server:
+            publisher = self.publisher(server, tmp_path)
+            publisher.youtube_max_retries = 20
+            publisher.youtube_backoff_base = 0.01
+            ok = publisher.upload_youtube_short(assets[1]["path"], "Reel")
+            stats = server.stats
+
+        assert ok
+        assert stats["injected_failures"] > 0
+        assert stats["yt_complete"] == 1
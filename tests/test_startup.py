@@ -0,0 +1,13 @@
+import sys
+import subprocess
+import pytest
+
+HEAVY = ("fastf1", "pandas", "newspaper", "moviepy", "edge_tts", "instagrapi", "googleapiclient", "google_auth_oauthlib")
+
+
+class TestStartup:
+    @pytest.mark.parametrize("module", ["main", "daemon"])
+    def test_entry_point_defers_heavy_imports(self, module):
+        code = f"import sys, {module}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""
@@ -0,0 +1,60 @@
+import pytest
+import io
+import os
+import time
+import subprocess
+from unittest.mock import MagicMock
+from PIL import Image
+from preflight import ffmpeg_binary
+from thumbnails import Thumbnailer
+
+@pytest.fixture
+def thumbnailer(tmp_path):
+    return Thumbnailer(cache_dir=str(tmp_path / "thumbs"), size=(200, 250))
+
+def make_image(path, size=(1080, 1350), color=(200, 30, 30)):
+    Image.new("RGB", size, color).save(path)
+    return str(path)
+
+class TestThumbnailer:
+    def test_local_card_is_resized_and_cached(self, thumbnailer, tmp_path):
+        card = make_image(tmp_path / "slide1_x.png")
+
+        thumb = thumbnailer.thumbnail(card)
+        with Image.open(thumb) as img:
+            assert img.format == "JPEG"
+            assert img.size == (200, 250)
+        mtime = os.path.getmtime(thumb)
+        assert thumbnailer.thumbnail(card) == thumb
+        assert os.path.getmtime(thumb) == mtime
+
+        # Re-rendered card -> new preview
+        time.sleep(0.01)
+        make_image(card, color=(0, 0, 200))
+        os.utime(card, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert thumbnailer.thumbnail(card) != thumb
+
+    def test_remote_photo_fetched_once(self, thumbnailer):
+        buf = io.BytesIO()
+        Image.new("RGB", (1600, 1000), (10, 120, 10)).save(buf, "JPEG")
+        response = MagicMock(content=buf.getvalue())
+        thumbnailer.http = MagicMock()
+        thumbnailer.http.get.return_value = response
+
+        urls = ["https://example.com/a.jpg", "https://example.com/a.jpg", None]
+        previews = thumbnailer.thumbnails(urls)
+        assert list(previews) == ["https://example.com/a.jpg"]
+        with Image.open(previews["https://example.com/a.jpg"]) as img:
+            assert img.size == (200, 125)
+        thumbnailer.thumbnail("https://example.com/a.jpg")
+        thumbnailer.http.get.assert_called_once()
+
+    def test_video_poster_and_missing_file(self, thumbnailer, tmp_path):
+        video = str(tmp_path / "reel.mp4")
+        subprocess.run([ffmpeg_binary(), "-y", "-loglevel", "error", "-f", "lavfi",
+                        "-i", "testsrc=size=540x960:rate=15:duration=1", "-c:v", "libx264",
+                        "-preset", "ultrafast", "-pix_fmt", "yuv420p", video], check=True)
+
+        with Image.open(thumbnailer.thumbnail(video)) as img:
+            assert img.size[1] == 250
+        assert thumbnailer.thumbnail(str(tmp_path / "gone.png")) is None
@@ -0,0 +1,114 @@
+import pytest
+import os
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from uploads import ResumableUploader, UploadError
+
+class ResumableHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the YouTube resumable upload endpoint."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, headers=None, body=b""):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if server.fail_start:
+            server.fail_start -= 1
+            return self._reply(503) # Overloaded: no session yet
+        server.total = int(self.headers["X-Upload-Content-Length"])
+        server.received = bytearray()
+        self._reply(200, {"Location": f"http://127.0.0.1:{server.server_port}/session/1"})
+
+    def do_PUT(self):
+        server = self.server
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_range = self.headers["Content-Range"]
+        server.bytes_in += len(data)
+
+        if content_range.startswith("bytes */"):
+            pass # Status query
+        else:
+            start = int(content_range.split(" ")[1].split("-")[0])
+            if server.fail_at_chunk is not None and start == server.fail_at_chunk * server.chunk:
+                server.fail_at_chunk = None
+                return self._reply(503) # Interruption: chunk not committed
+            if start == len(server.received):
+                server.received.extend(data)
+
+        if len(server.received) == server.total:
+            return self._reply(200, {"Content-Type": "application/json"}, json.dumps({"id": "vid123"}).encode())
+        headers = {"Range": f"bytes=0-{len(server.received) - 1}"} if server.received else {}
+        self._reply(308, headers)
+
+
+class TestResumableUploader:
+    CHUNK = 256 * 1024
+
+    @pytest.fixture
+    def server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ResumableHandler)
+        server.received = bytearray()
+        server.total = 0
+        server.bytes_in = 0
+        server.fail_at_chunk = None
+        server.fail_start = 0
+        server.chunk = self.CHUNK
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+
+    @pytest.fixture
+    def video(self, tmp_path):
+        path = tmp_path / "reel.mp4"
+        path.write_bytes(os.urandom(4 * self.CHUNK + 1000))
+        return str(path)
+
+    def uploader(self, tmp_path, **kwargs):
+        return ResumableUploader(state_dir=str(tmp_path / "state"), chunk_size=self.CHUNK, backoff_base=0.01, **kwargs)
+
+    def test_chunked_upload(self, server, video, tmp_path):
+        url = f"http://127.0.0.1:{server.server_port}/upload"
+        result = self.uploader(tmp_path).upload(url, video, {"snippet": {}})
+
+        assert result == {"id": "vid123"}
+        assert bytes(server.received) == open(video, "rb").read()
+        assert os.listdir(tmp_path / "state") == [] # State cleared once done
+
+    def test_retry_after_server_error(self, server, video, tmp_path):
+        server.fail_at_chunk = 2
+        url = f"http://127.0.0.1:{server.server_port}/upload"
+
+        assert self.uploader(tmp_path).upload(url, video, {}) == {"id": "vid123"}
+        assert bytes(server.received) == open(video, "rb").read()
+
+    def test_retry_when_session_start_fails(self, server, video, tmp_path):
+        server.fail_start = 2
+        url = f"http://127.0.0.1:{server.server_port}/upload"
+
+        assert self.uploader(tmp_path).upload(url, video, {}) == {"id": "vid123"}
+        assert server.fail_start == 0 and bytes(server.received) == open(video, "rb").read()
+
+    def test_resume_after_restart(self, server, video, tmp_path):
+        server.fail_at_chunk = 3
+        url = f"http://127.0.0.1:{server.server_port}/upload"
+
+        # First process gives up mid-upload...
+        with pytest.raises(UploadError):
+            self.uploader(tmp_path, max_retries=0).upload(url, video, {})
+        assert len(server.received) == 3 * self.CHUNK
+
+        # ...a fresh one picks up from the committed offset instead of starting over
+        assert self.uploader(tmp_path).upload(url, video, {}) == {"id": "vid123"}
+        assert bytes(server.received) == open(video, "rb").read()
+        assert server.bytes_in == os.path.getsize(video) + self.CHUNK # Only the failed chunk was sent twice
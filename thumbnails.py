@@ -0,0 +1,102 @@
+import io
+import os
+import hashlib
+import logging
+import threading
+import subprocess
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from preflight import ffmpeg_binary
+from metrics import span
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Thumbnails")
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".webm")
+
+
+class Thumbnailer:
+    """
+    Small, pre-sized JPEG previews of press photos (URLs), rendered cards and reels (poster
+    frame), cached on disk. The dashboard shows these instead of making the browser pull
+    full-size photos and PNGs on every rerun.
+
+    Local files are keyed by path + modification time, so a re-render gets a fresh preview;
+    URLs are keyed by the URL and fetched once.
+    """
+
+    def __init__(self, cache_dir="output/thumbnails/", size=(480, 600), quality=75, workers=8):
+        self.cache_dir = cache_dir
+        self.size = size # Bounding box, aspect ratio is kept
+        self.quality = quality
+        self.http = requests.Session()
+        self.http.headers["User-Agent"] = "Mozilla/5.0 (compatible; RacingTamizhan/1.0)"
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, source):
+        if source.startswith(("http://", "https://")):
+            return source
+        stat = os.stat(source)
+        return f"{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _lock(self, path):
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _load(self, source):
+        if source.startswith(("http://", "https://")):
+            response = self.http.get(source, timeout=15)
+            response.raise_for_status()
+            return Image.open(io.BytesIO(response.content))
+        if source.lower().endswith(VIDEO_EXTENSIONS):
+            # Poster frame half a second in (the first frame is often still fading in)
+            result = subprocess.run([ffmpeg_binary(), "-loglevel", "error", "-ss", "0.5", "-i", source,
+                                     "-frames:v", "1", "-f", "image2pipe", "-c:v", "png", "-"],
+                                    capture_output=True)
+            if result.returncode != 0 or not result.stdout:
+                raise RuntimeError(result.stderr.decode(errors="replace").strip() or "no frame")
+            return Image.open(io.BytesIO(result.stdout))
+        return Image.open(source)
+
+    def thumbnail(self, source):
+        """Path of the cached preview for a URL or local file; None if it can't be made."""
+        if not source:
+            return None
+        try:
+            key = self._key(source)
+        except OSError:
+            return None # Local file gone
+        path = os.path.join(self.cache_dir, hashlib.sha1(f"{key}:{self.size}".encode("utf-8")).hexdigest()[:16] + ".jpg")
+        with span("thumbnail") as s:
+            if os.path.exists(path):
+                s.hit()
+                return path
+            with self._lock(path):
+                if os.path.exists(path): # Made by another session meanwhile
+                    s.hit()
+                    return path
+                s.miss()
+                try:
+                    with self._load(source) as img:
+                        img.draft("RGB", self.size) # JPEG: decode at a reduced scale
+                        img = img.convert("RGB")
+                        img.thumbnail(self.size, Image.Resampling.LANCZOS)
+                        tmp_path = path + ".tmp"
+                        img.save(tmp_path, "JPEG", quality=self.quality, optimize=True)
+                    os.replace(tmp_path, path)
+                    s.add_file(path)
+                    return path
+                except Exception as e:
+                    logger.warning(f"No thumbnail for {source}: {e}")
+                    s.fail(e)
+                    return None
+
+    def thumbnails(self, sources):
+        """{source: preview path or None}; missing previews are made in parallel."""
+        sources = list(dict.fromkeys(s for s in sources if s))
+        return dict(zip(sources, self._pool.map(self.thumbnail, sources)))
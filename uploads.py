@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import tempfile
+import requests
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Uploads")
+
+CHUNK_GRANULARITY = 256 * 1024 # Google resumable uploads need chunks in multiples of 256 KiB
+RETRIABLE_STATUS = {500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    pass
+
+
+class ResumableUploader:
+    """
+    Google-style resumable upload (used by the YouTube Data API videos.insert).
+
+    The session URI and the last committed byte are persisted to `state_dir`, so an
+    upload interrupted by a network error or a process restart resumes from where
+    the server left off instead of sending the whole file again.
+    """
+
+    def __init__(self, session=None, state_dir="output/upload_state/", chunk_size=8 * 1024 * 1024,
+                 max_retries=8, backoff_base=1.0, backoff_max=64.0, timeout=120):
+        self.session = session or requests.Session()
+        self.state_dir = state_dir
+        self.chunk_size = max(CHUNK_GRANULARITY, chunk_size // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    # --- State ---
+
+    def _state_path(self, init_url, file_path):
+        stat = os.stat(file_path)
+        key = f"{init_url}|{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return os.path.join(self.state_dir, hashlib.sha256(key.encode()).hexdigest()[:24] + ".json")
+
+    def _load_state(self, state_path):
+        try:
+            with open(state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, state_path, state):
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _clear_state(self, state_path):
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+    # --- Protocol ---
+
+    def _start_session(self, init_url, metadata, size, content_type):
+        response = self.session.post(
+            init_url,
+            json=metadata,
+            headers={"X-Upload-Content-Type": content_type, "X-Upload-Content-Length": str(size)},
+            timeout=self.timeout,
+        )
+        if response.status_code in RETRIABLE_STATUS:
+            raise requests.ConnectionError(f"HTTP {response.status_code} starting resumable session")
+        if response.status_code not in (200, 201) or "Location" not in response.headers:
+            raise UploadError(f"Could not start resumable session: HTTP {response.status_code} {response.text[:200]}")
+        return response.headers["Location"]
+
+    def _parse_offset(self, response):
+        # "Range: bytes=0-524287" -> next byte to send is 524288; no header means nothing committed
+        committed = response.headers.get("Range")
+        if not committed:
+            return 0
+        return int(committed.rsplit("-", 1)[1]) + 1
+
+    def _query_offset(self, session_uri, size):
+        """Ask the server how much it has. Returns (offset, final_response or None)."""
+        response = self.session.put(session_uri, headers={"Content-Range": f"bytes */{size}", "Content-Length": "0"},
+                                    timeout=self.timeout)
+        if response.status_code == 308:
+            return self._parse_offset(response), None
+        if response.status_code in (200, 201):
+            return size, response
+        if response.status_code in (404, 410):
+            return None, None # Session expired, start over
+        if response.status_code in RETRIABLE_STATUS:
+            raise requests.ConnectionError(f"HTTP {response.status_code} on status query")
+        raise UploadError(f"Status query failed: HTTP {response.status_code} {response.text[:200]}")
+
+    def _send_chunk(self, session_uri, f, offset, size):
+        f.seek(offset)
+        data = f.read(self.chunk_size)
+        end = offset + len(data) - 1
+        response = self.session.put(session_uri, data=data,
+                                    headers={"Content-Range": f"bytes {offset}-{end}/{size}"},
+                                    timeout=self.timeout)
+        if response.status_code == 308:
+            return self._parse_offset(response), None
+        if response.status_code in (200, 201):
+            return size, response
+        if response.status_code in RETRIABLE_STATUS:
+            raise requests.ConnectionError(f"HTTP {response.status_code} on chunk {offset}-{end}")
+        raise UploadError(f"Chunk upload failed: HTTP {response.status_code} {response.text[:200]}")
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        time.sleep(delay + random.uniform(0, delay / 4))
+
+    def upload(self, init_url, file_path, metadata, content_type="video/*", progress=None):
+        """
+        Upload `file_path` and return the server's final JSON response.
+        `progress(sent_bytes, total_bytes)` is called after every committed chunk.
+        """
+        size = os.path.getsize(file_path)
+        state_path = self._state_path(init_url, file_path)
+        state = self._load_state(state_path)
+        attempt = 0
+
+        with open(file_path, "rb") as f:
+            while True:
+                try:
+                    if state:
+                        # Resume: trust the server's committed offset over our own record
+                        offset, final = self._query_offset(state["session_uri"], size)
+                        if final is not None:
+                            self._clear_state(state_path)
+                            return final.json()
+                        if offset is None:
+                            logger.info("Resumable session expired, starting a new one.")
+                            self._clear_state(state_path)
+                            state = None
+                            continue
+                        if offset:
+                            logger.info(f"Resuming upload at byte {offset}/{size}")
+                    else:
+                        state = {"session_uri": self._start_session(init_url, metadata, size, content_type), "offset": 0}
+                        offset = 0
+                    state["offset"] = offset
+                    self._save_state(state_path, state)
+
+                    while True:
+                        offset, final = self._send_chunk(state["session_uri"], f, offset, size)
+                        if final is not None:
+                            self._clear_state(state_path)
+                            return final.json()
+                        state["offset"] = offset
+                        self._save_state(state_path, state)
+                        attempt = 0 # Progress made, reset backoff
+                        if progress:
+                            progress(offset, size)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt >= self.max_retries:
+                        raise UploadError(f"Giving up after {attempt} retries: {e}") from e
+                    logger.warning(f"Upload interrupted ({e}), retry {attempt + 1}/{self.max_retries}")
+                    self._backoff(attempt)
+                    attempt += 1